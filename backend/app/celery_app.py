@@ -0,0 +1,32 @@
+"""
+Celery Application
+
+Runs long Ansible playbooks and LLM analysis on dedicated workers instead of
+the API process, so web workers can restart and scale independently.
+"""
+
+from celery import Celery
+import os
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
+
+celery_app = Celery(
+    "rke2",
+    broker=CELERY_BROKER_URL,
+    backend=CELERY_RESULT_BACKEND,
+    include=["app.services.ansible_service", "app.services.readiness_service"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    # Playbooks run for minutes - don't let one worker hoard queued jobs
+    worker_prefetch_multiplier=1,
+    # Separate queues so Ansible and LLM workers scale independently
+    task_routes={
+        "app.services.ansible_service.*": {"queue": "ansible_queue"},
+        "app.services.readiness_service.*": {"queue": "llm_queue"},
+    },
+)
@@ -1,12 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from app.database import engine, async_engine, Base
 from app.routers import clusters, jobs, health, credentials
+from app.services.response_cache import init_response_cache, start_invalidation_listener
+from app.services.job_stream import start_job_stream_listener
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="RKE2 Automation API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-warm the connection pool so the first requests don't pay connect cost
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    init_response_cache()
+    invalidation_listener = await start_invalidation_listener()
+    job_stream_relay = await start_job_stream_listener()
+
+    yield
+
+    if job_stream_relay:
+        job_stream_relay.cancel()
+    if invalidation_listener:
+        await invalidation_listener.close()
+    await async_engine.dispose()
+
+app = FastAPI(
+    title="RKE2 Automation API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # CORS for local development
 app.add_middleware(
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, ForeignKey, Enum, Boolean, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, LargeBinary, ForeignKey, Enum, Boolean, UniqueConstraint, Index, text
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 from app.database import Base
@@ -40,7 +40,8 @@ class Credential(Base):
     credential_type = Column(Enum(CredentialType), nullable=False)
 
     # Encrypted credential data (private key or password)
-    encrypted_secret = Column(Text, nullable=False)
+    # Deferred - only loaded by paths that decrypt it, never by list/detail views
+    encrypted_secret = deferred(Column(Text, nullable=False))
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -83,6 +84,16 @@ class Node(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('cluster_id', 'hostname', name='uq_cluster_hostname'),
+        # Covers role lookups and the per-(role, status) installation stage counts
+        Index('ix_nodes_cluster_role_status', 'cluster_id', 'role', 'status'),
+        # Duplicate-IP checks on scale-up (hostnames are covered by uq_cluster_hostname)
+        Index('ix_nodes_cluster_ip', 'cluster_id', 'internal_ip'),
+        # Partial index - makes the "has initial master" check a single probe
+        Index(
+            'ix_nodes_initial_master', 'cluster_id',
+            postgresql_where=text("role = 'INITIAL_MASTER'"),
+            sqlite_where=text("role = 'INITIAL_MASTER'")
+        ),
     )
 
     @property
@@ -150,6 +161,20 @@ class Cluster(Base):
     credential = relationship("Credential", back_populates="clusters")
     cluster_nodes = relationship("Node", back_populates="cluster", cascade="all, delete-orphan")
 
+    # Role-filtered views of cluster_nodes, filtered in SQL (read-only)
+    master_nodes = relationship(
+        "Node",
+        primaryjoin="and_(Cluster.id == Node.cluster_id, Node.role.in_(['INITIAL_MASTER', 'MASTER']))",
+        order_by="Node.id",
+        viewonly=True
+    )
+    worker_nodes = relationship(
+        "Node",
+        primaryjoin="and_(Cluster.id == Node.cluster_id, Node.role == 'WORKER')",
+        order_by="Node.id",
+        viewonly=True
+    )
+
 class Job(Base):
     __tablename__ = "jobs"
 
@@ -163,6 +188,8 @@ class Job(Base):
     inventory_path = Column(String, nullable=True)
     output = Column(Text, nullable=True)
     process_id = Column(Integer, nullable=True)  # Docker exec process PID
+    task_id = Column(String, nullable=True)  # Celery task ID
+    pgid = Column(Integer, nullable=True)  # Playbook process group ID inside ansible-runner
 
     # Upgrade check results
     readiness_json = Column(JSON, nullable=True)
@@ -181,14 +208,21 @@ class Job(Base):
 
     cluster = relationship("Cluster", back_populates="jobs")
 
+    __table_args__ = (
+        Index('ix_jobs_cluster_status', 'cluster_id', 'status'),
+        # Newest-first job listings, per cluster and overall
+        Index('ix_jobs_cluster_created', cluster_id, created_at.desc()),
+        Index('ix_jobs_created', created_at.desc()),
+    )
+
 class ClusterStatusCache(Base):
     __tablename__ = "cluster_status_cache"
 
     id = Column(Integer, primary_key=True, index=True)
     cluster_id = Column(Integer, ForeignKey("clusters.id"), unique=True, nullable=False)
 
-    # Cached status data (aggregated LLM-ready format)
-    cached_data = Column(JSON, nullable=False)
+    # Cached status data (aggregated LLM-ready format), stored as the orjson-encoded bytes
+    cached_data = Column(LargeBinary, nullable=False)
 
     # Cache metadata
     collected_at = Column(DateTime, nullable=False)
@@ -197,3 +231,22 @@ class ClusterStatusCache(Base):
 
     # Relationship
     cluster = relationship("Cluster")
+
+    __table_args__ = (
+        Index('ix_cache_cluster_expires', 'cluster_id', 'expires_at'),
+    )
+
+class AnalysisCache(Base):
+    __tablename__ = "analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # blake2b of the optimized preflight payload + model id
+    prompt_hash = Column(String, unique=True, nullable=False)
+    model_id = Column(String, nullable=False)
+
+    # AnalysisResult, stored pre-serialized as JSON text
+    result_json = Column(Text, nullable=False)
+    tokens = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
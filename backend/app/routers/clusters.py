@@ -1,123 +1,194 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 from typing import List, Optional
-from app.database import get_db
+from collections import Counter
+import asyncio
+from app.database import get_db, run_with_session
 from app.models import Cluster, Job, ClusterType, JobStatus, Node, NodeRole, NodeStatus
 from app.schemas import ClusterCreateNew, ClusterCreateRegistered, ClusterResponse
 from app.services.cluster_service import create_new_cluster, register_cluster
 from app.services.cluster_status_service import get_cluster_status
 from app.services.kubeconfig_service import fetch_kubeconfig_from_master
-from app.services.cluster_cache_service import get_cached_status, save_cache, invalidate_cache
+from app.services.preflight.collector import remove_cached_kubeconfig
+from app.services.cluster_cache_service import (
+    get_cached_status,
+    get_stale_status,
+    invalidate_cache,
+    refresh_status_cache,
+    save_cache
+)
+from app.services.response_cache import CLUSTERS_NAMESPACE, RESPONSE_CACHE_TTL, clear_response_cache
+from fastapi_cache.decorator import cache
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+# Node roles (from cluster status) that make a node a server in scale views
+SERVER_ROLE_TAGS = frozenset({"control-plane", "master"})
+
+async def load_cluster_or_404(db: AsyncSession, cluster_id: int, *options) -> Cluster:
+    """Load a cluster with its nodes eager-loaded, or raise 404"""
+    # One round-trip: nodes come in through a LEFT JOIN on the single cluster row
+    result = await db.execute(
+        select(Cluster).options(joinedload(Cluster.cluster_nodes), *options).where(Cluster.id == cluster_id)
+    )
+    cluster = result.unique().scalar_one_or_none()
+    if not cluster:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return cluster
+
+async def get_cluster_dep(cluster_id: int, db: AsyncSession = Depends(get_db)) -> Cluster:
+    """Dependency for /{cluster_id}/* routes - shares the request's session"""
+    return await load_cluster_or_404(db, cluster_id)
+
+async def _refresh_status_in_background(cluster_id: int):
+    """Stale-while-revalidate refresh of the cluster status cache"""
+    if await run_in_threadpool(refresh_status_cache, cluster_id):
+        await clear_response_cache(CLUSTERS_NAMESPACE)
+
+async def _sync_nodes_in_background(cluster_id: int):
+    """Node status sync after a fresh collection (reuses the memoized status)"""
+    from app.services.node_sync_service import auto_sync_on_inspection
+
+    await run_in_threadpool(run_with_session, auto_sync_on_inspection, cluster_id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
+
 @router.post("/new", response_model=ClusterResponse)
 async def create_cluster(
     cluster: ClusterCreateNew,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new RKE2 cluster (generates Ansible artifacts, does not execute)"""
-    existing = db.query(Cluster).filter(Cluster.name == cluster.name).first()
+    existing = await db.scalar(select(Cluster.id).where(Cluster.name == cluster.name))
     if existing:
         raise HTTPException(status_code=400, detail="Cluster name already exists")
 
-    new_cluster = create_new_cluster(db, cluster)
+    new_cluster = await db.run_sync(create_new_cluster, cluster)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
     return new_cluster
 
 @router.post("/register", response_model=ClusterResponse)
 async def register_existing_cluster(
     cluster: ClusterCreateRegistered,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register an existing cluster via kubeconfig"""
-    existing = db.query(Cluster).filter(Cluster.name == cluster.name).first()
+    existing = await db.scalar(select(Cluster.id).where(Cluster.name == cluster.name))
     if existing:
         raise HTTPException(status_code=400, detail="Cluster name already exists")
 
-    registered = register_cluster(db, cluster)
+    registered = await db.run_sync(register_cluster, cluster)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
     return registered
 
-@router.get("", response_model=List[ClusterResponse])
-async def list_clusters(db: Session = Depends(get_db)):
+@router.get("", response_model=None, responses={200: {"model": List[ClusterResponse]}})
+@cache(expire=RESPONSE_CACHE_TTL, namespace=CLUSTERS_NAMESPACE)
+async def list_clusters(db: AsyncSession = Depends(get_db)):
     """List all clusters"""
-    clusters = db.query(Cluster).all()
-    return clusters
-
-@router.get("/{cluster_id}", response_model=ClusterResponse)
-async def get_cluster(cluster_id: int, db: Session = Depends(get_db)):
+    # raiseload: any relationship the response touches must be eager-loaded above
+    result = await db.scalars(select(Cluster).options(selectinload(Cluster.cluster_nodes), raiseload("*")))
+    # Rows are trusted - skip per-field validation on the list path
+    return [ClusterResponse.from_row(c) for c in result.all()]
+
+@router.get("/{cluster_id}", response_model=None, responses={200: {"model": ClusterResponse}})
+@cache(expire=RESPONSE_CACHE_TTL, namespace=CLUSTERS_NAMESPACE)
+async def get_cluster(cluster_id: int, db: AsyncSession = Depends(get_db)):
     """Get cluster details"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-    return cluster
+    # Loaded in the body rather than via get_cluster_dep so cache hits skip the DB
+    cluster = await load_cluster_or_404(db, cluster_id, raiseload("*"))
+    return ClusterResponse.from_row(cluster)
 
 @router.get("/{cluster_id}/status")
-async def get_cluster_status_endpoint(cluster_id: int, db: Session = Depends(get_db)):
+async def get_cluster_status_endpoint(
+    cluster_id: int,
+    background_tasks: BackgroundTasks,
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get cluster Kubernetes status via kubectl (cached with TTL)
+    Get cluster Kubernetes status via the Kubernetes API (cached with TTL)
 
     Returns cached data if available and valid.
-    Otherwise collects fresh data and caches it.
+    Recently expired data is returned immediately while a background refresh runs.
+    Otherwise collects fresh data and caches it; if collection fails, the last
+    known good status is returned with an X-Cache-Fallback header.
     """
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
-    # Try to get cached data
-    cached = get_cached_status(db, cluster_id, force_refresh=False)
+    # Try to get cached data (already serialized - sent as-is)
+    cached = await db.run_sync(get_cached_status, cluster_id, False)
     if cached:
-        return cached
+        return Response(content=cached, media_type="application/json")
+
+    # Stale-while-revalidate: serve recently expired data, refresh in background
+    stale = await db.run_sync(get_stale_status, cluster_id)
+    if stale:
+        background_tasks.add_task(_refresh_status_in_background, cluster_id)
+        return Response(content=stale, media_type="application/json")
 
     # Cache miss or expired - collect fresh data
-    status = get_cluster_status(cluster)
+    try:
+        status = await asyncio.to_thread(get_cluster_status, cluster)
+    except Exception as e:
+        status = {"error": f"Failed to get cluster status: {str(e)}"}
 
     # Save to cache if collection was successful
     if "error" not in status and "_collection_duration_seconds" in status:
         collection_duration = status.pop("_collection_duration_seconds")
-        save_cache(db, cluster_id, status, collection_duration)
+        body = await db.run_sync(save_cache, cluster_id, status, collection_duration)
+
+        # Auto-sync node statuses when we collect fresh data - after the response
+        background_tasks.add_task(_sync_nodes_in_background, cluster_id)
+        await clear_response_cache(CLUSTERS_NAMESPACE)
 
-        # Auto-sync node statuses when we collect fresh data
-        from app.services.node_sync_service import auto_sync_on_inspection
-        auto_sync_on_inspection(db, cluster_id)
+        return Response(content=body, media_type="application/json")
+
+    # Collection failed - fall back to the last known good status
+    fallback = await db.run_sync(get_stale_status, cluster_id, None)
+    if fallback:
+        return Response(content=fallback, media_type="application/json", headers={"X-Cache-Fallback": "true"})
 
     return status
 
 @router.post("/{cluster_id}/refresh")
-async def refresh_cluster_status(cluster_id: int, db: Session = Depends(get_db)):
+async def refresh_cluster_status(
+    cluster_id: int,
+    background_tasks: BackgroundTasks,
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Force refresh cluster status (ignores cache TTL)
 
     Collects fresh data and updates cache.
-    Also auto-syncs node statuses from Kubernetes to database.
+    Node statuses are synced from Kubernetes to database after the response.
     """
-    from app.services.node_sync_service import auto_sync_on_inspection
-
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
-    # Force collect fresh data (ignore cache)
-    status = get_cluster_status(cluster)
+    # Force collect fresh data (ignore both caches) - API reads run off the event loop
+    status = await asyncio.to_thread(get_cluster_status, cluster, True)
 
     # Save to cache if collection was successful
+    body = None
     if "error" not in status and "_collection_duration_seconds" in status:
         collection_duration = status.pop("_collection_duration_seconds")
-        save_cache(db, cluster_id, status, collection_duration)
+        body = await db.run_sync(save_cache, cluster_id, status, collection_duration)
 
-    # Auto-sync node statuses from Kubernetes to database
-    auto_sync_on_inspection(db, cluster_id)
+    # Auto-sync node statuses from Kubernetes to database - after the response
+    background_tasks.add_task(_sync_nodes_in_background, cluster_id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
+    if body is not None:
+        return Response(content=body, media_type="application/json")
     return status
 
 @router.put("/{cluster_id}", response_model=ClusterResponse)
-async def update_cluster(cluster_id: int, cluster_update: dict, db: Session = Depends(get_db)):
+async def update_cluster(
+    cluster_update: dict,
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
+):
     """Update cluster metadata"""
-    import subprocess
-
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
+    import os
 
     # If name is being changed and it's a 'new' cluster, rename the ansible directory
     old_name = cluster.name
@@ -126,14 +197,11 @@ async def update_cluster(cluster_id: int, cluster_update: dict, db: Session = De
         old_dir = f"/ansible/clusters/{old_name}"
         new_dir = f"/ansible/clusters/{new_name}"
 
-        # Rename directory in ansible container if it exists
+        # Rename directory on the shared /ansible volume if it exists
         try:
-            subprocess.run([
-                "docker", "exec", "rke2-automation-ansible-runner-1",
-                "mv", old_dir, new_dir
-            ], check=False)  # Don't fail if directory doesn't exist
-        except:
-            pass  # Ignore errors - directory might not exist yet
+            os.rename(old_dir, new_dir)
+        except FileNotFoundError:
+            pass  # Directory might not exist yet
 
     # Update allowed fields
     allowed_fields = ["name", "rke2_version", "cni", "rke2_data_dir", "rke2_api_ip", "rke2_token", "rke2_additional_sans"]
@@ -141,98 +209,93 @@ async def update_cluster(cluster_id: int, cluster_update: dict, db: Session = De
         if field in cluster_update:
             setattr(cluster, field, cluster_update[field])
 
-    db.commit()
-    db.refresh(cluster)
+    await db.commit()
+    await db.refresh(cluster, ["cluster_nodes"])
+    await clear_response_cache(CLUSTERS_NAMESPACE)
     return cluster
 
 @router.post("/{cluster_id}/fetch-kubeconfig")
-async def fetch_kubeconfig(cluster_id: int, db: Session = Depends(get_db)):
+async def fetch_kubeconfig(cluster: Cluster = Depends(get_cluster_dep), db: AsyncSession = Depends(get_db)):
     """Fetch kubeconfig from master node via SSH"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     if cluster.cluster_type != "new":
         raise HTTPException(status_code=400, detail="Can only fetch kubeconfig for 'new' type clusters")
 
     try:
-        kubeconfig = fetch_kubeconfig_from_master(cluster)
+        kubeconfig = await asyncio.to_thread(fetch_kubeconfig_from_master, cluster)
 
         # Save to database
         cluster.kubeconfig = kubeconfig
-        db.commit()
-        db.refresh(cluster)
+        await db.commit()
+        await db.refresh(cluster)
+        remove_cached_kubeconfig(cluster.id)
+        await clear_response_cache(CLUSTERS_NAMESPACE)
 
         return {"message": "Kubeconfig fetched successfully", "kubeconfig": kubeconfig}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch kubeconfig: {str(e)}")
 
 @router.post("/{cluster_id}/upload-kubeconfig")
-async def upload_kubeconfig(cluster_id: int, kubeconfig: dict, db: Session = Depends(get_db)):
+async def upload_kubeconfig(
+    kubeconfig: dict,
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
+):
     """Upload kubeconfig manually"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     kubeconfig_content = kubeconfig.get("content")
     if not kubeconfig_content:
         raise HTTPException(status_code=400, detail="Kubeconfig content is required")
 
     cluster.kubeconfig = kubeconfig_content
-    db.commit()
-    db.refresh(cluster)
+    await db.commit()
+    await db.refresh(cluster)
+    remove_cached_kubeconfig(cluster.id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
     return {"message": "Kubeconfig uploaded successfully"}
 
 @router.delete("/{cluster_id}")
-async def delete_cluster(cluster_id: int, db: Session = Depends(get_db)):
+async def delete_cluster(cluster: Cluster = Depends(get_cluster_dep), db: AsyncSession = Depends(get_db)):
     """Delete a cluster"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
-    db.delete(cluster)
-    db.commit()
+    cluster_id = cluster.id
+    await db.delete(cluster)
+    await db.commit()
+    remove_cached_kubeconfig(cluster_id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
     return {"message": "Cluster deleted"}
 
 # ==================== SCALE ENDPOINTS ====================
 
 @router.get("/{cluster_id}/scale")
-async def get_scale_info(cluster_id: int, db: Session = Depends(get_db)):
+async def get_scale_info(cluster: Cluster = Depends(get_cluster_dep)):
     """
     Get current cluster nodes for scaling operations
 
-    Uses kubectl to get real-time node information from the cluster
+    Uses the Kubernetes API to get real-time node information from the cluster
 
     Returns:
-        - Current nodes with roles from kubectl
+        - Current nodes with roles from the Kubernetes API
         - Cluster metadata
     """
     from app.services.cluster_status_service import get_cluster_status
 
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     if cluster.cluster_type != ClusterType.NEW:
         raise HTTPException(status_code=400, detail="Can only scale 'new' type clusters")
 
     if not cluster.kubeconfig:
         raise HTTPException(status_code=400, detail="Kubeconfig not available. Please fetch or upload kubeconfig first.")
 
-    # Get real-time cluster status from kubectl
+    # Get real-time cluster status from the Kubernetes API
     try:
-        status = get_cluster_status(cluster)
+        status = await asyncio.to_thread(get_cluster_status, cluster)
         node_details = status.get("nodes", {}).get("details", [])
 
-        # Convert kubectl node data to scale-friendly format
+        # Convert node data to scale-friendly format, counting roles in the same pass
         nodes = []
+        role_counts = Counter()
         for node in node_details:
-            # Determine role from node roles
-            role = "agent"
-            node_roles = node.get("roles", "")
-            if "control-plane" in node_roles or "master" in node_roles:
-                role = "server"
+            # Determine role from node roles (comma-joined role tags, e.g. "control-plane, etcd")
+            role = "agent" if SERVER_ROLE_TAGS.isdisjoint(node.get("roles", "").split(", ")) else "server"
+            role_counts[role] += 1
 
             nodes.append({
                 "hostname": node.get("name"),
@@ -243,18 +306,14 @@ async def get_scale_info(cluster_id: int, db: Session = Depends(get_db)):
                 "os": node.get("os_image")
             })
 
-        # Count by role
-        server_count = sum(1 for n in nodes if n.get("role") == "server")
-        agent_count = sum(1 for n in nodes if n.get("role") == "agent")
-
         return {
             "cluster_id": cluster.id,
             "cluster_name": cluster.name,
             "nodes": nodes,
             "summary": {
                 "total": len(nodes),
-                "servers": server_count,
-                "agents": agent_count
+                "servers": role_counts["server"],
+                "agents": role_counts["agent"]
             }
         }
     except Exception as e:
@@ -265,7 +324,8 @@ async def add_nodes(
     cluster_id: int,
     nodes_to_add: dict,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Add new nodes to cluster
@@ -286,16 +346,14 @@ async def add_nodes(
     from app.services.ansible_service import execute_add_nodes
     from app.services.cluster_cache_service import invalidate_cache
     from app.services.cluster_lock_service import (
-        acquire_cluster_lock,
-        check_bootstrap_prerequisite,
-        check_node_identity,
-        split_master_worker_additions
+        create_locked_job,
+        enqueue_job,
+        preflight_node_additions,
+        probe_rke2_api,
+        split_master_worker_additions,
+        validate_initial_master
     )
 
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     if cluster.cluster_type != ClusterType.NEW:
         raise HTTPException(status_code=400, detail="Can only scale 'new' type clusters")
 
@@ -310,9 +368,11 @@ async def add_nodes(
         if node["role"] not in ["server", "agent"]:
             raise HTTPException(status_code=400, detail="Role must be 'server' or 'agent'")
 
+    # G4 + G1: One query for duplicate nodes and the initial master
+    error_msg, initial_master = await db.run_sync(preflight_node_additions, cluster_id, nodes)
+
     # G4: Check node identity (prevent duplicates)
-    valid, error_msg = check_node_identity(db, cluster_id, nodes)
-    if not valid:
+    if error_msg:
         raise HTTPException(status_code=400, detail=error_msg)
 
     # G3: Split master and worker additions if both present
@@ -320,25 +380,12 @@ async def add_nodes(
 
     if master_nodes and worker_nodes:
         # Both present - create two sequential jobs
-        # First job: add masters
-        job_masters = Job(
-            cluster_id=cluster_id,
-            job_type="add_nodes",
-            status=JobStatus.PENDING
-        )
-        db.add(job_masters)
-        db.commit()
-        db.refresh(job_masters)
-
-        try:
-            acquire_cluster_lock(db, cluster_id, job_masters.id, "scale_add_masters")
-        except HTTPException:
-            db.delete(job_masters)
-            db.commit()
-            raise
+        # First job: add masters (created only once the lock is held)
+        job_masters = await db.run_sync(create_locked_job, cluster_id, "add_nodes", "scale_add_masters")
 
-        # Execute masters addition
-        background_tasks.add_task(execute_add_nodes, job_masters.id, cluster_id, master_nodes)
+        # Execute masters addition on a Celery worker
+        await db.run_sync(enqueue_job, job_masters, execute_add_nodes, job_masters.id, cluster_id, master_nodes)
+        await clear_response_cache(CLUSTERS_NAMESPACE)
 
         # Return info about sequencing
         return {
@@ -354,42 +401,29 @@ async def add_nodes(
         # - Adding workers (always need initial master)
         # - Adding joining masters (need initial master, not first master)
         # Skip check if this is the FIRST master being added
-        has_initial_master = db.query(Node).filter(
-            Node.cluster_id == cluster_id,
-            Node.role == NodeRole.INITIAL_MASTER
-        ).first() is not None
+        has_initial_master = initial_master is not None
 
         adding_workers = worker_nodes and len(worker_nodes) > 0
         adding_joining_masters = master_nodes and len(master_nodes) > 0 and has_initial_master
 
         if adding_workers or adding_joining_masters:
-            valid, error_msg = check_bootstrap_prerequisite(db, cluster_id)
+            valid, error_msg = validate_initial_master(initial_master)
             if not valid:
                 raise HTTPException(status_code=400, detail=error_msg)
 
-        # Create single job
-        job = Job(
-            cluster_id=cluster_id,
-            job_type="add_nodes",
-            status=JobStatus.PENDING
-        )
-        db.add(job)
-        db.commit()
-        db.refresh(job)
+            # Connectivity is informational only - probe after responding
+            background_tasks.add_task(probe_rke2_api, cluster.rke2_api_ip)
 
-        try:
-            operation_type = "scale_add_masters" if master_nodes else "scale_add_workers"
-            acquire_cluster_lock(db, cluster_id, job.id, operation_type)
-        except HTTPException:
-            db.delete(job)
-            db.commit()
-            raise
+        # Create single job (only once the lock is held)
+        operation_type = "scale_add_masters" if master_nodes else "scale_add_workers"
+        job = await db.run_sync(create_locked_job, cluster_id, "add_nodes", operation_type)
 
-        # Execute in background
-        background_tasks.add_task(execute_add_nodes, job.id, cluster_id, nodes)
+        # Execute on a Celery worker
+        await db.run_sync(enqueue_job, job, execute_add_nodes, job.id, cluster_id, nodes)
 
         # Invalidate cache
-        invalidate_cache(db, cluster_id)
+        await db.run_sync(invalidate_cache, cluster_id)
+        await clear_response_cache(CLUSTERS_NAMESPACE)
 
         return {"job_id": job.id, "message": f"Adding {len(nodes)} node(s)", "status": "pending"}
 
@@ -397,9 +431,9 @@ async def add_nodes(
 async def remove_nodes(
     cluster_id: int,
     nodes_to_remove: dict,
-    background_tasks: BackgroundTasks,
     confirm_master_removal: bool = False,
-    db: Session = Depends(get_db)
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Remove nodes from cluster
@@ -423,14 +457,11 @@ async def remove_nodes(
     from app.services.ansible_service import execute_remove_nodes
     from app.services.cluster_cache_service import invalidate_cache
     from app.services.cluster_lock_service import (
-        acquire_cluster_lock,
-        check_safe_master_removal
+        check_safe_master_removal,
+        create_locked_job,
+        enqueue_job
     )
 
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     if cluster.cluster_type != ClusterType.NEW:
         raise HTTPException(status_code=400, detail="Can only scale 'new' type clusters")
 
@@ -439,8 +470,8 @@ async def remove_nodes(
         raise HTTPException(status_code=400, detail="No nodes provided")
 
     # G2: Check safe master removal
-    valid, error_msg = check_safe_master_removal(
-        db,
+    valid, error_msg = await db.run_sync(
+        check_safe_master_removal,
         cluster_id,
         nodes,
         require_confirmation=not confirm_master_removal
@@ -448,30 +479,15 @@ async def remove_nodes(
     if not valid:
         raise HTTPException(status_code=400, detail=error_msg)
 
-    # Create job for tracking
-    job = Job(
-        cluster_id=cluster_id,
-        job_type="remove_nodes",
-        status=JobStatus.PENDING
-    )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    try:
-        # Acquire cluster lock
-        acquire_cluster_lock(db, cluster_id, job.id, "scale_remove")
-    except HTTPException:
-        # Lock failed - clean up job
-        db.delete(job)
-        db.commit()
-        raise
+    # Acquire cluster lock, then create job for tracking
+    job = await db.run_sync(create_locked_job, cluster_id, "remove_nodes", "scale_remove")
 
-    # Execute in background (pass cluster_id instead of cluster object)
-    background_tasks.add_task(execute_remove_nodes, job.id, cluster_id, nodes)
+    # Execute on a Celery worker (pass cluster_id instead of cluster object)
+    await db.run_sync(enqueue_job, job, execute_remove_nodes, job.id, cluster_id, nodes)
 
     # Invalidate cache
-    invalidate_cache(db, cluster_id)
+    await db.run_sync(invalidate_cache, cluster_id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
     return {"job_id": job.id, "message": f"Removing {len(nodes)} node(s)", "status": "pending"}
 
@@ -479,7 +495,8 @@ async def remove_nodes(
 @router.post("/{cluster_id}/sync-nodes")
 async def sync_cluster_nodes(
     cluster_id: int,
-    db: Session = Depends(get_db)
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Sync node statuses from Kubernetes cluster inspection to database.
@@ -491,17 +508,17 @@ async def sync_cluster_nodes(
     """
     from app.services.node_sync_service import sync_node_statuses_from_inspection
 
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
-    result = sync_node_statuses_from_inspection(db, cluster_id)
+    # Queries the cluster API - keep it off the event loop with its own session
+    result = await asyncio.to_thread(
+        run_with_session, sync_node_statuses_from_inspection, cluster_id, force_refresh=True
+    )
 
     if not result.get("synced") and result.get("errors"):
         raise HTTPException(status_code=400, detail=result["errors"][0])
 
     # Invalidate cache after sync
-    invalidate_cache(db, cluster_id)
+    await db.run_sync(invalidate_cache, cluster_id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
     return result
 
@@ -511,7 +528,8 @@ async def run_preflight_check(
     cluster_id: int,
     analyze: bool = False,
     target_version: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cluster: Cluster = Depends(get_cluster_dep),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Run upgrade readiness pre-flight check on cluster (async/job-based)
@@ -534,10 +552,6 @@ async def run_preflight_check(
     from app.services.preflight_background_service import run_preflight_check_background
 
     # Validate cluster exists
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-
     # Validate kubeconfig
     if not cluster.kubeconfig:
         raise HTTPException(
@@ -553,8 +567,7 @@ async def run_preflight_check(
         )
 
     # Validate nodes exist
-    nodes = db.query(Node).filter(Node.cluster_id == cluster_id).all()
-    if not nodes:
+    if not cluster.cluster_nodes:
         raise HTTPException(status_code=400, detail="No nodes found for cluster")
 
     # Create job record
@@ -566,8 +579,8 @@ async def run_preflight_check(
         target_version=target_version
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
     # Start background thread
     thread = threading.Thread(
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, undefer
 from typing import List
 from app.database import get_db
-from app.models import Credential, CredentialType
+from app.models import Cluster, Credential, CredentialType
 from app.schemas import (
     CredentialCreate,
     CredentialResponse,
@@ -11,16 +13,18 @@ from app.schemas import (
 )
 from app.services.encryption_service import encrypt_secret, decrypt_secret
 from app.services.access_check_service import run_access_check
+from app.services.response_cache import CREDENTIALS_NAMESPACE, RESPONSE_CACHE_TTL, clear_response_cache
+from fastapi_cache.decorator import cache
 
 router = APIRouter()
 
 @router.post("", response_model=CredentialResponse)
 async def create_credential(
     credential: CredentialCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new SSH credential (encrypted)"""
-    existing = db.query(Credential).filter(Credential.name == credential.name).first()
+    existing = await db.scalar(select(Credential.id).where(Credential.name == credential.name))
     if existing:
         raise HTTPException(status_code=400, detail="Credential name already exists")
 
@@ -35,57 +39,76 @@ async def create_credential(
     )
 
     db.add(new_credential)
-    db.commit()
-    db.refresh(new_credential)
+    await db.commit()
+    await db.refresh(new_credential)
+    await clear_response_cache(CREDENTIALS_NAMESPACE)
 
     return new_credential
 
-@router.get("", response_model=List[CredentialResponse])
-async def list_credentials(db: Session = Depends(get_db)):
+@router.get("", response_model=None, responses={200: {"model": List[CredentialResponse]}})
+@cache(expire=RESPONSE_CACHE_TTL, namespace=CREDENTIALS_NAMESPACE)
+async def list_credentials(db: AsyncSession = Depends(get_db)):
     """List all credentials (without secrets)"""
-    credentials = db.query(Credential).all()
-    return credentials
+    result = await db.scalars(select(Credential).options(raiseload("*")))
+    # Rows are trusted - skip per-field validation on the list path
+    return [CredentialResponse.from_row(c) for c in result.all()]
 
 @router.get("/{credential_id}", response_model=CredentialResponse)
-async def get_credential(credential_id: int, db: Session = Depends(get_db)):
+@cache(expire=RESPONSE_CACHE_TTL, namespace=CREDENTIALS_NAMESPACE)
+async def get_credential(credential_id: int, db: AsyncSession = Depends(get_db)):
     """Get credential details (without secret)"""
-    credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    credential = await db.scalar(
+        select(Credential).options(raiseload("*")).where(Credential.id == credential_id)
+    )
     if not credential:
         raise HTTPException(status_code=404, detail="Credential not found")
-    return credential
+    return CredentialResponse.model_validate(credential)
 
 @router.delete("/{credential_id}")
-async def delete_credential(credential_id: int, db: Session = Depends(get_db)):
+async def delete_credential(credential_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a credential"""
-    credential = db.query(Credential).filter(Credential.id == credential_id).first()
+    credential = await db.scalar(select(Credential).where(Credential.id == credential_id))
     if not credential:
         raise HTTPException(status_code=404, detail="Credential not found")
 
-    # Check if credential is in use
-    if credential.clusters:
+    # Check if credential is in use (count in SQL instead of loading every cluster row)
+    cluster_count = await db.scalar(
+        select(func.count()).select_from(Cluster).where(Cluster.credential_id == credential_id)
+    )
+    if cluster_count:
         raise HTTPException(
             status_code=400,
-            detail=f"Credential is in use by {len(credential.clusters)} cluster(s)"
+            detail=f"Credential is in use by {cluster_count} cluster(s)"
         )
 
-    db.delete(credential)
-    db.commit()
+    await db.delete(credential)
+    await db.commit()
+    await clear_response_cache(CREDENTIALS_NAMESPACE)
+
+    # Key files of this credential's jobs left on the shared volume
+    from app.services.ansible_service import remove_credential_ssh_keys
+    remove_credential_ssh_keys(credential_id)
+
     return {"message": "Credential deleted"}
 
 @router.post("/test-access", response_model=AccessCheckResponse)
 async def test_access(
     request: AccessCheckRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Test SSH access to hosts using a credential
-    Runs check_access.yml playbook
+    Probes all hosts concurrently over SSH (connectivity, sudo, OS)
     """
-    credential = db.query(Credential).filter(Credential.id == request.credential_id).first()
+    credential = await db.scalar(
+        select(Credential)
+        .options(undefer(Credential.encrypted_secret))
+        .where(Credential.id == request.credential_id)
+    )
     if not credential:
         raise HTTPException(status_code=404, detail="Credential not found")
 
-    # Run access check in background
+    # Run access check
     result = await run_access_check(credential, request.hosts)
     return result
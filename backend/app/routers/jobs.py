@@ -1,58 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+import os
+import signal
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from uuid import uuid4
 from sse_starlette.sse import EventSourceResponse
-from app.database import get_db
+from starlette.concurrency import iterate_in_threadpool
+from app.celery_app import celery_app
+from app.database import get_db, AsyncSessionLocal
 from app.models import Cluster, Job, JobStatus
 from app.schemas import JobResponse, JobDetail, UpgradeReadinessRequest
 from app.services.ansible_service import execute_install_playbook, execute_uninstall_playbook
 from app.services.readiness_service import run_upgrade_readiness_check
-from app.services.cluster_lock_service import acquire_cluster_lock, release_cluster_lock
+from app.services.llm_service import stream_upgrade_summary
+from app.services.cluster_lock_service import create_locked_job, enqueue_job
+from app.services.response_cache import CLUSTERS_NAMESPACE, clear_response_cache
+from app.services.job_stream import notify_job_update, subscribe, unsubscribe, wait_for_job_update
 
 router = APIRouter()
 
 @router.post("/install/{cluster_id}", response_model=JobResponse)
 async def install_cluster(
     cluster_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Execute RKE2 installation playbook for a cluster"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+    cluster = await db.get(Cluster, cluster_id)
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
 
     if cluster.cluster_type != "new":
         raise HTTPException(status_code=400, detail="Can only install new clusters")
 
-    # Create job first (need job_id for lock)
-    job = Job(cluster_id=cluster_id, job_type="install", status=JobStatus.PENDING)
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    try:
-        # Acquire cluster lock
-        acquire_cluster_lock(db, cluster_id, job.id, "install")
-    except HTTPException:
-        # Lock failed - clean up job
-        db.delete(job)
-        db.commit()
-        raise
+    # Create the job and take the cluster lock in one transaction
+    job = await db.run_sync(create_locked_job, cluster_id, "install", "install")
 
-    # Execute in background
-    background_tasks.add_task(execute_install_playbook, job.id)
+    # Execute on a Celery worker
+    await db.run_sync(enqueue_job, job, execute_install_playbook, job.id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
     return job
 
 @router.post("/upgrade-check", response_model=JobResponse)
 async def check_upgrade_readiness(
     request: UpgradeReadinessRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Run upgrade readiness check on a registered cluster"""
-    cluster = db.query(Cluster).filter(Cluster.id == request.cluster_id).first()
+    cluster = await db.get(Cluster, request.cluster_id)
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
 
@@ -63,14 +60,15 @@ async def check_upgrade_readiness(
     job = Job(
         cluster_id=cluster.id,
         job_type="upgrade_check",
-        status=JobStatus.PENDING
+        status=JobStatus.PENDING,
+        task_id=uuid4().hex
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
-    # Execute in background
-    background_tasks.add_task(run_upgrade_readiness_check, job.id)
+    # Execute on a Celery worker
+    await db.run_sync(enqueue_job, job, run_upgrade_readiness_check, job.id)
 
     return job
 
@@ -78,11 +76,10 @@ async def check_upgrade_readiness(
 async def uninstall_cluster(
     cluster_id: int,
     confirmation: str,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Uninstall RKE2 from all cluster nodes - requires confirmation"""
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+    cluster = await db.get(Cluster, cluster_id)
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
 
@@ -96,72 +93,68 @@ async def uninstall_cluster(
             detail=f"Confirmation failed. Please type the exact cluster name: {cluster.name}"
         )
 
-    # Create job first (need job_id for lock)
-    job = Job(cluster_id=cluster_id, job_type="uninstall", status=JobStatus.PENDING)
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    try:
-        # Acquire cluster lock
-        acquire_cluster_lock(db, cluster_id, job.id, "uninstall")
-    except HTTPException:
-        # Lock failed - clean up job
-        db.delete(job)
-        db.commit()
-        raise
+    # Create the job and take the cluster lock in one transaction
+    job = await db.run_sync(create_locked_job, cluster_id, "uninstall", "uninstall")
 
-    # Execute in background
-    background_tasks.add_task(execute_uninstall_playbook, job.id)
+    # Execute on a Celery worker
+    await db.run_sync(enqueue_job, job, execute_uninstall_playbook, job.id)
+    await clear_response_cache(CLUSTERS_NAMESPACE)
 
     return job
 
-@router.get("", response_model=List[JobResponse])
+@router.get("", response_model=None, responses={200: {"model": List[JobResponse]}})
 async def list_jobs(
     cluster_id: int = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all jobs, optionally filtered by cluster"""
-    query = db.query(Job)
+    """List jobs newest first (paginated), optionally filtered by cluster"""
+    # Only the listed columns - skips loading output/readiness_json and ORM hydration
+    query = select(*(getattr(Job, name) for name in JobResponse.model_fields))
     if cluster_id:
-        query = query.filter(Job.cluster_id == cluster_id)
+        query = query.where(Job.cluster_id == cluster_id)
 
-    jobs = query.order_by(Job.created_at.desc()).all()
-    return jobs
+    rows = await db.execute(
+        query.order_by(Job.created_at.desc()).limit(limit).offset(offset)
+    )
+    # Rows are trusted - skip per-field validation on the list path
+    return [JobResponse.from_row(row) for row in rows]
 
-@router.get("/{job_id}", response_model=JobDetail)
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+@router.get("/{job_id}", response_model=None, responses={200: {"model": JobDetail}})
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """Get job details including output"""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return JobDetail.from_row(job)
 
 @router.post("/{job_id}/terminate")
-async def terminate_job(job_id: int, db: Session = Depends(get_db)):
+async def terminate_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """Terminate a running job"""
-    import signal
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if job.status != JobStatus.RUNNING:
         raise HTTPException(status_code=400, detail="Job is not running")
 
-    if not job.process_id:
-        raise HTTPException(status_code=400, detail="No process ID found for job")
+    if not job.task_id and not job.process_id:
+        raise HTTPException(status_code=400, detail="No task or process ID found for job")
 
     try:
-        # Kill the process
-        import os
-        os.kill(job.process_id, signal.SIGTERM)
+        if job.task_id:
+            # The task runs on a Celery worker - signal it there, from any web worker
+            celery_app.control.revoke(job.task_id, terminate=True, signal="SIGTERM")
+        else:
+            os.kill(job.process_id, signal.SIGTERM)
 
         # Update job status
         job.status = JobStatus.FAILED
         job.output = (job.output or "") + "\n\n[Job terminated by user]"
-        from datetime import datetime
         job.completed_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
+        notify_job_update(job_id)
 
         return {"message": f"Job {job_id} terminated successfully"}
     except ProcessLookupError:
@@ -173,33 +166,68 @@ async def terminate_job(job_id: int, db: Session = Depends(get_db)):
 async def stream_job_output(job_id: int):
     """Stream job output via SSE"""
     # Verify job exists
-    from app.database import SessionLocal
-    with SessionLocal() as db:
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
+    async with AsyncSessionLocal() as db:
+        exists = await db.scalar(select(Job.id).where(Job.id == job_id))
+        if not exists:
             raise HTTPException(status_code=404, detail="Job not found")
 
     async def event_generator():
-        # Simple polling implementation - in production use proper event system
-        import asyncio
+        # Event-driven: wake only when the executor reports an update
+        event = subscribe(job_id)
         last_length = 0
 
-        while True:
-            # Create a new session for each query to avoid detached instance errors
-            with SessionLocal() as db:
-                job = db.query(Job).filter(Job.id == job_id).first()
-                if not job:
-                    break
+        try:
+            while True:
+                # Fetch only the output appended since the last update, not the whole column
+                async with AsyncSessionLocal() as db:
+                    row = (await db.execute(
+                        select(func.substr(Job.output, last_length + 1), Job.status)
+                        .where(Job.id == job_id)
+                    )).first()
+                    if not row:
+                        break
+
+                    tail, status = row
+                    if tail:
+                        yield {"data": tail}
+                        last_length += len(tail)
+
+                    if status in [JobStatus.SUCCESS, JobStatus.FAILED]:
+                        yield {"data": f"\n[Job {status.value}]"}
+                        break
+
+                await wait_for_job_update(event)
+        finally:
+            unsubscribe(job_id, event)
 
-                if job.output and len(job.output) > last_length:
-                    new_output = job.output[last_length:]
-                    yield {"data": new_output}
-                    last_length = len(job.output)
+    return EventSourceResponse(event_generator())
 
-                if job.status in [JobStatus.SUCCESS, JobStatus.FAILED]:
-                    yield {"data": f"\n[Job {job.status.value}]"}
-                    break
+@router.get("/{job_id}/summary/stream")
+async def stream_upgrade_summary_events(job_id: int):
+    """
+    Regenerate an upgrade check's LLM summary, streamed via SSE as it is generated
 
-            await asyncio.sleep(0.5)
+    Each text delta is one event; the full summary is stored on the job at the end.
+    """
+    async with AsyncSessionLocal() as db:
+        readiness = await db.scalar(select(Job.readiness_json).where(Job.id == job_id))
+    if not readiness:
+        raise HTTPException(status_code=404, detail="Job has no readiness results")
+
+    async def event_generator():
+        parts = []
+        try:
+            # Bedrock's event stream is blocking - read it off the event loop
+            async for text in iterate_in_threadpool(stream_upgrade_summary(readiness)):
+                parts.append(text)
+                yield {"data": text}
+        except Exception as e:
+            yield {"event": "error", "data": f"Error generating LLM summary: {str(e)}"}
+            return
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == job_id).values(llm_summary="".join(parts)))
+            await db.commit()
+        yield {"event": "done", "data": ""}
 
     return EventSourceResponse(event_generator())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.models import ClusterType, JobStatus, CredentialType, NodeRole, NodeStatus
@@ -17,8 +17,12 @@ class CredentialResponse(BaseModel):
     credential_type: CredentialType
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_row(cls, credential) -> "CredentialResponse":
+        """Build from a trusted ORM row without re-validating"""
+        return cls.model_construct(**{name: getattr(credential, name) for name in cls.model_fields})
 
 # Access check schemas
 class HostInput(BaseModel):
@@ -61,8 +65,12 @@ class NodeResponse(BaseModel):
     use_external_ip: bool = False
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_row(cls, node) -> "NodeResponse":
+        """Build from a trusted ORM row without re-validating"""
+        return cls.model_construct(**{name: getattr(node, name) for name in cls.model_fields})
 
 # Cluster schemas
 class ClusterCreateNew(BaseModel):
@@ -120,8 +128,14 @@ class ClusterResponse(BaseModel):
     current_job_id: Optional[int] = None
     operation_locked_by: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_row(cls, cluster) -> "ClusterResponse":
+        """Build from a trusted ORM row (cluster_nodes eager-loaded) without re-validating"""
+        data = {name: getattr(cluster, name) for name in cls.model_fields}
+        data["cluster_nodes"] = [NodeResponse.from_row(n) for n in cluster.cluster_nodes]
+        return cls.model_construct(**data)
 
 # Job schemas
 class JobResponse(BaseModel):
@@ -137,15 +151,18 @@ class JobResponse(BaseModel):
     llm_token_count: Optional[int] = None
     target_version: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_row(cls, job) -> "JobResponse":
+        """Build from a trusted ORM row or column tuple without re-validating"""
+        return cls.model_construct(**{name: getattr(job, name) for name in cls.model_fields})
 
 class JobDetail(JobResponse):
     output: Optional[str]
     readiness_json: Optional[Dict[str, Any]]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Upgrade readiness
 class UpgradeReadinessRequest(BaseModel):
@@ -1,21 +1,18 @@
 from jinja2 import Template
+from typing import Dict
 from app.models import Cluster, NodeRole
+import os
 import yaml
 import secrets
-import string
 
 INVENTORY_TEMPLATE = """[masters]
-{%- for node in nodes %}
-{%- if node.role.value in ['INITIAL_MASTER', 'MASTER'] %}
+{%- for node in masters %}
 {{ node.hostname }} ansible_host={{ node.ansible_ip }} ansible_user={{ username }}
-{%- endif %}
 {%- endfor %}
 
 [workers]
-{%- for node in nodes %}
-{%- if node.role.value == 'WORKER' %}
+{%- for node in workers %}
 {{ node.hostname }} ansible_host={{ node.ansible_ip }} ansible_user={{ username }}
-{%- endif %}
 {%- endfor %}
 
 [k8s_cluster:children]
@@ -23,15 +20,42 @@ masters
 workers
 """
 
+# Compiled once at import instead of on every render
+_INVENTORY_TMPL = Template(INVENTORY_TEMPLATE)
+
+# host_vars config template per node role
+CONFIG_TEMPLATES = {
+    NodeRole.INITIAL_MASTER: "config_initial_master.yaml.j2",
+    NodeRole.MASTER: "config_joining_master.yaml.j2",
+    NodeRole.WORKER: "config_worker.yaml.j2",
+}
+
+# libyaml-backed emitter when PyYAML was built with it
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# host_vars are identical for every node of a role - render them once
+HOST_VARS_YAML = {
+    role: yaml.dump(
+        {"node_role": role.value, "config_template": template},
+        Dumper=YamlDumper,
+        default_flow_style=False
+    )
+    for role, template in CONFIG_TEMPLATES.items()
+}
+
+# Per-group vars never change (rke2_type: server / agent)
+MASTERS_VARS_YAML = yaml.dump({"rke2_type": "server"}, Dumper=YamlDumper, default_flow_style=False)
+WORKERS_VARS_YAML = yaml.dump({"rke2_type": "agent"}, Dumper=YamlDumper, default_flow_style=False)
+
 def generate_token():
     """Generate a random token for RKE2 cluster"""
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(64))
+    # 64 alphanumeric characters from a single urandom read
+    return secrets.token_hex(32)
 
 def generate_ansible_artifacts(cluster: Cluster, output_dir: str):
     """
     Generate Ansible inventory and group_vars matching production structure
-    Now uses cluster.cluster_nodes relationship instead of JSON
+    Uses the cluster's master_nodes / worker_nodes relationships
     """
     # Get username from credential
     username = cluster.credential.username if cluster.credential else "root"
@@ -40,21 +64,22 @@ def generate_ansible_artifacts(cluster: Cluster, output_dir: str):
     if not cluster.rke2_token:
         cluster.rke2_token = generate_token()
 
+    # Role membership comes pre-filtered from SQL
+    masters = cluster.master_nodes
+    workers = cluster.worker_nodes
+    master_ips = [node.internal_ip for node in masters]
+
     # Auto-set API IP to first master if not provided
-    if not cluster.rke2_api_ip:
-        master_nodes = [node for node in cluster.cluster_nodes if node.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]]
-        if master_nodes:
-            cluster.rke2_api_ip = master_nodes[0].internal_ip
+    if not cluster.rke2_api_ip and master_ips:
+        cluster.rke2_api_ip = master_ips[0]
 
     # Generate inventory from Node objects
-    inventory = Template(INVENTORY_TEMPLATE).render(
-        nodes=cluster.cluster_nodes,
+    inventory = _INVENTORY_TMPL.render(
+        masters=masters,
+        workers=workers,
         username=username
     )
 
-    with open(f"{output_dir}/inventory.ini", "w") as f:
-        f.write(inventory)
-
     # Generate group_vars/k8s_cluster.yaml matching production structure
     group_vars = {
         "rke2_data_dir": cluster.rke2_data_dir,
@@ -71,7 +96,6 @@ def generate_ansible_artifacts(cluster: Cluster, output_dir: str):
         group_vars["rke2_additional_sans"] = cluster.rke2_additional_sans
     else:
         # Default: add all master IPs as SANs
-        master_ips = [node.internal_ip for node in cluster.cluster_nodes if node.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]]
         group_vars["rke2_additional_sans"] = master_ips
 
     # Add registry configuration if custom mirror is active
@@ -96,39 +120,27 @@ def generate_ansible_artifacts(cluster: Cluster, output_dir: str):
     if cluster.etcd_image:
         group_vars["etcd_image"] = cluster.etcd_image
 
-    # Create group_vars directory structure
-    import os
-    os.makedirs(f"{output_dir}/group_vars", exist_ok=True)
-    os.makedirs(f"{output_dir}/host_vars", exist_ok=True)
-
-    with open(f"{output_dir}/group_vars/k8s_cluster.yaml", "w") as f:
-        yaml.dump(group_vars, f, default_flow_style=False)
-
-    # Create group_vars for masters (rke2_type: server)
-    masters_vars = {"rke2_type": "server"}
-    with open(f"{output_dir}/group_vars/masters.yaml", "w") as f:
-        yaml.dump(masters_vars, f, default_flow_style=False)
-
-    # Create group_vars for workers (rke2_type: agent)
-    workers_vars = {"rke2_type": "agent"}
-    with open(f"{output_dir}/group_vars/workers.yaml", "w") as f:
-        yaml.dump(workers_vars, f, default_flow_style=False)
-
-    # Create host_vars for each node with role-specific information
-    for node in cluster.cluster_nodes:
-        host_vars = {
-            "node_role": node.role.value,  # INITIAL_MASTER, MASTER, or WORKER
-        }
-
-        # Determine which config template to use based on role
-        if node.role == NodeRole.INITIAL_MASTER:
-            host_vars["config_template"] = "config_initial_master.yaml.j2"
-        elif node.role == NodeRole.MASTER:
-            host_vars["config_template"] = "config_joining_master.yaml.j2"
-        elif node.role == NodeRole.WORKER:
-            host_vars["config_template"] = "config_worker.yaml.j2"
-
-        with open(f"{output_dir}/host_vars/{node.hostname}.yaml", "w") as f:
-            yaml.dump(host_vars, f, default_flow_style=False)
+    # Render the whole tree in memory, then write it out in one pass
+    artifacts = {
+        "inventory.ini": inventory,
+        "group_vars/k8s_cluster.yaml": yaml.dump(group_vars, Dumper=YamlDumper, default_flow_style=False),
+        "group_vars/masters.yaml": MASTERS_VARS_YAML,
+        "group_vars/workers.yaml": WORKERS_VARS_YAML,
+    }
+
+    # host_vars for each node with role-specific information
+    for node in masters + workers:
+        artifacts[f"host_vars/{node.hostname}.yaml"] = HOST_VARS_YAML[node.role]
+
+    write_artifacts(output_dir, artifacts)
 
     return output_dir
+
+def write_artifacts(output_dir: str, artifacts: Dict[str, str]):
+    """Write rendered artifacts (relative path -> content), creating each directory once"""
+    for directory in {os.path.dirname(path) for path in artifacts}:
+        os.makedirs(os.path.join(output_dir, directory), exist_ok=True)
+
+    for path, content in artifacts.items():
+        with open(os.path.join(output_dir, path), "w") as f:
+            f.write(content)
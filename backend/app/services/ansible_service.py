@@ -1,658 +1,801 @@
+import codecs
+import glob
 import subprocess
-import tempfile
+import io
+import logging
 import os
-import yaml
+import re
+import select
+import threading
+import tarfile
+import time
+import docker
+import orjson
 from datetime import datetime
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.orm.attributes import flag_modified
+from celery.signals import task_revoked, worker_ready
+from app.celery_app import celery_app
 from app.database import SessionLocal
-from app.models import Job, JobStatus, Cluster, Node, NodeRole, NodeStatus
+from app.models import Job, JobStatus, Cluster, Credential, Node, NodeRole, NodeStatus
+from app.services.ansible_generator import HOST_VARS_YAML
 from app.services.encryption_service import decrypt_secret
-from app.services.cluster_lock_service import release_cluster_lock, update_installation_stage
-
-def prepare_ssh_key(secret: str) -> str:
-    """
-    Prepare SSH key content for Ansible usage
-    - Cleans up whitespace
-    - Ensures proper line endings
-    - Returns cleaned key content
+from app.services.cluster_lock_service import (
+    release_cluster_lock,
+    release_cluster_lock_for_job,
+    update_installation_stage
+)
+from app.services.job_stream import notify_job_update
+from app.services.response_cache import CLUSTERS_NAMESPACE, clear_response_cache_sync
+
+logger = logging.getLogger(__name__)
+
+ANSIBLE_RUNNER_CONTAINER = "rke2-automation-ansible-runner-1"
+
+# One Docker API client per process - reuses its socket connection instead of
+# spawning a docker CLI process for every exec/copy. Playbooks themselves still
+# run through the docker CLI so their output streams through a local pipe.
+_docker_api = None
+_docker_api_lock = threading.Lock()
+
+def get_docker_api():
+    """Shared low-level Docker API client (containers are addressed by name, so restarts are safe)"""
+    global _docker_api
+    with _docker_api_lock:
+        if _docker_api is None:
+            _docker_api = docker.from_env().api
+        return _docker_api
+
+def runner_exec(cmd: list, check: bool = True):
     """
-    # Decrypt and clean up the key
-    secret = secret.strip()
+    Run a short command in the ansible-runner container.
 
-    # Ensure key ends with newline
-    if not secret.endswith('\n'):
-        secret += '\n'
+    Returns:
+        (exit_code, output)
+    """
+    api = get_docker_api()
+    exec_id = api.exec_create(ANSIBLE_RUNNER_CONTAINER, cmd)["Id"]
+    output = api.exec_start(exec_id).decode(errors="replace")
+    exit_code = api.exec_inspect(exec_id)["ExitCode"]
 
-    return secret
+    if check and exit_code != 0:
+        raise RuntimeError(f"'{' '.join(cmd)}' failed in ansible-runner (exit {exit_code}): {output.strip()}")
+    return exit_code, output
 
-def update_cluster_inventory(cluster: Cluster, nodes: list, operation: str):
+def put_runner_files(directory: str, files: Dict[str, str]):
     """
-    Update main cluster inventory file after scaling operations
+    Write files into the ansible-runner container in a single archive upload.
 
     Args:
-        cluster: Cluster object
-        nodes: List of node dicts with hostname, ip, role
-        operation: "add" or "remove"
+        directory: Target directory; it and any subdirectories are created
+            as needed (its parent must exist)
+        files: Path relative to directory -> content
     """
-    cluster_dir = f"/ansible/clusters/{cluster.name}"
-    inventory_path = f"{cluster_dir}/inventory.ini"
-
-    # Read current inventory from container
-    result = subprocess.run([
-        "docker", "exec", "rke2-automation-ansible-runner-1",
-        "cat", inventory_path
-    ], capture_output=True, text=True, check=False)
-
-    if result.returncode != 0:
-        # Inventory doesn't exist yet, skip update
-        return
-
-    inventory_lines = result.stdout.split('\n')
-
-    # Parse existing inventory
-    masters_section = []
-    workers_section = []
-    other_lines = []
-    current_section = None
-
-    for line in inventory_lines:
-        if line.strip() == '[masters]':
-            current_section = 'masters'
-            continue
-        elif line.strip() == '[workers]':
-            current_section = 'workers'
-            continue
-        elif line.strip().startswith('['):
-            current_section = 'other'
-
-        if current_section == 'masters' and line.strip():
-            masters_section.append(line)
-        elif current_section == 'workers' and line.strip():
-            workers_section.append(line)
-        elif current_section == 'other' or current_section is None:
-            other_lines.append(line)
-
-    # Update sections based on operation
-    if operation == "add":
-        for node in nodes:
-            node_line = f"{node['hostname']} ansible_host={node['ip']}"
-            if node['role'] == 'server':
-                if node_line not in masters_section:
-                    masters_section.append(node_line)
-            else:  # agent
-                if node_line not in workers_section:
-                    workers_section.append(node_line)
-
-    elif operation == "remove":
-        hostnames_to_remove = {node['hostname'] for node in nodes}
-        masters_section = [line for line in masters_section
-                          if not any(hostname in line for hostname in hostnames_to_remove)]
-        workers_section = [line for line in workers_section
-                          if not any(hostname in line for hostname in hostnames_to_remove)]
-
-    # Rebuild inventory content
-    new_inventory = "[masters]\n"
-    new_inventory += "\n".join(masters_section) + "\n\n"
-    new_inventory += "[workers]\n"
-    new_inventory += "\n".join(workers_section) + "\n"
-
-    # Add other sections (k8s_cluster, etc.)
-    if '[k8s_cluster:children]' not in new_inventory:
-        new_inventory += "\n[k8s_cluster:children]\nmasters\nworkers\n"
+    parent, base = os.path.split(directory.rstrip("/"))
+    now = int(time.time())
+
+    dirs = {base}
+    for path in files:
+        subdir = os.path.dirname(path)
+        while subdir:
+            dirs.add(f"{base}/{subdir}")
+            subdir = os.path.dirname(subdir)
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        for name in sorted(dirs):
+            info = tarfile.TarInfo(name=name)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            info.mtime = now
+            tar.addfile(info)
+
+        for path, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name=f"{base}/{path}")
+            info.size = len(data)
+            info.mtime = now
+            tar.addfile(info, io.BytesIO(data))
+
+    if not get_docker_api().put_archive(ANSIBLE_RUNNER_CONTAINER, parent, archive.getvalue()):
+        raise RuntimeError(f"Failed to copy files to {directory} in ansible-runner")
+
+def put_runner_file(path: str, content: str):
+    """Write one file into the ansible-runner container from memory (no local temp file)"""
+    put_runner_files(os.path.dirname(path), {os.path.basename(path): content})
+
+# Seconds between SIGTERM and SIGKILL when terminating a playbook
+PLAYBOOK_KILL_GRACE_SECONDS = 5
+# How long an executor waits for the playbook to report its process group
+PLAYBOOK_PGID_WAIT_SECONDS = 10
+
+def runner_pid_path(job_id: int) -> str:
+    """Per-job file the playbook's process group id is written to inside ansible-runner"""
+    return f"/tmp/ansible/job-{job_id}.pid"
+
+def read_runner_pgid(job_id: int) -> Optional[int]:
+    """Process group of a job's playbook in ansible-runner (the pid file is on the shared volume)"""
+    try:
+        with open(runner_pid_path(job_id)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def wait_for_runner_pgid(job_id: int, process: subprocess.Popen) -> Optional[int]:
+    """Wait for a just-started playbook to write its process group id (None if it exits first)"""
+    deadline = time.monotonic() + PLAYBOOK_PGID_WAIT_SECONDS
+    while time.monotonic() < deadline and process.poll() is None:
+        pgid = read_runner_pgid(job_id)
+        if pgid:
+            return pgid
+        time.sleep(0.05)
+    return read_runner_pgid(job_id)
+
+def kill_process_group(pgid: int, grace_seconds: float = PLAYBOOK_KILL_GRACE_SECONDS):
+    """
+    SIGTERM a playbook's process group inside ansible-runner, then SIGKILL
+    whatever is left after the grace period (ansible leaves ssh/python
+    children behind otherwise).
 
-    # Write updated inventory to temp file
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.ini', dir='/tmp/ansible') as f:
-        f.write(new_inventory)
-        temp_inv_path = f.name
+    The playbook runs in the runner's PID namespace and docker exec does not
+    forward signals, so the kill has to run in the runner too.
+    """
+    runner_exec(["sh", "-c", f"kill -TERM -{pgid}"], check=False)
 
-    # Copy to ansible container
-    subprocess.run([
-        "docker", "cp", temp_inv_path,
-        f"rke2-automation-ansible-runner-1:{inventory_path}"
-    ], check=True)
+    def escalate():
+        try:
+            runner_exec(["sh", "-c", f"kill -KILL -{pgid} 2>/dev/null"], check=False)
+        except Exception as e:
+            logger.warning("Failed to SIGKILL playbook process group %s: %s", pgid, e)
 
-    os.remove(temp_inv_path)
+    timer = threading.Timer(grace_seconds, escalate)
+    timer.daemon = True
+    timer.start()
 
-def execute_install_playbook(job_id: int):
+@task_revoked.connect
+def kill_revoked_playbook(request=None, terminated=False, **kwargs):
     """
-    Execute RKE2 installation playbook via ansible-runner container
+    Runs in the worker's main process when terminate_job revokes a task.
+    Killing the pool process alone would leave the playbook running in
+    ansible-runner. The pool process dies with SIGTERM's default action, so
+    run_playbook_job's finally never runs - its cleanup is done here
+    instead: the cluster lock and the job's temp files are released.
     """
-    db = SessionLocal()
-    job = db.query(Job).filter(Job.id == job_id).first()
+    if not terminated or request is None:
+        return
 
+    db = SessionLocal()
     try:
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        db.commit()
-
-        cluster = job.cluster
-        cluster_dir = f"/ansible/clusters/{cluster.name}"
-        playbook_path = "/ansible/playbooks/install_rke2.yml"
-
-        # Prepare credential
-        key_path = None
-        if cluster.credential:
-            secret = decrypt_secret(cluster.credential.encrypted_secret)
-            secret = prepare_ssh_key(secret)
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.pem', dir='/tmp/ansible') as key_file:
-                key_path = key_file.name
-                key_file.write(secret)
-            os.chmod(key_path, 0o600)
-
-        # Execute playbook via docker exec
-        cmd = [
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "ansible-playbook",
-            playbook_path,
-            "-i", f"{cluster_dir}/inventory.ini",
-            "-e", f"cluster_name={cluster.name}",
-            "-e", f"rke2_config={cluster_dir}/rke2-config.yaml"
-        ]
-
-        if key_path:
-            cmd.extend(["--private-key", key_path])
+        job = db.query(Job.id, Job.cluster_id, Job.pgid).filter(Job.task_id == request.id).first()
+        if job is None:
+            return
 
-        # Use Popen for real-time output streaming
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+        # The executor may have been killed before it recorded the pgid
+        pgid = job.pgid or read_runner_pgid(job.id)
+        if pgid:
+            try:
+                kill_process_group(pgid)
+            except Exception as e:
+                logger.warning("Failed to kill playbook of job %s: %s", job.id, e)
 
-        # Store process PID for potential termination
-        job.process_id = process.pid
-        db.commit()
+        if release_cluster_lock_for_job(db, job.cluster_id, job.id):
+            logger.info("Released cluster %s lock held by terminated job %s", job.cluster_id, job.id)
+            clear_response_cache_sync(CLUSTERS_NAMESPACE)
+    finally:
+        db.close()
 
-        # Stream output in real-time
-        output_buffer = []
-        for line in process.stdout:
-            output_buffer.append(line)
-            # Update job output periodically
-            job.output = "".join(output_buffer)
-            db.commit()
+    # Extra vars carry the join token and registry password
+    _remove_temp_file(extra_vars_path(job.id))
+    remove_job_ssh_key(job.id)
+    _remove_temp_file(runner_pid_path(job.id))
+
+# Streamed playbook output is appended to the job at most this often (seconds),
+# or sooner once this many bytes are pending
+OUTPUT_FLUSH_INTERVAL = 0.5
+OUTPUT_FLUSH_CHARS = 4096
+# Largest single read from the playbook's stdout pipe
+OUTPUT_READ_BYTES = 65536
+
+# Built once; only the delta is bound per flush. synchronize_session=False skips
+# matching the statement against the identity map - the loaded Job is never read
+# for output while a playbook streams
+APPEND_JOB_OUTPUT = (
+    update(Job)
+    .where(Job.id == bindparam("job_id"))
+    .values(output=func.coalesce(Job.output, "") + bindparam("chunk"))
+    .execution_options(synchronize_session=False)
+)
+
+def append_job_output(db, job_id: int, text: str):
+    """Append text to Job.output in SQL (only the delta is sent) and notify streams"""
+    db.execute(APPEND_JOB_OUTPUT, {"job_id": job_id, "chunk": text})
+    db.commit()
+    notify_job_update(job_id)
+
+def stream_process_output(db, job_id: int, process: subprocess.Popen):
+    """
+    Stream a playbook's output into Job.output while it runs.
 
-        # Wait for process to complete
-        process.wait()
+    The pipe is polled with select and read in chunks into one bytearray;
+    each flush appends the pending bytes with a single UPDATE, so the
+    database sees tens of small deltas instead of one full rewrite per line.
+    Pending output is also flushed when the playbook goes quiet. Only the
+    current batch is kept in memory - Job.output is the sole full copy.
+    """
+    fd = process.stdout.fileno()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = bytearray()
+    last_flush = time.monotonic()
+    done = False
+
+    while not done:
+        timeout = max(OUTPUT_FLUSH_INTERVAL - (time.monotonic() - last_flush), 0.01)
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if readable:
+            chunk = os.read(fd, OUTPUT_READ_BYTES)
+            done = not chunk
+            pending.extend(chunk)
+
+        if pending and (done or len(pending) >= OUTPUT_FLUSH_CHARS
+                        or time.monotonic() - last_flush >= OUTPUT_FLUSH_INTERVAL):
+            # The incremental decoder holds back a UTF-8 sequence split across reads
+            text = decoder.decode(pending, final=done)
+            pending.clear()
+            if text:
+                append_job_output(db, job_id, text)
+            last_flush = time.monotonic()
+
+def prepare_ssh_key(secret: str) -> bytes:
+    """
+    Prepare SSH key content for Ansible usage
+    - Cleans up whitespace
+    - Ensures proper line endings
+    - Returns cleaned key content as bytes, ready for os.write
+    """
+    key = secret.encode().strip()
+
+    # Stripping always removes the trailing newline the key file needs
+    return key + b'\n'
+
+# Optional image overrides passed to add_node.yml when set on the cluster
+CUSTOM_IMAGE_FIELDS = (
+    "kube_apiserver_image",
+    "kube_controller_manager_image",
+    "kube_proxy_image",
+    "kube_scheduler_image",
+    "pause_image",
+    "runtime_image",
+    "etcd_image",
+)
+
+@dataclass(frozen=True, slots=True)
+class ClusterContext:
+    """
+    Plain snapshot of the cluster fields a playbook run needs.
 
-        # Final update
-        job.output = "".join(output_buffer)
-        job.status = JobStatus.SUCCESS if process.returncode == 0 else JobStatus.FAILED
-        job.completed_at = datetime.utcnow()
+    Executors commit job progress many times while a playbook runs, and each
+    commit expires ORM instances, so reading the Cluster afterwards would
+    reload it. The snapshot is taken once, with the credential, in one SELECT.
+    """
+    id: int
+    name: str
+    cluster_dir: str
+    inventory_path: str
+    rke2_version: str
+    rke2_data_dir: Optional[str]
+    rke2_api_ip: Optional[str]
+    rke2_token: Optional[str]
+    rke2_additional_sans: list
+    cni: Optional[str]
+    custom_registry: Optional[str]
+    custom_mirror: Optional[str]
+    registry_address: list
+    registry_user: Optional[str]
+    registry_password: Optional[str]
+    kubeconfig: Optional[str]
+    custom_images: Dict[str, str]
+    credential_id: Optional[int]
+    ssh_user: Optional[str]
+    encrypted_secret: Optional[str]
+
+def load_cluster_context(db, cluster_id: int) -> ClusterContext:
+    """Load a cluster and its credential (secret included) into a ClusterContext"""
+    cluster = db.query(Cluster).options(
+        joinedload(Cluster.credential).undefer(Credential.encrypted_secret)
+    ).filter(Cluster.id == cluster_id).one()
+    credential = cluster.credential
+    cluster_dir = f"/ansible/clusters/{cluster.name}"
 
-        # Store paths
-        job.playbook_path = playbook_path
-        job.inventory_path = f"{cluster_dir}/inventory.ini"
+    return ClusterContext(
+        id=cluster.id,
+        name=cluster.name,
+        cluster_dir=cluster_dir,
+        inventory_path=f"{cluster_dir}/inventory.ini",
+        rke2_version=cluster.rke2_version,
+        rke2_data_dir=cluster.rke2_data_dir,
+        rke2_api_ip=cluster.rke2_api_ip,
+        rke2_token=cluster.rke2_token,
+        rke2_additional_sans=cluster.rke2_additional_sans or [],
+        cni=cluster.cni,
+        custom_registry=cluster.custom_registry,
+        custom_mirror=cluster.custom_mirror,
+        registry_address=cluster.registry_address or [],
+        registry_user=cluster.registry_user,
+        registry_password=cluster.registry_password,
+        kubeconfig=cluster.kubeconfig,
+        custom_images={
+            name: getattr(cluster, name)
+            for name in CUSTOM_IMAGE_FIELDS
+            if getattr(cluster, name)
+        },
+        credential_id=credential.id if credential else None,
+        ssh_user=credential.username if credential else None,
+        encrypted_secret=credential.encrypted_secret if credential else None,
+    )
+
+SSH_KEY_DIR = "/tmp/ansible"
+SSH_KEY_PREFIX = "rke2-key-"
+
+def ssh_key_path(credential_id: int, job_id: int) -> str:
+    """Per-job key file, named so it can be found by job (terminate) or credential (delete)"""
+    return f"{SSH_KEY_DIR}/{SSH_KEY_PREFIX}{credential_id}-job-{job_id}.pem"
+
+def materialize_ssh_key(job_id: int, credential_id: int, encrypted_secret: str) -> str:
+    """
+    Write a credential's SSH key to the shared /tmp/ansible volume for one
+    job and return its path.
 
-        db.commit()
+    Decrypted and written once per run, whatever the playbook connects to;
+    run_playbook_job's finally removes it (kill_revoked_playbook for a
+    terminated job), so a plaintext key never outlives its job.
+    """
+    key = prepare_ssh_key(decrypt_secret(encrypted_secret))
+    key_path = ssh_key_path(credential_id, job_id)
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, key)
+    finally:
+        os.close(fd)
+    return key_path
 
-        # Update installation stage opportunistically if successful
-        if job.status == JobStatus.SUCCESS:
-            update_installation_stage(db, cluster.id)
+def _remove_temp_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
-    except Exception as e:
-        job.status = JobStatus.FAILED
-        job.output = f"Execution failed: {str(e)}"
-        job.completed_at = datetime.utcnow()
-        db.commit()
+def _ssh_key_files(pattern: str) -> list:
+    return glob.glob(f"{SSH_KEY_DIR}/{SSH_KEY_PREFIX}{pattern}.pem")
 
-    finally:
-        # Release cluster lock
-        release_cluster_lock(db, cluster.id)
+def remove_job_ssh_key(job_id: int):
+    """Delete a job's key file (the credential may have changed since it was written)"""
+    for path in _ssh_key_files(f"*-job-{job_id}"):
+        _remove_temp_file(path)
 
-        # Securely delete credential file
-        if key_path and os.path.exists(key_path):
-            os.remove(key_path)
-        db.close()
+def remove_credential_ssh_keys(credential_id: int):
+    """Delete every key file written for a credential (called when it is deleted)"""
+    for path in _ssh_key_files(f"{credential_id}-job-*"):
+        _remove_temp_file(path)
 
-def execute_uninstall_playbook(job_id: int):
+@worker_ready.connect
+def sweep_stale_ssh_keys(**kwargs):
     """
-    Execute RKE2 uninstallation playbook to remove RKE2 from all nodes
+    Delete key files of jobs that are no longer pending or running - left
+    behind when a worker was killed outright, so its finally never ran
     """
-    db = SessionLocal()
-    job = db.query(Job).filter(Job.id == job_id).first()
+    paths = {}
+    for path in _ssh_key_files("*-job-*"):
+        job_id = path[:-len(".pem")].rpartition("-job-")[2]
+        if job_id.isdigit():
+            paths[int(job_id)] = path
+    if not paths:
+        return
 
+    db = SessionLocal()
     try:
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        db.commit()
+        active = {
+            job_id for (job_id,) in db.query(Job.id).filter(
+                Job.id.in_(paths),
+                Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+            )
+        }
+    finally:
+        db.close()
 
-        cluster = job.cluster
-        cluster_dir = f"/ansible/clusters/{cluster.name}"
-        playbook_path = "/ansible/playbooks/uninstall_rke2.yml"
-
-        # Prepare credential
-        key_path = None
-        if cluster.credential:
-            secret = decrypt_secret(cluster.credential.encrypted_secret)
-            secret = prepare_ssh_key(secret)
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.pem', dir='/tmp/ansible') as key_file:
-                key_path = key_file.name
-                key_file.write(secret)
-            os.chmod(key_path, 0o600)
-
-        # Execute playbook via docker exec
-        cmd = [
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "ansible-playbook",
-            playbook_path,
-            "-i", f"{cluster_dir}/inventory.ini",
-            "-e", f"rke2_data_dir={cluster.rke2_data_dir}"
-        ]
+    for job_id, path in paths.items():
+        if job_id not in active:
+            _remove_temp_file(path)
 
-        if key_path:
-            cmd.extend(["--private-key", key_path])
+# A [masters]/[workers] header and its body, up to the next section header
+INVENTORY_SECTION_RE = re.compile(r"^\[(masters|workers)\][ \t]*(?:\n|\Z)(.*?)(?=^\[|\Z)", re.M | re.S)
 
-        # Use Popen for real-time output streaming
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+def update_cluster_inventory(cluster: ClusterContext, nodes: list, operation: str):
+    """
+    Update main cluster inventory file after scaling operations
 
-        # Store process PID for potential termination
-        job.process_id = process.pid
-        db.commit()
+    Args:
+        cluster: Cluster snapshot
+        nodes: List of node dicts with hostname, ip, role
+        operation: "add" or "remove"
+    """
+    if not nodes:
+        return
 
-        # Stream output in real-time
-        output_buffer = []
-        for line in process.stdout:
-            output_buffer.append(line)
-            # Update job output periodically
-            job.output = "".join(output_buffer)
-            db.commit()
+    inventory_path = cluster.inventory_path
 
-        # Wait for process to complete
-        process.wait()
+    # Read current inventory from container
+    exit_code, current_inventory = runner_exec(["cat", inventory_path], check=False)
 
-        # Final update
-        job.output = "".join(output_buffer)
-        job.status = JobStatus.SUCCESS if process.returncode == 0 else JobStatus.FAILED
-        job.completed_at = datetime.utcnow()
+    if exit_code != 0:
+        # Inventory doesn't exist yet, skip update
+        return
 
-        # Store paths
-        job.playbook_path = playbook_path
-        job.inventory_path = f"{cluster_dir}/inventory.ini"
+    # Parse existing inventory into hostname -> host vars per group
+    sections = {"masters": {}, "workers": {}}
+    for group, body in INVENTORY_SECTION_RE.findall(current_inventory):
+        for line in body.splitlines():
+            hostname, _, host_vars = line.strip().partition(' ')
+            if hostname:
+                sections[group][hostname] = host_vars
+    masters_section = sections["masters"]
+    workers_section = sections["workers"]
+
+    # Update sections based on operation (nothing to write when a retried job
+    # finds the inventory already matching)
+    if operation == "add":
+        changed = False
+        for node in nodes:
+            section = masters_section if node['role'] == 'server' else workers_section
+            host_vars = f"ansible_host={node['ip']}"
+            if section.get(node['hostname']) != host_vars:
+                section[node['hostname']] = host_vars
+                changed = True
+        if not changed:
+            return
 
-        db.commit()
+    elif operation == "remove":
+        changed = False
+        for node in nodes:
+            for section in (masters_section, workers_section):
+                if section.pop(node['hostname'], None) is not None:
+                    changed = True
+        if not changed:
+            return
 
-    except Exception as e:
-        job.status = JobStatus.FAILED
-        job.output = f"Uninstall failed: {str(e)}"
-        job.completed_at = datetime.utcnow()
-        db.commit()
+    # Rebuild inventory content
+    new_inventory = "[masters]\n"
+    new_inventory += "\n".join(f"{h} {v}" for h, v in masters_section.items()) + "\n\n"
+    new_inventory += "[workers]\n"
+    new_inventory += "\n".join(f"{h} {v}" for h, v in workers_section.items()) + "\n"
 
-    finally:
-        # Release cluster lock
-        release_cluster_lock(db, cluster.id)
+    # Add other sections (k8s_cluster, etc.)
+    if '[k8s_cluster:children]' not in new_inventory:
+        new_inventory += "\n[k8s_cluster:children]\nmasters\nworkers\n"
 
-        # Securely delete credential file
-        if key_path and os.path.exists(key_path):
-            os.remove(key_path)
-        db.close()
+    # Write updated inventory to ansible container
+    put_runner_file(inventory_path, new_inventory)
 
-def execute_add_nodes(job_id: int, cluster_id: int, nodes: list):
+@dataclass(frozen=True, slots=True)
+class PlaybookRun:
     """
-    Execute add_node.yml playbook to add new nodes to existing cluster
+    What differs between the playbook executors.
+
+    Attributes:
+        playbook_path: Playbook inside the ansible-runner container
+        inventory_path: Inventory passed with -i
+        extra_vars: Variables passed to ansible-playbook in one JSON file
+        post_success: Called with (db, job_id) after the playbook succeeds
+    """
+    playbook_path: str
+    inventory_path: str
+    extra_vars: Dict[str, Any] = field(default_factory=dict)
+    post_success: Optional[Callable] = None
+
+def run_playbook_job(
+    job_id: int,
+    prepare: Callable[[Session, ClusterContext], PlaybookRun],
+    failure_label: str,
+    cluster_id: Optional[int] = None,
+    update_stage: bool = True
+):
+    """
+    Shared body of the playbook executors.
+
+    Marks the job running, loads the cluster snapshot and lets prepare()
+    upload any files and describe the run. Then runs ansible-playbook in the
+    ansible-runner container, streams its output into the job and releases
+    the cluster lock.
 
     Args:
         job_id: Job ID for tracking
-        cluster_id: Cluster ID
-        nodes: List of node dicts with hostname, ip, role
+        prepare: Builds the PlaybookRun for the loaded cluster
+        failure_label: Prefix of the job output when the run raises
+        cluster_id: Cluster ID (defaults to the job's cluster)
+        update_stage: Recompute the installation stage after a successful run
     """
     db = SessionLocal()
     job = db.query(Job).filter(Job.id == job_id).first()
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+    cluster_id = cluster_id or job.cluster_id
+    vars_path = None
 
     try:
         job.status = JobStatus.RUNNING
         job.started_at = datetime.utcnow()
         db.commit()
 
-        cluster_dir = f"/ansible/clusters/{cluster.name}"
-        playbook_path = "/ansible/playbooks/add_node.yml"
-
-        # Ensure cluster directory exists in ansible container
-        subprocess.run([
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "mkdir", "-p", cluster_dir
-        ], check=True)
-
-        # Create temporary inventory for new nodes
-        inventory_content = "[new_nodes]\n"
-        new_servers = []
-        new_agents = []
-
-        for node in nodes:
-            rke2_type = "server" if node['role'] == 'server' else "agent"
-            inventory_content += f"{node['hostname']} ansible_host={node['ip']} rke2_type={rke2_type}\n"
-            if node['role'] == 'server':
-                new_servers.append(node['hostname'])
-            else:
-                new_agents.append(node['hostname'])
-
-        inventory_content += "\n[new_servers]\n"
-        for hostname in new_servers:
-            inventory_content += f"{hostname}\n"
-
-        inventory_content += "\n[new_agents]\n"
-        for hostname in new_agents:
-            inventory_content += f"{hostname}\n"
-
-        # Write temporary inventory
-        temp_inventory_path = f"{cluster_dir}/add_nodes_inventory.ini"
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.ini', dir='/tmp/ansible') as inv_file:
-            inv_file.write(inventory_content)
-            temp_inv_local = inv_file.name
-
-        # Copy to ansible container
-        subprocess.run([
-            "docker", "cp", temp_inv_local,
-            f"rke2-automation-ansible-runner-1:{temp_inventory_path}"
-        ], check=True)
-        os.remove(temp_inv_local)
-
-        # Create host_vars directory if it doesn't exist
-        subprocess.run([
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "mkdir", "-p", f"{cluster_dir}/host_vars"
-        ], check=True)
-
-        # Create host_vars for new nodes with role-specific config templates
-        # Count existing masters to determine if new servers are joining or initial
-        existing_masters = db.query(Node).filter(
-            Node.cluster_id == cluster_id,
-            Node.role.in_([NodeRole.INITIAL_MASTER, NodeRole.MASTER]),
-            Node.status != NodeStatus.REMOVED
-        ).count()
-
-        for node in nodes:
-            host_vars = {}
-
-            if node['role'] == 'server':
-                # If there are already masters, new servers are joining masters
-                if existing_masters > 0:
-                    host_vars['node_role'] = 'MASTER'
-                    host_vars['config_template'] = 'config_joining_master.yaml.j2'
-                else:
-                    # This is the first master (initial master)
-                    host_vars['node_role'] = 'INITIAL_MASTER'
-                    host_vars['config_template'] = 'config_initial_master.yaml.j2'
-                    existing_masters += 1  # Increment for next iteration
-            else:
-                host_vars['node_role'] = 'WORKER'
-                host_vars['config_template'] = 'config_worker.yaml.j2'
-
-            # Write host_vars file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml', dir='/tmp/ansible') as hv_file:
-                yaml.dump(host_vars, hv_file, default_flow_style=False)
-                temp_hv_local = hv_file.name
-
-            # Copy to ansible container
-            subprocess.run([
-                "docker", "cp", temp_hv_local,
-                f"rke2-automation-ansible-runner-1:{cluster_dir}/host_vars/{node['hostname']}.yaml"
-            ], check=True)
-            os.remove(temp_hv_local)
-
-        # Prepare credential
-        key_path = None
-        if cluster.credential:
-            secret = decrypt_secret(cluster.credential.encrypted_secret)
-            secret = prepare_ssh_key(secret)
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.pem', dir='/tmp/ansible') as key_file:
-                key_path = key_file.name
-                key_file.write(secret)
-            os.chmod(key_path, 0o600)
-
-        # Build ansible-playbook command
-        import json
-        additional_sans = cluster.rke2_additional_sans if cluster.rke2_additional_sans else []
-        registry_address = cluster.registry_address if cluster.registry_address else []
+        cluster = load_cluster_context(db, cluster_id)
+        run = prepare(db, cluster)
 
+        # Execute playbook via docker exec, in its own session inside ansible-runner.
+        # The session leader writes its pid (= the process group id) where
+        # terminate_job can find it, then becomes ansible-playbook
         cmd = [
-            "docker", "exec", "rke2-automation-ansible-runner-1",
+            "docker", "exec", ANSIBLE_RUNNER_CONTAINER,
+            "setsid", "-w", "sh", "-c", f'echo $$ > {runner_pid_path(job_id)}; exec "$@"', "sh",
             "ansible-playbook",
-            playbook_path,
-            "-i", temp_inventory_path,
-            "-e", f"rke2_version={cluster.rke2_version}",
-            "-e", f"rke2_data_dir={cluster.rke2_data_dir}",
-            "-e", f"rke2_api_ip={cluster.rke2_api_ip}",
-            "-e", f"rke2_token={cluster.rke2_token}",
-            "-e", f"cni={cluster.cni or 'canal'}",
-            "-e", f"rke2_additional_sans={json.dumps(additional_sans)}",
-            "-e", f"custom_registry={cluster.custom_registry or 'deactive'}",
-            "-e", f"custom_mirror={cluster.custom_mirror or 'deactive'}",
-            "-e", f"registry_address={json.dumps(registry_address)}",
-            "-e", f"registry_user={cluster.registry_user or ''}",
-            "-e", f"registry_password={cluster.registry_password or ''}",
-            "-e", f"ansible_user={cluster.credential.username}"
+            run.playbook_path,
+            "-i", run.inventory_path
         ]
+        if run.extra_vars:
+            vars_path = write_extra_vars(job_id, run.extra_vars)
+            cmd.extend(["--extra-vars", f"@{vars_path}"])
 
-        # Add custom container images if defined
-        if cluster.kube_apiserver_image:
-            cmd.extend(["-e", f"kube_apiserver_image={cluster.kube_apiserver_image}"])
-        if cluster.kube_controller_manager_image:
-            cmd.extend(["-e", f"kube_controller_manager_image={cluster.kube_controller_manager_image}"])
-        if cluster.kube_proxy_image:
-            cmd.extend(["-e", f"kube_proxy_image={cluster.kube_proxy_image}"])
-        if cluster.kube_scheduler_image:
-            cmd.extend(["-e", f"kube_scheduler_image={cluster.kube_scheduler_image}"])
-        if cluster.pause_image:
-            cmd.extend(["-e", f"pause_image={cluster.pause_image}"])
-        if cluster.runtime_image:
-            cmd.extend(["-e", f"runtime_image={cluster.runtime_image}"])
-        if cluster.etcd_image:
-            cmd.extend(["-e", f"etcd_image={cluster.etcd_image}"])
-
-        if key_path:
-            cmd.extend(["--private-key", key_path])
+        if cluster.credential_id:
+            cmd.extend(["--private-key", materialize_ssh_key(job_id, cluster.credential_id, cluster.encrypted_secret)])
 
         # Use Popen for real-time output streaming
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            bufsize=0
         )
 
-        # Store process PID
+        # Store the docker exec PID and the playbook's process group for termination
         job.process_id = process.pid
+        job.pgid = wait_for_runner_pgid(job_id, process)
         db.commit()
 
-        # Stream output
-        output_buffer = []
-        for line in process.stdout:
-            output_buffer.append(line)
-            job.output = "".join(output_buffer)
-            db.commit()
+        # Stream output in real-time
+        stream_process_output(db, job_id, process)
 
+        # Wait for process to complete
         process.wait()
 
-        # Update main inventory file if successful
-        if process.returncode == 0:
-            try:
-                update_cluster_inventory(cluster, nodes, operation="add")
-            except Exception as e:
-                job.output += f"\n\nWarning: Failed to update main inventory: {str(e)}"
+        if process.returncode == 0 and run.post_success:
+            run.post_success(db, job_id)
 
-        # Final update
-        job.output = "".join(output_buffer)
+        # Final update (output is already in the row)
         job.status = JobStatus.SUCCESS if process.returncode == 0 else JobStatus.FAILED
         job.completed_at = datetime.utcnow()
-        job.playbook_path = playbook_path
-        job.inventory_path = temp_inventory_path
+        job.playbook_path = run.playbook_path
+        job.inventory_path = run.inventory_path
         db.commit()
+        notify_job_update(job_id)
 
     except Exception as e:
+        # Drop whatever the failed step left pending; streamed output is
+        # already committed and is kept - the failure is appended to it
+        db.rollback()
+        append_job_output(db, job_id, f"\n\n{failure_label}: {str(e)}")
         job.status = JobStatus.FAILED
-        job.output = f"Add nodes failed: {str(e)}"
         job.completed_at = datetime.utcnow()
         db.commit()
+        notify_job_update(job_id)
 
     finally:
         # Release cluster lock
         release_cluster_lock(db, cluster_id)
 
         # Update installation stage opportunistically
-        if job.status == JobStatus.SUCCESS:
+        if update_stage and job.status == JobStatus.SUCCESS:
             update_installation_stage(db, cluster_id)
 
-        if key_path and os.path.exists(key_path):
-            os.remove(key_path)
+        # Cached cluster responses carry the lock, stage and node statuses
+        clear_response_cache_sync(CLUSTERS_NAMESPACE)
+
+        # Extra vars carry the join token and registry password
+        if vars_path:
+            _remove_temp_file(vars_path)
+        remove_job_ssh_key(job_id)
+        _remove_temp_file(runner_pid_path(job_id))
         db.close()
 
-def execute_remove_nodes(job_id: int, cluster_id: int, nodes: list):
-    """
-    Execute remove_node.yml playbook to remove nodes from cluster
+def extra_vars_path(job_id: int) -> str:
+    """Per-job extra-vars file, so it can be removed without the executor (see kill_revoked_playbook)"""
+    return f"/tmp/ansible/job-{job_id}-vars.json"
 
-    Args:
-        job_id: Job ID for tracking
-        cluster_id: Cluster ID
-        nodes: List of node dicts with hostname, ip, role
+def write_extra_vars(job_id: int, extra_vars: Dict[str, Any]) -> str:
     """
-    db = SessionLocal()
-    job = db.query(Job).filter(Job.id == job_id).first()
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
-    key_path = None  # Initialize before try block
+    Write playbook variables to a JSON file on the shared /tmp/ansible volume
 
+    Returns:
+        Path to pass as --extra-vars @path (same path inside ansible-runner)
+    """
+    vars_path = extra_vars_path(job_id)
+    fd = os.open(vars_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
     try:
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        db.commit()
-
-        cluster_dir = f"/ansible/clusters/{cluster.name}"
-        playbook_path = "/ansible/playbooks/remove_node.yml"
-
-        # Ensure cluster directory exists in ansible container
-        subprocess.run([
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "mkdir", "-p", cluster_dir
-        ], check=True)
-
-        # Write kubeconfig to temp file for kubectl operations
-        kubeconfig_path = f"{cluster_dir}/kubeconfig_temp.yaml"
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml', dir='/tmp/ansible') as kube_file:
-            kube_file.write(cluster.kubeconfig)
-            temp_kube_local = kube_file.name
-
-        # Copy to ansible container
-        subprocess.run([
-            "docker", "cp", temp_kube_local,
-            f"rke2-automation-ansible-runner-1:{kubeconfig_path}"
-        ], check=True)
-        os.remove(temp_kube_local)
-
-        # Create inventory for nodes to remove
-        inventory_content = "[removed_servers]\n"
-        removed_servers = []
-        removed_agents = []
-        node_names = []
+        os.write(fd, orjson.dumps(extra_vars))
+    finally:
+        os.close(fd)
+    return vars_path
 
-        for node in nodes:
-            if node['role'] == 'server':
-                removed_servers.append(node)
-                inventory_content += f"{node['hostname']} ansible_host={node['ip']}\n"
+def sync_main_inventory(cluster: ClusterContext, nodes: list, operation: str, db, job_id: int):
+    """Apply a scaling operation to the main inventory; failures only add a warning to the job"""
+    try:
+        update_cluster_inventory(cluster, nodes, operation=operation)
+    except Exception as e:
+        append_job_output(db, job_id, f"\n\nWarning: Failed to update main inventory: {str(e)}")
+
+def _prepare_install(db, cluster: ClusterContext) -> PlaybookRun:
+    return PlaybookRun(
+        playbook_path="/ansible/playbooks/install_rke2.yml",
+        inventory_path=cluster.inventory_path,
+        extra_vars={
+            "cluster_name": cluster.name,
+            "rke2_config": f"{cluster.cluster_dir}/rke2-config.yaml"
+        }
+    )
+
+def _prepare_uninstall(db, cluster: ClusterContext) -> PlaybookRun:
+    return PlaybookRun(
+        playbook_path="/ansible/playbooks/uninstall_rke2.yml",
+        inventory_path=cluster.inventory_path,
+        extra_vars={"rke2_data_dir": cluster.rke2_data_dir}
+    )
+
+def _prepare_add_nodes(nodes: list, db, cluster: ClusterContext) -> PlaybookRun:
+    cluster_dir = cluster.cluster_dir
+
+    # Create temporary inventory for new nodes
+    inventory_content = "[new_nodes]\n"
+    new_servers = []
+    new_agents = []
+
+    for node in nodes:
+        rke2_type = "server" if node['role'] == 'server' else "agent"
+        inventory_content += f"{node['hostname']} ansible_host={node['ip']} rke2_type={rke2_type}\n"
+        if node['role'] == 'server':
+            new_servers.append(node['hostname'])
+        else:
+            new_agents.append(node['hostname'])
+
+    inventory_content += "\n[new_servers]\n"
+    for hostname in new_servers:
+        inventory_content += f"{hostname}\n"
+
+    inventory_content += "\n[new_agents]\n"
+    for hostname in new_agents:
+        inventory_content += f"{hostname}\n"
+
+    # Temporary inventory and host_vars are uploaded together below
+    runner_files = {"add_nodes_inventory.ini": inventory_content}
+
+    # Create host_vars for new nodes with role-specific config templates
+    # Count existing masters to determine if new servers are joining or initial
+    existing_masters = db.query(Node).filter(
+        Node.cluster_id == cluster.id,
+        Node.role.in_([NodeRole.INITIAL_MASTER, NodeRole.MASTER]),
+        Node.status != NodeStatus.REMOVED
+    ).count()
+
+    for node in nodes:
+        if node['role'] == 'server':
+            # If there are already masters, new servers are joining masters
+            if existing_masters > 0:
+                role = NodeRole.MASTER
             else:
-                removed_agents.append(node)
-            node_names.append(node['hostname'])
-
-        inventory_content += "\n[removed_agents]\n"
-        for node in removed_agents:
+                # This is the first master (initial master)
+                role = NodeRole.INITIAL_MASTER
+                existing_masters += 1  # Increment for next iteration
+        else:
+            role = NodeRole.WORKER
+
+        # Same prerendered per-role host_vars the generator writes
+        runner_files[f"host_vars/{node['hostname']}.yaml"] = HOST_VARS_YAML[role]
+
+    # One upload for the inventory and every host_vars file (creates the directories too)
+    put_runner_files(cluster_dir, runner_files)
+
+    extra_vars = {
+        "rke2_version": cluster.rke2_version,
+        "rke2_data_dir": cluster.rke2_data_dir,
+        "rke2_api_ip": cluster.rke2_api_ip,
+        "rke2_token": cluster.rke2_token,
+        "cni": cluster.cni or 'canal',
+        "rke2_additional_sans": cluster.rke2_additional_sans,
+        "custom_registry": cluster.custom_registry or 'deactive',
+        "custom_mirror": cluster.custom_mirror or 'deactive',
+        "registry_address": cluster.registry_address,
+        "registry_user": cluster.registry_user or '',
+        "registry_password": cluster.registry_password or '',
+        "ansible_user": cluster.ssh_user,
+        # Custom container images, only those defined
+        **cluster.custom_images,
+    }
+
+    return PlaybookRun(
+        playbook_path="/ansible/playbooks/add_node.yml",
+        inventory_path=f"{cluster_dir}/add_nodes_inventory.ini",
+        extra_vars=extra_vars,
+        post_success=partial(sync_main_inventory, cluster, nodes, "add")
+    )
+
+def _prepare_remove_nodes(nodes: list, db, cluster: ClusterContext) -> PlaybookRun:
+    cluster_dir = cluster.cluster_dir
+
+    # Create inventory for nodes to remove
+    inventory_content = "[removed_servers]\n"
+    removed_agents = []
+    node_names = []
+
+    for node in nodes:
+        if node['role'] == 'server':
             inventory_content += f"{node['hostname']} ansible_host={node['ip']}\n"
+        else:
+            removed_agents.append(node)
+        node_names.append(node['hostname'])
+
+    inventory_content += "\n[removed_agents]\n"
+    for node in removed_agents:
+        inventory_content += f"{node['hostname']} ansible_host={node['ip']}\n"
+
+    # Kubeconfig for kubectl operations, uploaded with the inventory
+    put_runner_files(cluster_dir, {
+        "kubeconfig_temp.yaml": cluster.kubeconfig,
+        "remove_nodes_inventory.ini": inventory_content,
+    })
+
+    return PlaybookRun(
+        playbook_path="/ansible/playbooks/remove_node.yml",
+        inventory_path=f"{cluster_dir}/remove_nodes_inventory.ini",
+        extra_vars={
+            "kubeconfig_path": f"{cluster_dir}/kubeconfig_temp.yaml",
+            "nodes_to_remove": node_names,
+            "rke2_data_dir": cluster.rke2_data_dir,
+            "ansible_user": cluster.ssh_user
+        },
+        post_success=partial(sync_main_inventory, cluster, nodes, "remove")
+    )
+
+@celery_app.task
+def execute_install_playbook(job_id: int):
+    """
+    Execute RKE2 installation playbook via ansible-runner container
+    """
+    run_playbook_job(job_id, _prepare_install, "Execution failed")
 
-        # Write inventory
-        temp_inventory_path = f"{cluster_dir}/remove_nodes_inventory.ini"
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.ini', dir='/tmp/ansible') as inv_file:
-            inv_file.write(inventory_content)
-            temp_inv_local = inv_file.name
-
-        subprocess.run([
-            "docker", "cp", temp_inv_local,
-            f"rke2-automation-ansible-runner-1:{temp_inventory_path}"
-        ], check=True)
-        os.remove(temp_inv_local)
-
-        # Prepare credential
-        if cluster.credential:
-            secret = decrypt_secret(cluster.credential.encrypted_secret)
-            secret = prepare_ssh_key(secret)
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.pem', dir='/tmp/ansible') as key_file:
-                key_path = key_file.name
-                key_file.write(secret)
-            os.chmod(key_path, 0o600)
-
-        # Build ansible-playbook command
-        import json
-        cmd = [
-            "docker", "exec", "rke2-automation-ansible-runner-1",
-            "ansible-playbook",
-            playbook_path,
-            "-i", temp_inventory_path,
-            "-e", f"kubeconfig_path={kubeconfig_path}",
-            "-e", f"nodes_to_remove={json.dumps(node_names)}",
-            "-e", f"rke2_data_dir={cluster.rke2_data_dir}",
-            "-e", f"ansible_user={cluster.credential.username}"
-        ]
-
-        if key_path:
-            cmd.extend(["--private-key", key_path])
-
-        # Use Popen for real-time output streaming
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
-
-        # Store process PID
-        job.process_id = process.pid
-        db.commit()
-
-        # Stream output
-        output_buffer = []
-        for line in process.stdout:
-            output_buffer.append(line)
-            job.output = "".join(output_buffer)
-            db.commit()
-
-        process.wait()
-
-        # Update main inventory file if successful
-        if process.returncode == 0:
-            try:
-                update_cluster_inventory(cluster, nodes, operation="remove")
-            except Exception as e:
-                job.output += f"\n\nWarning: Failed to update main inventory: {str(e)}"
-
-        # Final update
-        job.output = "".join(output_buffer)
-        job.status = JobStatus.SUCCESS if process.returncode == 0 else JobStatus.FAILED
-        job.completed_at = datetime.utcnow()
-        job.playbook_path = playbook_path
-        job.inventory_path = temp_inventory_path
-        db.commit()
+@celery_app.task
+def execute_uninstall_playbook(job_id: int):
+    """
+    Execute RKE2 uninstallation playbook to remove RKE2 from all nodes
+    """
+    run_playbook_job(job_id, _prepare_uninstall, "Uninstall failed", update_stage=False)
 
-    except Exception as e:
-        job.status = JobStatus.FAILED
-        job.output = f"Remove nodes failed: {str(e)}"
-        job.completed_at = datetime.utcnow()
-        db.commit()
+@celery_app.task
+def execute_add_nodes(job_id: int, cluster_id: int, nodes: list):
+    """
+    Execute add_node.yml playbook to add new nodes to existing cluster
 
-    finally:
-        # Release cluster lock
-        release_cluster_lock(db, cluster_id)
+    Args:
+        job_id: Job ID for tracking
+        cluster_id: Cluster ID
+        nodes: List of node dicts with hostname, ip, role
+    """
+    run_playbook_job(job_id, partial(_prepare_add_nodes, nodes), "Add nodes failed", cluster_id=cluster_id)
 
-        # Update installation stage opportunistically
-        if job.status == JobStatus.SUCCESS:
-            update_installation_stage(db, cluster_id)
+@celery_app.task
+def execute_remove_nodes(job_id: int, cluster_id: int, nodes: list):
+    """
+    Execute remove_node.yml playbook to remove nodes from cluster
 
-        if key_path and os.path.exists(key_path):
-            os.remove(key_path)
-        db.close()
+    Args:
+        job_id: Job ID for tracking
+        cluster_id: Cluster ID
+        nodes: List of node dicts with hostname, ip, role
+    """
+    run_playbook_job(job_id, partial(_prepare_remove_nodes, nodes), "Remove nodes failed", cluster_id=cluster_id)
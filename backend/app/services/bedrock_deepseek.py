@@ -3,76 +3,103 @@ DeepSeek R1 Analysis via Amazon Bedrock
 Sends preflight check data to DeepSeek R1 for upgrade readiness analysis
 """
 
-import json
+import io
 import re
 import os
+import heapq
+import hashlib
 import logging
-from typing import Dict, Any, Tuple
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
 import boto3
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from app.database import SessionLocal
+from app.models import AnalysisCache
 from app.services.preflight.analysis_schema import AnalysisResult
+from app.services.preflight.toon import to_toon
 
 
 logger = logging.getLogger(__name__)
 
+# One bedrock-runtime client per process, shared by all threads (boto3 clients
+# are thread-safe). Reuses pooled keep-alive connections instead of a new
+# TLS handshake per analysis; the default pool of 10 would serialize
+# concurrent analyses. Created lazily so Celery's forked workers each build
+# their own.
+BEDROCK_CONFIG = Config(
+    region_name=os.getenv("AWS_REGION", "us-east-1"),
+    max_pool_connections=int(os.getenv("BEDROCK_POOL", "50")),
+    retries={"max_attempts": int(os.getenv("BEDROCK_RETRIES", "5")), "mode": "adaptive"},
+    tcp_keepalive=True,
+    connect_timeout=10,
+    read_timeout=120
+)
+
+# DeepSeek R1 reasoning block, and a JSON object inside a markdown code fence
+THINK_BLOCK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*\})\s*```', re.DOTALL)
+
+# Identical preflight payloads within this window reuse the stored analysis (default: 30 minutes)
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "1800"))
+
+# Analyses currently running on Bedrock, by prompt hash
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+_bedrock_client = None
+_bedrock_client_lock = threading.Lock()
+
+
+def get_bedrock_client():
+    """Shared bedrock-runtime client"""
+    global _bedrock_client
+    with _bedrock_client_lock:
+        if _bedrock_client is None:
+            _bedrock_client = boto3.client("bedrock-runtime", config=BEDROCK_CONFIG)
+        return _bedrock_client
+
 
 class DeepSeekBedrockAnalyzer:
     """Analyzes preflight data using DeepSeek R1 via Amazon Bedrock"""
 
-    SYSTEM_PROMPT = """You are a Senior RKE2 SRE. Analyze the provided Pre-flight Check Data for upgrade readiness.
-
-Output Format: ONLY raw JSON. No markdown, no conversational text outside the JSON.
-Structure:
-{
-  "verdict": "GO" | "NO-GO" | "CAUTION",
-  "reasoning_summary": "Concise summary.",
-  "findings": {
-    "os_layer": ["Finding 1", "Finding 2", ...],
-    "etcd_health": ["Finding 1", ...],
-    "kubernetes_layer": ["Finding 1", ...],
-    "network_layer": ["Finding 1", ...],
-    "workload_safety": ["Finding 1", ...]
-  },
-  "blockers": ["Critical issues"],
-  "risks": ["Warnings"],
-  "action_plan": ["Steps to fix"]
-}
-
-IMPORTANT: The "findings" section must include specific observations for each layer:
-- os_layer: Disk space, memory pressure, system load, swap, time drift, internet connectivity
-- etcd_health: Leader status, DB size, raft lag, defragmentation needs
-- kubernetes_layer: Node readiness, pod crashes, deprecated APIs, PDBs, admission webhooks
-- network_layer: CNI version, ingress controller, network health
+    SYSTEM_PROMPT = """Role: Senior RKE2 SRE. Assess upgrade readiness from the pre-flight DATA.
+
+Input: DATA is TOON - indented "key: value" lines; "name[N]: a,b" = list; "name[N]{f1,f2}:" = table, one comma-separated row per item, e.g. certificates[1]{subject,days_until_expiry}: then "  CN=etcd,12".
+
+Output: ONLY raw JSON, no markdown or text outside it:
+{"verdict": "GO"|"NO-GO"|"CAUTION", "reasoning_summary": "concise",
+ "findings": {"os_layer": [], "etcd_health": [], "kubernetes_layer": [], "network_layer": [], "workload_safety": []},
+ "blockers": ["critical issues"], "risks": ["warnings"], "action_plan": ["steps to fix"]}
+
+Findings per layer (specific observations):
+- os_layer: disk, memory, load, swap, time drift, internet
+- etcd_health: leader, DB size, raft lag, defrag
+- kubernetes_layer: node readiness, pod crashes, deprecated APIs, PDBs, admission webhooks
+- network_layer: CNI version, ingress, network health
 - workload_safety: HostPath volumes, StatefulSets with local PVs
 
-Core Logic:
-- CRITICAL checks -> NO-GO
-- Unhealthy Etcd -> NO-GO
-- Multiple WARNs -> CAUTION
-- CrashLoopBackOff pods -> NO-GO
-- Certificates expiring <30 days -> CAUTION
-- Disk space <20% on /var/lib/rancher/rke2 or / -> CRITICAL -> NO-GO
-- Swap enabled -> CAUTION (best practice violation)
-- Time drift >500ms -> CAUTION
-- OOM events -> WARN
-- Admission webhooks with Fail policy -> CAUTION (may block upgrade)
-- High system load (load_1min > cpu_count * 2) -> WARN
-- Memory pressure >90% -> CRITICAL, >80% -> WARN
-- Deprecated APIs detected -> CRITICAL (must migrate before upgrade)
-- Restrictive PodDisruptionBudgets (minAvailable=100% or maxUnavailable=0) -> WARN (may block drain)
-- High etcd raft lag (>1000) -> WARN (slow disk I/O)
-- Etcd DB size >2GB -> WARN (recommend defrag)
-- Error patterns in RKE2 logs -> WARN
-
-Target Version Compatibility (if target_version provided):
-- Check if OS/Kernel versions are compatible with target RKE2 version
-- RKE2 1.30+ requires Ubuntu 20.04+, RHEL 8+, or equivalent
-- Kubernetes 1.25+ removed PodSecurityPolicy - flag if found
-- Kubernetes 1.26+ removed v1beta1 HorizontalPodAutoscaler
-- Compare deprecated APIs against target version's removal list
-
-Analyze ALL checks in the data and provide actionable, specific recommendations."""
+Rules:
+- NO-GO: any CRITICAL check; unhealthy etcd; CrashLoopBackOff pods
+- CRITICAL: disk free <20% on /var/lib/rancher/rke2 or /; memory >90%; deprecated APIs (must migrate first)
+- CAUTION: multiple WARNs; certs expiring <30d; swap on; time drift >500ms; webhooks with failurePolicy Fail
+- WARN: OOM events; load_1min > 2x cpu_count; memory >80%; PDB minAvailable=100% or maxUnavailable=0 (blocks drain); etcd raft lag >1000 (slow disk); etcd DB >2GB (defrag); error patterns in RKE2 logs
+
+Target version (if given):
+- OS/kernel must support it; RKE2 1.30+ needs Ubuntu 20.04+, RHEL 8+ or equivalent
+- K8s 1.25+ removed PodSecurityPolicy; 1.26+ removed HPA v1beta1
+- Check deprecated APIs against its removal list
+
+Analyze ALL checks; give specific, actionable recommendations."""
+
+    # Byte-identical leading block of every prompt; per-call parts (version
+    # context, DATA) only ever follow it, so the prefix stays cacheable on
+    # the server side
+    PROMPT_PREFIX = f"<|begin_of_sentence|><|User|>{SYSTEM_PROMPT}"
 
     def __init__(self):
         """Initialize Bedrock client"""
@@ -82,10 +109,7 @@ Analyze ALL checks in the data and provide actionable, specific recommendations.
         if not self.model_id:
             raise ValueError("BEDROCK_MODEL_ID environment variable not set")
 
-        self.bedrock = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=self.region
-        )
+        self.bedrock = get_bedrock_client()
 
     def _optimize_payload(self, preflight_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,92 +122,87 @@ Analyze ALL checks in the data and provide actionable, specific recommendations.
         Returns:
             Optimized payload with reduced verbosity
         """
-        optimized = preflight_data.copy()
+        # Only the branches trimmed below are copied - the caller's report
+        # (stored as the job's readiness_json) must stay untouched
+        optimized = dict(preflight_data)
 
         # Remove very long lists of healthy pod names (keep only problematic ones)
-        if "kubernetes" in optimized:
-            k8s = optimized["kubernetes"]
+        if optimized.get("kubernetes"):
+            k8s = optimized["kubernetes"] = dict(optimized["kubernetes"])
 
             # Keep only pods with high restart counts (>10)
-            if "kube_system_pod_restarts" in k8s:
+            restarts = k8s.get("kube_system_pod_restarts")
+            if restarts and any(count <= 10 for count in restarts.values()):
                 k8s["kube_system_pod_restarts"] = {
-                    name: count for name, count in k8s["kube_system_pod_restarts"].items()
-                    if count > 10
+                    name: count for name, count in restarts.items() if count > 10
                 }
 
-            # Limit hostpath_workloads to first 20 (avoid overwhelming)
-            if "hostpath_workloads" in k8s and len(k8s["hostpath_workloads"]) > 20:
-                k8s["hostpath_workloads"] = k8s["hostpath_workloads"][:20]
-
-            # Limit statefulsets to first 20
-            if "statefulsets" in k8s and len(k8s["statefulsets"]) > 20:
-                k8s["statefulsets"] = k8s["statefulsets"][:20]
+            # Limit hostpath_workloads and statefulsets to first 20 (avoid overwhelming)
+            for key in ("hostpath_workloads", "statefulsets"):
+                if key in k8s and len(k8s[key]) > 20:
+                    k8s[key] = k8s[key][:20]
 
         # Remove full environment variables from checks (if any)
-        if "checks" in optimized:
-            for check in optimized["checks"]:
-                raw_data = check.get("raw_data", {})
-
-                # Remove env vars if present
-                if "env" in raw_data:
-                    del raw_data["env"]
-
-                # Limit log lines to first 10 lines per error
-                if "errors" in raw_data:
-                    for error in raw_data["errors"]:
-                        if "context_lines" in error and len(error["context_lines"]) > 10:
-                            error["context_lines"] = error["context_lines"][:10]
+        if optimized.get("checks"):
+            optimized["checks"] = [self._optimize_check(check) for check in optimized["checks"]]
 
         # Limit certificates to first 15 (only most critical ones)
         if "certificates" in optimized and len(optimized["certificates"]) > 15:
-            # Sort by days_until_expiry (most urgent first)
-            optimized["certificates"] = sorted(
+            # Most urgent first
+            optimized["certificates"] = heapq.nsmallest(
+                15,
                 optimized["certificates"],
                 key=lambda c: c.get("days_until_expiry", 999)
-            )[:15]
+            )
 
         return optimized
 
-    def _build_payload(self, preflight_data: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _optimize_check(check: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a check without env vars and with error context capped at 10 lines"""
+        raw_data = check.get("raw_data") or {}
+        errors = raw_data.get("errors") or []
+        long_context = any(len(e.get("context_lines") or []) > 10 for e in errors)
+        if "env" not in raw_data and not long_context:
+            return check
+
+        raw_data = {k: v for k, v in raw_data.items() if k != "env"}
+        if long_context:
+            raw_data["errors"] = [
+                {**e, "context_lines": e["context_lines"][:10]} if len(e.get("context_lines") or []) > 10 else e
+                for e in errors
+            ]
+        return {**check, "raw_data": raw_data}
+
+    def _build_payload(self, optimized_data: Dict[str, Any]) -> Dict[str, Any]:
         """Build Bedrock invoke payload for DeepSeek R1
 
         Args:
-            preflight_data: Preflight report JSON
+            optimized_data: Preflight report, already passed through _optimize_payload
 
         Returns:
             Bedrock API payload
         """
-        # Optimize payload to reduce token usage
-        optimized_data = self._optimize_payload(preflight_data)
-
         # Extract target version for enhanced context
         target_version = optimized_data.get("cluster_metadata", {}).get("target_version")
         current_version = optimized_data.get("cluster_metadata", {}).get("rke2_version", "unknown")
 
         # Build enhanced prompt with target version context
-        version_context = ""
         if target_version:
             version_context = f"""
 
-**UPGRADE CONTEXT:**
-- Current RKE2 Version: {current_version}
-- Target RKE2 Version: {target_version}
-- **CRITICAL:** Analyze compatibility between current and target versions
-- Check for deprecated APIs that will be removed in target version
-- Verify OS/Kernel compatibility with target RKE2 version
-- Assess if PodDisruptionBudgets will block the upgrade process
+UPGRADE: {current_version} -> {target_version}. Check version compatibility, deprecated APIs removed in target, OS/kernel support, PDBs that would block the upgrade.
 """
         else:
             version_context = f"""
 
-**GENERAL READINESS CHECK:**
-- Current RKE2 Version: {current_version}
-- No target version specified - perform general health assessment
+GENERAL READINESS: current {current_version}, no target version - assess overall health.
 """
 
         # Format prompt for DeepSeek R1 (Llama-style)
-        json_data = json.dumps(optimized_data, indent=2)
-        prompt = f"<|begin_of_sentence|><|User|>{self.SYSTEM_PROMPT}{version_context}\n\nDATA:\n{json_data}<|Assistant|>"
+        # TOON instead of JSON - uniform lists (certificates, checks) become tables
+        toon_data = to_toon(optimized_data)
+        prompt = f"{self.PROMPT_PREFIX}{version_context}\n\nDATA:\n{toon_data}<|Assistant|>"
 
         return {
             "prompt": prompt,
@@ -192,6 +211,91 @@ Analyze ALL checks in the data and provide actionable, specific recommendations.
             "top_p": 0.9
         }
 
+    def _invoke(self, optimized_data: Dict[str, Any]) -> Tuple[AnalysisResult, int]:
+        """Run one DeepSeek analysis on Bedrock
+
+        Returns:
+            Tuple of (AnalysisResult, token_count)
+        """
+        # Build payload
+        payload = self._build_payload(optimized_data)
+
+        # Invoke Bedrock, receiving the generation as it is produced
+        logger.info(f"Invoking Bedrock model: {self.model_id}")
+        response = self.bedrock.invoke_model_with_response_stream(
+            modelId=self.model_id,
+            body=orjson.dumps(payload)
+        )
+
+        generated_text, input_tokens, output_tokens = self._read_stream(response["body"])
+
+        total_tokens = input_tokens + output_tokens
+        logger.info(f"Token usage - Input: {input_tokens}, Output: {output_tokens}, Total: {total_tokens}")
+
+        if not generated_text:
+            raise ValueError("Empty response from DeepSeek model")
+
+        # Parse DeepSeek-specific response format
+        parsed_json = self._parse_deepseek_response(generated_text)
+
+        # Validate and return as tuple with metrics
+        analysis_result = AnalysisResult(**parsed_json)
+        return (analysis_result, total_tokens)
+
+    def _prompt_hash(self, optimized_data: Dict[str, Any]) -> str:
+        """Cache key for an optimized payload
+
+        collected_at is left out - it differs on every collection and
+        would otherwise make every payload unique.
+        """
+        metadata = optimized_data.get("cluster_metadata") or {}
+        keyed = {
+            **optimized_data,
+            "cluster_metadata": {k: v for k, v in metadata.items() if k != "collected_at"},
+        }
+        digest = hashlib.blake2b(self.model_id.encode())
+        digest.update(orjson.dumps(keyed, option=orjson.OPT_SORT_KEYS))
+        return digest.hexdigest()
+
+    def _get_cached_analysis(self, prompt_hash: str) -> Optional[AnalysisResult]:
+        """Stored analysis for this payload, or None if missing/expired"""
+        db = SessionLocal()
+        try:
+            result_json = db.query(AnalysisCache.result_json).filter(
+                AnalysisCache.prompt_hash == prompt_hash,
+                AnalysisCache.expires_at > datetime.utcnow()
+            ).scalar()
+        finally:
+            db.close()
+
+        if result_json is None:
+            return None
+        return AnalysisResult(**orjson.loads(result_json))
+
+    def _save_cached_analysis(self, prompt_hash: str, result: AnalysisResult, tokens: int):
+        """Store an analysis for reuse; a failed write only costs the cache"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            # Drop expired entries (and a stale copy of this one) before inserting
+            db.query(AnalysisCache).filter(
+                (AnalysisCache.expires_at <= now) | (AnalysisCache.prompt_hash == prompt_hash)
+            ).delete(synchronize_session=False)
+            db.add(AnalysisCache(
+                prompt_hash=prompt_hash,
+                model_id=self.model_id,
+                result_json=orjson.dumps(result.model_dump()).decode(),
+                tokens=tokens,
+                created_at=now,
+                expires_at=now + timedelta(seconds=ANALYSIS_CACHE_TTL)
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not cache analysis: {e}")
+        finally:
+            db.close()
+
     def _parse_deepseek_response(self, response_text: str) -> Dict[str, Any]:
         """Parse DeepSeek R1 response, stripping <think> blocks
 
@@ -208,22 +312,76 @@ Analyze ALL checks in the data and provide actionable, specific recommendations.
             ValueError: If JSON parsing fails
         """
         # Strip <think>...</think> blocks if present
-        cleaned = re.sub(r'<think>.*?</think>', '', response_text, flags=re.DOTALL)
+        cleaned = THINK_BLOCK_RE.sub('', response_text)
         cleaned = cleaned.strip()
 
         # Try to extract JSON if wrapped in markdown code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', cleaned, re.DOTALL)
+        json_match = JSON_FENCE_RE.search(cleaned)
         if json_match:
             cleaned = json_match.group(1)
 
         try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError as e:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON parse error. Raw response length: {len(response_text)}")
             logger.error(f"Cleaned text: {cleaned[:500]}...")
             logger.error(f"Check if <think> block was stripped: {'<think>' in response_text}")
             raise ValueError(f"Failed to parse JSON from DeepSeek response: {e}")
 
+    def _read_stream(self, stream) -> Tuple[str, int, int]:
+        """Collect a streamed Bedrock response
+
+        Each chunk is a JSON fragment of the model's response body; the last
+        one carries amazon-bedrock-invocationMetrics with the token counts.
+
+        Args:
+            stream: EventStream from invoke_model_with_response_stream
+
+        Returns:
+            Tuple of (generated_text, input_tokens, output_tokens)
+
+        Raises:
+            ValueError: Stream error event or unexpected chunk structure
+        """
+        text = io.StringIO()
+        input_tokens = 0
+        output_tokens = 0
+
+        for event in stream:
+            if "chunk" not in event:
+                # modelStreamErrorException, throttlingException, ...
+                raise ValueError(f"Bedrock stream error: {event}")
+
+            chunk = orjson.loads(event["chunk"]["bytes"])
+
+            # DeepSeek on Bedrock typically streams {"generation": "..."}
+            # or {"outputs": [{"text": "..."}]}
+            if "generation" in chunk:
+                text.write(chunk["generation"] or "")
+            elif chunk.get("outputs"):
+                text.write(chunk["outputs"][0].get("text") or "")
+            elif chunk.get("choices"):
+                text.write(chunk["choices"][0].get("text") or "")
+            elif "amazon-bedrock-invocationMetrics" not in chunk:
+                logger.error(f"Unexpected response chunk structure: {list(chunk.keys())}")
+                raise ValueError(f"Cannot find generated text in response. Keys: {list(chunk.keys())}")
+
+            # Llama-style bodies also count tokens themselves (prompt count on the
+            # first chunk, running generation count) - used if metrics are absent
+            if chunk.get("prompt_token_count"):
+                input_tokens = chunk["prompt_token_count"]
+            if chunk.get("generation_token_count"):
+                output_tokens = chunk["generation_token_count"]
+
+            metrics = chunk.get("amazon-bedrock-invocationMetrics")
+            if metrics:
+                input_tokens = metrics.get("inputTokenCount", input_tokens)
+                output_tokens = metrics.get("outputTokenCount", output_tokens)
+                if metrics.get("cacheReadInputTokenCount"):
+                    logger.info(f"Prompt cache read: {metrics['cacheReadInputTokenCount']} input tokens")
+
+        return text.getvalue(), input_tokens, output_tokens
+
     def analyze(self, preflight_data: Dict[str, Any]) -> Tuple[AnalysisResult, str, int]:
         """Analyze preflight check data using DeepSeek R1
 
@@ -238,60 +396,36 @@ Analyze ALL checks in the data and provide actionable, specific recommendations.
             ValueError: Response parsing error
         """
         try:
-            # Build payload
-            payload = self._build_payload(preflight_data)
-
-            # Invoke Bedrock
-            logger.info(f"Invoking Bedrock model: {self.model_id}")
-            response = self.bedrock.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(payload)
-            )
-
-            # Parse response
-            response_body = json.loads(response['body'].read())
-
-            # Extract token usage if available
-            input_tokens = 0
-            output_tokens = 0
-
-            # Try to get token counts from response metadata
-            if "usage" in response_body:
-                input_tokens = response_body["usage"].get("prompt_tokens", 0)
-                output_tokens = response_body["usage"].get("completion_tokens", 0)
-            elif "amazon-bedrock-invocationMetrics" in response.get("ResponseMetadata", {}).get("HTTPHeaders", {}):
-                # Some models report metrics in headers
-                metrics = response["ResponseMetadata"]["HTTPHeaders"].get("amazon-bedrock-invocationMetrics", {})
-                input_tokens = metrics.get("inputTokenCount", 0)
-                output_tokens = metrics.get("outputTokenCount", 0)
-
-            total_tokens = input_tokens + output_tokens
-            logger.info(f"Token usage - Input: {input_tokens}, Output: {output_tokens}, Total: {total_tokens}")
-
-            # Extract generated text (varies by model provider)
-            # DeepSeek on Bedrock typically returns: {"generation": "..."}
-            # or {"outputs": [{"text": "..."}]}
-            generated_text = None
-
-            if "generation" in response_body:
-                generated_text = response_body["generation"]
-            elif "outputs" in response_body and len(response_body["outputs"]) > 0:
-                generated_text = response_body["outputs"][0].get("text")
-            elif "completions" in response_body and len(response_body["completions"]) > 0:
-                generated_text = response_body["completions"][0].get("data", {}).get("text")
-            else:
-                # Fallback: log entire response structure
-                logger.error(f"Unexpected response structure: {list(response_body.keys())}")
-                raise ValueError(f"Cannot find generated text in response. Keys: {list(response_body.keys())}")
-
-            if not generated_text:
-                raise ValueError("Empty response from DeepSeek model")
-
-            # Parse DeepSeek-specific response format
-            parsed_json = self._parse_deepseek_response(generated_text)
-
-            # Validate and return as tuple with metrics
-            analysis_result = AnalysisResult(**parsed_json)
+            # Optimize payload to reduce token usage
+            optimized_data = self._optimize_payload(preflight_data)
+
+            prompt_hash = self._prompt_hash(optimized_data)
+            cached = self._get_cached_analysis(prompt_hash)
+            if cached:
+                logger.info(f"Analysis cache hit: {prompt_hash[:16]}")
+                return (cached, self.model_id, 0)
+
+            # Identical analyses already running (e.g. several tabs starting
+            # preflight on one cluster) share that Bedrock call
+            with _inflight_lock:
+                pending = _inflight.get(prompt_hash)
+                if pending is None:
+                    _inflight[prompt_hash] = future = Future()
+            if pending is not None:
+                logger.info(f"Joining in-flight analysis: {prompt_hash[:16]}")
+                return (pending.result(), self.model_id, 0)
+
+            try:
+                analysis_result, total_tokens = self._invoke(optimized_data)
+                future.set_result(analysis_result)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(prompt_hash, None)
+
+            self._save_cached_analysis(prompt_hash, analysis_result, total_tokens)
             return (analysis_result, self.model_id, total_tokens)
 
         except ClientError as e:
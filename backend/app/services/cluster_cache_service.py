@@ -1,12 +1,31 @@
 from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from app.database import SessionLocal
 from app.models import Cluster, ClusterStatusCache
+from app.services.cluster_status_service import get_cluster_status
+from typing import Optional
+import orjson
 import os
+import threading
 
 # Default TTL: 5 minutes (configurable via env)
 DEFAULT_TTL_SECONDS = int(os.getenv("CLUSTER_CACHE_TTL", "300"))
 
-def get_cached_status(db: Session, cluster_id: int, force_refresh: bool = False) -> dict:
+# Expired entries younger than this are served while a background refresh runs
+STALE_TTL_SECONDS = int(os.getenv("CLUSTER_CACHE_STALE_TTL", "3600"))
+
+# INSERT ... ON CONFLICT constructs of the supported databases
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Clusters with a background refresh in flight (collapses concurrent refreshes)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def get_cached_status(db: Session, cluster_id: int, force_refresh: bool = False) -> Optional[bytes]:
     """
     Get cached cluster status or None if expired/missing
 
@@ -16,11 +35,35 @@ def get_cached_status(db: Session, cluster_id: int, force_refresh: bool = False)
         force_refresh: If True, ignore cache and return None
 
     Returns:
-        Cached data dict or None
+        Cached JSON body (bytes, ready to send) or None
     """
     if force_refresh:
         return None
 
+    # Expiry is checked in SQL (ix_cache_cluster_expires) - an expired row's
+    # blob is never fetched
+    cache = db.query(ClusterStatusCache).filter(
+        ClusterStatusCache.cluster_id == cluster_id,
+        ClusterStatusCache.expires_at >= datetime.utcnow()
+    ).first()
+
+    if not cache:
+        return None
+
+    return _render_cache(cache)
+
+def get_stale_status(db: Session, cluster_id: int, max_age_seconds: Optional[int] = STALE_TTL_SECONDS) -> Optional[bytes]:
+    """
+    Get an expired cache entry (stale-while-revalidate / last-known-good fallback)
+
+    Args:
+        db: Database session
+        cluster_id: Cluster ID
+        max_age_seconds: Oldest collection age accepted (None accepts any age)
+
+    Returns:
+        Cached JSON body (bytes, marked is_stale) or None
+    """
     cache = db.query(ClusterStatusCache).filter(
         ClusterStatusCache.cluster_id == cluster_id
     ).first()
@@ -28,22 +71,27 @@ def get_cached_status(db: Session, cluster_id: int, force_refresh: bool = False)
     if not cache:
         return None
 
-    # Check if cache is expired
-    if datetime.utcnow() > cache.expires_at:
+    if max_age_seconds is not None and cache.collected_at < datetime.utcnow() - timedelta(seconds=max_age_seconds):
         return None
 
-    # Return cached data with metadata
-    return {
-        **cache.cached_data,
-        "_cache_metadata": {
-            "collected_at": cache.collected_at.isoformat(),
-            "expires_at": cache.expires_at.isoformat(),
-            "collection_duration_seconds": cache.collection_duration_seconds,
-            "is_cached": True
-        }
+    return _render_cache(cache, is_stale=datetime.utcnow() > cache.expires_at)
+
+def _render_cache(cache: ClusterStatusCache, is_stale: bool = False) -> bytes:
+    """Splice cache metadata into the stored JSON without re-parsing it"""
+    metadata = {
+        "collected_at": cache.collected_at.isoformat(),
+        "expires_at": cache.expires_at.isoformat(),
+        "collection_duration_seconds": cache.collection_duration_seconds,
+        "is_cached": True
     }
+    if is_stale:
+        metadata["is_stale"] = True
 
-def save_cache(db: Session, cluster_id: int, data: dict, collection_duration: int):
+    body = bytes(cache.cached_data).rstrip()[:-1].rstrip()
+    separator = b"," if body != b"{" else b""
+    return body + separator + b'"_cache_metadata":' + orjson.dumps(metadata) + b"}"
+
+def save_cache(db: Session, cluster_id: int, data: dict, collection_duration: int) -> bytes:
     """
     Save or update cluster status cache
 
@@ -52,32 +100,30 @@ def save_cache(db: Session, cluster_id: int, data: dict, collection_duration: in
         cluster_id: Cluster ID
         data: Aggregated cluster status data
         collection_duration: How long collection took in seconds
+
+    Returns:
+        Serialized JSON body that was stored
     """
+    body = orjson.dumps(data)
     now = datetime.utcnow()
     expires_at = now + timedelta(seconds=DEFAULT_TTL_SECONDS)
 
-    cache = db.query(ClusterStatusCache).filter(
-        ClusterStatusCache.cluster_id == cluster_id
-    ).first()
-
-    if cache:
-        # Update existing cache
-        cache.cached_data = data
-        cache.collected_at = now
-        cache.expires_at = expires_at
-        cache.collection_duration_seconds = collection_duration
-    else:
-        # Create new cache entry
-        cache = ClusterStatusCache(
-            cluster_id=cluster_id,
-            cached_data=data,
-            collected_at=now,
-            expires_at=expires_at,
-            collection_duration_seconds=collection_duration
-        )
-        db.add(cache)
+    values = {
+        "cached_data": body,
+        "collected_at": now,
+        "expires_at": expires_at,
+        "collection_duration_seconds": collection_duration
+    }
 
+    # Single upsert on the cluster_id unique key - no read first, and two
+    # concurrent refreshes can't both insert
+    upsert = UPSERT_INSERTS[db.get_bind().dialect.name](ClusterStatusCache)
+    db.execute(
+        upsert.values(cluster_id=cluster_id, **values)
+        .on_conflict_do_update(index_elements=[ClusterStatusCache.cluster_id], set_=values)
+    )
     db.commit()
+    return body
 
 def invalidate_cache(db: Session, cluster_id: int):
     """
@@ -91,3 +137,40 @@ def invalidate_cache(db: Session, cluster_id: int):
         ClusterStatusCache.cluster_id == cluster_id
     ).delete()
     db.commit()
+
+def refresh_status_cache(cluster_id: int) -> bool:
+    """
+    Collect fresh status and save it to the cache (background refresh)
+
+    Opens its own session. Concurrent refreshes for the same cluster are
+    collapsed into one.
+
+    Returns:
+        True if fresh data was collected and saved
+    """
+    with _refreshing_lock:
+        if cluster_id in _refreshing:
+            return False
+        _refreshing.add(cluster_id)
+
+    db = SessionLocal()
+    try:
+        cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+        if not cluster:
+            return False
+
+        status = get_cluster_status(cluster)
+        if "error" in status or "_collection_duration_seconds" not in status:
+            return False
+
+        collection_duration = status.pop("_collection_duration_seconds")
+        save_cache(db, cluster_id, status, collection_duration)
+
+        # Auto-sync node statuses when we collect fresh data
+        from app.services.node_sync_service import auto_sync_on_inspection
+        auto_sync_on_inspection(db, cluster_id)
+        return True
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(cluster_id)
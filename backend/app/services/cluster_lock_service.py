@@ -5,12 +5,21 @@ Provides cluster-level operation locking to prevent concurrent operations
 and implements safety guardrails before executing operations.
 """
 
+from sqlalchemy import and_, func, or_, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from datetime import datetime
-from app.models import Cluster, Node, NodeRole, NodeStatus, Job
+from app.models import Cluster, Node, NodeRole, NodeStatus, Job, JobStatus
 from typing import Optional, List, Dict, Tuple
-import socket
+from uuid import uuid4
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# RKE2 supervisor port probed on the initial master, and the probe's timeout (seconds)
+RKE2_SUPERVISOR_PORT = 9345
+RKE2_PROBE_TIMEOUT = 0.5
 
 
 class ClusterLockError(Exception):
@@ -26,12 +35,15 @@ class GuardrailError(Exception):
 def acquire_cluster_lock(
     db: Session,
     cluster_id: int,
-    job_id: int,
+    job_id: Optional[int],
     operation_type: str
-) -> Cluster:
+) -> int:
     """
     Acquire exclusive lock on cluster for an operation.
 
+    The check and the write are one conditional UPDATE ... RETURNING, so two
+    workers can never both see the cluster as idle.
+
     Args:
         db: Database session
         cluster_id: Cluster to lock
@@ -39,34 +51,99 @@ def acquire_cluster_lock(
         operation_type: Type of operation (install/scale_add/scale_remove/uninstall)
 
     Returns:
-        Locked cluster object
+        Locked cluster ID
 
     Raises:
         HTTPException(409) if cluster is already locked
     """
-    # Use SELECT FOR UPDATE to prevent race conditions
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).with_for_update().first()
+    locked_id = db.execute(
+        update(Cluster)
+        .where(
+            Cluster.id == cluster_id,
+            or_(Cluster.operation_status.is_(None), Cluster.operation_status != "running")
+        )
+        .values(
+            operation_status="running",
+            current_job_id=job_id,
+            operation_started_at=datetime.utcnow(),
+            operation_locked_by=operation_type
+        )
+        .returning(Cluster.id)
+    ).scalar()
 
-    if not cluster:
-        raise HTTPException(status_code=404, detail=f"Cluster {cluster_id} not found")
+    if locked_id is None:
+        db.rollback()
+        cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+
+        if not cluster:
+            raise HTTPException(status_code=404, detail=f"Cluster {cluster_id} not found")
 
-    # Check if already locked
-    if cluster.operation_status == "running":
         raise HTTPException(
             status_code=409,
             detail=f"Cluster is busy with operation '{cluster.operation_locked_by}' (job {cluster.current_job_id}). Please wait for it to complete."
         )
 
-    # Acquire lock
-    cluster.operation_status = "running"
-    cluster.current_job_id = job_id
-    cluster.operation_started_at = datetime.utcnow()
-    cluster.operation_locked_by = operation_type
-
     db.commit()
-    db.refresh(cluster)
 
-    return cluster
+    return locked_id
+
+
+def create_locked_job(
+    db: Session,
+    cluster_id: int,
+    job_type: str,
+    operation_type: str
+) -> Job:
+    """
+    Create a job and acquire the cluster lock for it in one transaction.
+
+    The job is flushed to get its id, then the lock UPDATE runs in the same
+    transaction and commits both together. If the lock is not won, its
+    rollback discards the pending job too, so no orphan job is left behind.
+    The Celery task id is chosen up front and committed with the job (see
+    enqueue_job).
+
+    Callers must have verified the cluster exists.
+
+    Raises:
+        HTTPException(409) if cluster is already locked
+    """
+    job = Job(
+        cluster_id=cluster_id,
+        job_type=job_type,
+        status=JobStatus.PENDING,
+        task_id=uuid4().hex
+    )
+    db.add(job)
+    db.flush()
+
+    acquire_cluster_lock(db, cluster_id, job.id, operation_type)
+
+    return job
+
+
+def enqueue_job(db: Session, job: Job, task, *args):
+    """
+    Queue a committed job on its Celery task, under the job's task id.
+
+    The task id is already stored, so the worker, terminate_job and
+    kill_revoked_playbook can find the job as soon as it is queued. If the
+    broker is unreachable the job is failed and its cluster lock released -
+    a lock held by a PENDING job is never taken over otherwise.
+
+    Raises:
+        HTTPException(503) if the task could not be queued
+    """
+    try:
+        task.apply_async(args=args, task_id=job.task_id)
+    except Exception as e:
+        logger.warning("Failed to queue job %s: %s", job.id, e)
+        job.status = JobStatus.FAILED
+        job.output = f"Failed to queue job: {e}"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+        release_cluster_lock_for_job(db, job.cluster_id, job.id)
+        raise HTTPException(status_code=503, detail="Job queue is unavailable - the operation was not started")
 
 
 def release_cluster_lock(db: Session, cluster_id: int):
@@ -87,46 +164,74 @@ def release_cluster_lock(db: Session, cluster_id: int):
         db.commit()
 
 
-def check_bootstrap_prerequisite(db: Session, cluster_id: int) -> Tuple[bool, Optional[str]]:
+def release_cluster_lock_for_job(db: Session, cluster_id: int, job_id: int) -> bool:
     """
-    G1: Check if initial_master is active before allowing joins.
+    Release the cluster lock if job_id still holds it.
+
+    For jobs that end outside their executor's finally (terminated, or
+    never started), where another job may already own the cluster.
 
     Returns:
-        (is_valid, error_message)
+        True if the lock was held by job_id and released
     """
-    cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
+    released = db.execute(
+        update(Cluster)
+        .where(Cluster.id == cluster_id, Cluster.current_job_id == job_id)
+        .values(
+            operation_status="idle",
+            current_job_id=None,
+            operation_started_at=None,
+            operation_locked_by=None
+        )
+        .returning(Cluster.id)
+    ).scalar()
+    db.commit()
+    return released is not None
 
-    # Find initial master
-    initial_master = db.query(Node).filter(
-        Node.cluster_id == cluster_id,
-        Node.role == NodeRole.INITIAL_MASTER
-    ).first()
 
+def validate_initial_master(initial_master: Optional[Node]) -> Tuple[bool, Optional[str]]:
+    """
+    G1: Validate an already-loaded initial master.
+
+    Returns:
+        (is_valid, error_message)
+    """
     if not initial_master:
         return False, "No initial master found. Cannot add joining masters or workers until initial master is created."
 
     if initial_master.status != NodeStatus.ACTIVE:
         return False, f"Initial master '{initial_master.hostname}' is not active (status: {initial_master.status.value}). Cannot add nodes until initial master is fully operational."
 
-    # Best-effort connectivity check (check if RKE2 API port is reachable)
-    # This is optional - don't block on connectivity issues (could be firewall, network, etc.)
-    if cluster.rke2_api_ip:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex((cluster.rke2_api_ip, 9345))
-            sock.close()
-
-            if result != 0:
-                # Just log warning, don't block the operation
-                print(f"Warning: Initial master API endpoint {cluster.rke2_api_ip}:9345 is not reachable (this may be expected due to firewall)")
-        except Exception as e:
-            # Don't fail on connectivity check errors, just log
-            print(f"Warning: Could not check API connectivity: {str(e)}")
-
     return True, None
 
 
+async def probe_rke2_api(rke2_api_ip: Optional[str]):
+    """
+    Best-effort check that the initial master's RKE2 supervisor port is reachable.
+
+    Only logs a warning - unreachable can be expected (firewall, network), so it
+    never blocks an operation. Runs as a background task after the response.
+    """
+    if not rke2_api_ip:
+        return
+
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(rke2_api_ip, RKE2_SUPERVISOR_PORT),
+            timeout=RKE2_PROBE_TIMEOUT
+        )
+        writer.close()
+        await writer.wait_closed()
+    except (OSError, asyncio.TimeoutError):
+        logger.warning(
+            "Initial master API endpoint %s:%s is not reachable (this may be expected due to firewall)",
+            rke2_api_ip, RKE2_SUPERVISOR_PORT
+        )
+    except Exception as e:
+        # Don't fail on connectivity check errors, just log
+        logger.warning("Could not check API connectivity: %s", e)
+
+
 def check_safe_master_removal(
     db: Session,
     cluster_id: int,
@@ -144,30 +249,30 @@ def check_safe_master_removal(
     Returns:
         (is_valid, error_message)
     """
-    current_nodes = db.query(Node).filter(
+    # Only the control-plane count matters - count in SQL instead of loading every node
+    current_servers = db.query(func.count()).select_from(Node).filter(
         Node.cluster_id == cluster_id,
-        Node.status != NodeStatus.REMOVED
-    ).all()
-
-    current_servers = [n for n in current_nodes if n.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]]
+        Node.status != NodeStatus.REMOVED,
+        Node.role.in_([NodeRole.INITIAL_MASTER, NodeRole.MASTER])
+    ).scalar()
     removing_servers = [n for n in nodes_to_remove if n.get("role") == "server"]
 
     # Check if removing last control-plane
-    if len(current_servers) - len(removing_servers) < 1:
+    if current_servers - len(removing_servers) < 1:
         return False, "Cannot remove all control-plane nodes. At least 1 required."
 
     # Check etcd quorum (simple heuristic)
-    remaining_servers = len(current_servers) - len(removing_servers)
+    remaining_servers = current_servers - len(removing_servers)
 
     # If we'd have less than 3 servers remaining, warn
-    if len(current_servers) > 1 and remaining_servers < 3:
+    if current_servers > 1 and remaining_servers < 3:
         # For 2 remaining servers (even number), strongly discourage
         if remaining_servers == 2:
             return False, f"Removing {len(removing_servers)} server(s) would leave {remaining_servers} servers (even number). This is not recommended for etcd quorum. Consider removing one more or adding another master first."
 
     # Check majority quorum
-    if len(current_servers) > 1 and remaining_servers < (len(current_servers) // 2 + 1):
-        return False, f"Removing {len(removing_servers)} server(s) would break etcd quorum. Need at least {len(current_servers) // 2 + 1} servers."
+    if current_servers > 1 and remaining_servers < (current_servers // 2 + 1):
+        return False, f"Removing {len(removing_servers)} server(s) would break etcd quorum. Need at least {current_servers // 2 + 1} servers."
 
     # Require confirmation for master removal
     if removing_servers and require_confirmation:
@@ -176,36 +281,62 @@ def check_safe_master_removal(
     return True, None
 
 
-def check_node_identity(
+def _find_identity_conflict(
+    nodes_to_add: List[Dict],
+    existing_hostnames: set,
+    existing_ips: set
+) -> Optional[str]:
+    """Return the duplicate-node error for the first clashing node, if any"""
+    for node in nodes_to_add:
+        hostname = node.get('hostname')
+        ip = node.get('ip')
+
+        if hostname in existing_hostnames:
+            return f"Node with hostname '{hostname}' already exists in cluster"
+
+        if ip in existing_ips:
+            return f"Node with IP '{ip}' already exists in cluster"
+
+    return None
+
+
+def preflight_node_additions(
     db: Session,
     cluster_id: int,
     nodes_to_add: List[Dict]
-) -> Tuple[bool, Optional[str]]:
+) -> Tuple[Optional[str], Optional[Node]]:
     """
-    G4: Validate node identity - prevent duplicates.
+    G4 + G1 lookups for a scale-up in a single query.
+
+    Fetches only the active nodes clashing with the requested hostnames/IPs,
+    plus the cluster's initial master.
 
     Returns:
-        (is_valid, error_message)
+        (identity_error, initial_master)
     """
-    existing_nodes = db.query(Node).filter(
+    hostnames = [n.get('hostname') for n in nodes_to_add]
+    ips = [n.get('ip') for n in nodes_to_add]
+
+    rows = db.query(Node).filter(
         Node.cluster_id == cluster_id,
-        Node.status != NodeStatus.REMOVED
+        or_(
+            and_(
+                Node.status != NodeStatus.REMOVED,
+                or_(Node.hostname.in_(hostnames), Node.internal_ip.in_(ips))
+            ),
+            Node.role == NodeRole.INITIAL_MASTER
+        )
     ).all()
 
-    existing_hostnames = {n.hostname for n in existing_nodes}
-    existing_ips = {n.internal_ip for n in existing_nodes}
-
-    for node in nodes_to_add:
-        hostname = node.get('hostname')
-        ip = node.get('ip')
-
-        if hostname in existing_hostnames:
-            return False, f"Node with hostname '{hostname}' already exists in cluster"
-
-        if ip in existing_ips:
-            return False, f"Node with IP '{ip}' already exists in cluster"
+    active = [n for n in rows if n.status != NodeStatus.REMOVED]
+    initial_master = next((n for n in rows if n.role == NodeRole.INITIAL_MASTER), None)
 
-    return True, None
+    error_msg = _find_identity_conflict(
+        nodes_to_add,
+        {n.hostname for n in active},
+        {n.internal_ip for n in active}
+    )
+    return error_msg, initial_master
 
 
 def split_master_worker_additions(
@@ -232,16 +363,21 @@ def update_installation_stage(db: Session, cluster_id: int):
     if not cluster:
         return
 
-    nodes = db.query(Node).filter(
+    # Node counts per (role, status) - a handful of rows instead of every node
+    counts = db.query(Node.role, Node.status, func.count()).filter(
         Node.cluster_id == cluster_id,
         Node.status != NodeStatus.REMOVED
-    ).all()
-
-    masters = [n for n in nodes if n.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]]
-    workers = [n for n in nodes if n.role == NodeRole.WORKER]
-
-    active_masters = [n for n in masters if n.status == NodeStatus.ACTIVE]
-    active_workers = [n for n in workers if n.status == NodeStatus.ACTIVE]
+    ).group_by(Node.role, Node.status).all()
+
+    masters = workers = active_masters = active_workers = 0
+    for role, status, count in counts:
+        active = count if status == NodeStatus.ACTIVE else 0
+        if role == NodeRole.WORKER:
+            workers += count
+            active_workers += active
+        else:
+            masters += count
+            active_masters += active
 
     # Update stage opportunistically
     if not active_masters:
@@ -255,7 +391,7 @@ def update_installation_stage(db: Session, cluster_id: int):
         cluster.installation_stage = "workers_installing"
     elif active_masters and active_workers:
         # Both masters and workers active
-        if len(active_masters) == len(masters) and len(active_workers) == len(workers):
+        if active_masters == masters and active_workers == workers:
             # All nodes active
             cluster.installation_stage = "active"
         else:
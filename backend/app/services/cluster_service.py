@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models import Cluster, ClusterType, Node, NodeRole, NodeStatus
 from app.schemas import ClusterCreateNew, ClusterCreateRegistered
 from app.services.ansible_generator import generate_ansible_artifacts
 import os
+import secrets
 
 def create_new_cluster(db: Session, cluster_data: ClusterCreateNew) -> Cluster:
     """
@@ -19,7 +22,6 @@ def create_new_cluster(db: Session, cluster_data: ClusterCreateNew) -> Cluster:
     # Generate random token if not provided
     token = cluster_data.rke2_token
     if not token:
-        import secrets
         token = secrets.token_urlsafe(32)
 
     # Create cluster without nodes
@@ -53,10 +55,11 @@ def create_new_cluster(db: Session, cluster_data: ClusterCreateNew) -> Cluster:
     )
 
     db.add(cluster)
-    db.commit()
-    db.refresh(cluster)
+    # Flush only - cluster and nodes are committed together below
+    db.flush()
 
     # Create Node records
+    node_rows = []
     first_server = True
     for node_data in cluster_data.nodes:
         # Determine node role
@@ -66,27 +69,29 @@ def create_new_cluster(db: Session, cluster_data: ClusterCreateNew) -> Cluster:
         else:
             role = NodeRole.WORKER
 
-        # Extract IPs - use internal_ip if provided, otherwise fall back to ip
-        internal_ip = getattr(node_data, 'internal_ip', None) or node_data.ip
-        external_ip = getattr(node_data, 'external_ip', None)
-        use_external_ip = getattr(node_data, 'use_external_ip', False)
-
-        node = Node(
-            cluster_id=cluster.id,
-            hostname=node_data.hostname,
-            internal_ip=internal_ip,
-            external_ip=external_ip,
-            role=role,
-            status=NodeStatus.PENDING,
-            use_external_ip=use_external_ip
-        )
-        db.add(node)
+        node_rows.append({
+            "cluster_id": cluster.id,
+            "hostname": node_data.hostname,
+            # Use internal_ip if provided, otherwise fall back to ip
+            "internal_ip": node_data.internal_ip or node_data.ip,
+            "external_ip": node_data.external_ip,
+            "role": role,
+            "status": NodeStatus.PENDING,
+            "use_external_ip": node_data.use_external_ip
+        })
+
+    # One executemany INSERT for all nodes
+    if node_rows:
+        db.execute(insert(Node), node_rows)
 
     db.commit()
 
-    # Force refresh to load cluster_nodes relationship
-    db.expire_all()
-    db.refresh(cluster)
+    # Reload with nodes and role views eager-loaded (the response serializes cluster_nodes)
+    cluster = db.query(Cluster).options(
+        selectinload(Cluster.cluster_nodes),
+        selectinload(Cluster.master_nodes),
+        selectinload(Cluster.worker_nodes)
+    ).filter(Cluster.id == cluster.id).one()
 
     # Generate Ansible inventory and playbooks
     artifacts_dir = f"/ansible/clusters/{cluster.name}"
@@ -109,7 +114,11 @@ def register_cluster(db: Session, cluster_data: ClusterCreateRegistered) -> Clus
 
     db.add(cluster)
     db.commit()
-    db.refresh(cluster)
+
+    # All column defaults are applied client-side and the API session doesn't
+    # expire on commit, so no refresh is needed. A registered cluster starts
+    # without nodes - set that instead of querying for it.
+    set_committed_value(cluster, "cluster_nodes", [])
 
     # Save kubeconfig to filesystem
     kubeconfig_dir = f"/ansible/clusters/{cluster.name}"
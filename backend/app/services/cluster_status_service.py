@@ -1,14 +1,87 @@
-import subprocess
+import hashlib
 import json
-import tempfile
 import os
+import threading
 import time
+import ijson
+import yaml
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+from kubernetes import client, config
 from app.models import Cluster
 
-def get_cluster_status(cluster: Cluster) -> dict:
+KUBE_API_TIMEOUT = 10
+
+# Recent collections are reused for this long (errors included), so a burst of
+# refreshes or the node sync right after a collection don't replay every read
+STATUS_MEMO_TTL_SECONDS = int(os.getenv("CLUSTER_STATUS_MEMO_TTL", "30"))
+STATUS_MEMO_MAX_ENTRIES = 256
+
+# kube-system pod label values, in CNI detection order
+CNI_LABEL = "k8s-app"
+CNI_PODS = {
+    "canal": "canal",
+    "cilium": "cilium",
+    "calico": "calico-node",
+}
+
+COMPONENT_LABEL = "component"
+COMPONENT_PODS = {
+    "etcd": "etcd",
+    "apiserver": "kube-apiserver",
+    "scheduler": "kube-scheduler",
+    "controller_manager": "kube-controller-manager",
+}
+
+# One API client per cluster, with the kubeconfig digest it was built from.
+# Reusing it keeps TLS connections alive between collections instead of a
+# kubectl fork + handshake per read.
+_api_clients = {}
+_api_clients_lock = threading.Lock()
+
+# (cluster id, kubeconfig digest) -> (monotonic expiry, status)
+_status_memo = {}
+_status_memo_lock = threading.Lock()
+
+def get_cluster_status(cluster: Cluster, force_refresh: bool = False) -> dict:
     """
-    Get cluster status using kubectl commands and return aggregated LLM-ready format
+    Get cluster status, reusing a collection from the last STATUS_MEMO_TTL_SECONDS
+
+    Args:
+        cluster: Cluster to inspect
+        force_refresh: If True, skip the memo and always collect
+
+    Returns:
+        Aggregated status (see _collect_cluster_status). Callers get their own
+        top-level dict and may pop keys from it.
+    """
+    key = (cluster.id, _kubeconfig_digest(cluster.kubeconfig))
+
+    if not force_refresh:
+        with _status_memo_lock:
+            memo = _status_memo.get(key)
+        if memo and memo[0] > time.monotonic():
+            return dict(memo[1])
+
+    status = _collect_cluster_status(cluster)
+
+    # Failures are kept too - an unreachable cluster is not retried by every caller
+    now = time.monotonic()
+    with _status_memo_lock:
+        if len(_status_memo) >= STATUS_MEMO_MAX_ENTRIES:
+            for stale_key in [k for k, (expires, _) in _status_memo.items() if expires <= now]:
+                del _status_memo[stale_key]
+            if len(_status_memo) >= STATUS_MEMO_MAX_ENTRIES:
+                _status_memo.pop(next(iter(_status_memo)))
+        _status_memo[key] = (now + STATUS_MEMO_TTL_SECONDS, status)
+
+    return dict(status)
+
+def _collect_cluster_status(cluster: Cluster) -> dict:
+    """
+    Get cluster status from the Kubernetes API and return aggregated LLM-ready format
 
     Returns deterministic JSON structure suitable for:
     - UI display
@@ -28,12 +101,9 @@ def get_cluster_status(cluster: Cluster) -> dict:
             }
         }
 
-    # Write kubeconfig to temp file
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml') as f:
-        kubeconfig_path = f.name
-        f.write(cluster.kubeconfig if cluster.kubeconfig else "")
-
     try:
+        api = _get_api_client(cluster)
+
         # Initialize aggregated structure
         aggregated = {
             "cluster_metadata": {
@@ -79,21 +149,33 @@ def get_cluster_status(cluster: Cluster) -> dict:
             "collection_errors": []
         }
 
+        # Every API read is independent - run them concurrently so collection
+        # takes as long as the slowest call instead of the sum of all of them
+        with ThreadPoolExecutor(max_workers=len(STATUS_QUERIES)) as pool:
+            futures = {
+                name: pool.submit(_read_api, api, *query)
+                for name, query in STATUS_QUERIES.items()
+            }
+
+        fetched = {}
+        for name, future in futures.items():
+            try:
+                fetched[name] = future.result()
+            except client.ApiException as e:
+                fetched[name] = None
+                collection_errors.append(f"{name}: {e.status} {e.reason}")
+            except Exception as e:
+                fetched[name] = None
+                collection_errors.append(f"{name}: {str(e)}")
+
         # Get cluster version
-        try:
-            result = subprocess.run(
-                ["kubectl", "--kubeconfig", kubeconfig_path, "version", "--output=json"],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                version_data = json.loads(result.stdout)
-                aggregated["cluster_metadata"]["kubernetes_version"] = version_data.get("serverVersion", {}).get("gitVersion", "unknown")
-        except Exception as e:
-            collection_errors.append(f"kubernetes_version: {str(e)}")
+        version_data = fetched["kubernetes_version"]
+        if version_data:
+            aggregated["cluster_metadata"]["kubernetes_version"] = version_data.get("gitVersion", "unknown")
 
         # Get nodes info
         try:
-            node_details = get_node_details(kubeconfig_path)
+            node_details = fetched["nodes"] or []
             aggregated["nodes"]["details"] = node_details
             aggregated["nodes"]["total"] = len(node_details)
             aggregated["nodes"]["ready"] = sum(1 for n in node_details if n.get("status") == "Ready")
@@ -113,21 +195,19 @@ def get_cluster_status(cluster: Cluster) -> dict:
 
         # Detect CNI
         try:
-            cni_info = detect_cni(kubeconfig_path)
-            aggregated["network"]["cni"] = cni_info
+            aggregated["network"]["cni"] = detect_cni(fetched)
         except Exception as e:
             collection_errors.append(f"cni: {str(e)}")
 
         # Get component status
         try:
-            components = get_component_status(kubeconfig_path)
-            aggregated["components"] = components
+            aggregated["components"] = get_component_status(fetched)
         except Exception as e:
             collection_errors.append(f"components: {str(e)}")
 
         # Get namespaces and pod counts
         try:
-            namespaces = get_namespaces_info(kubeconfig_path)
+            namespaces = get_namespaces_info(fetched["namespaces"], fetched["pods"], fetched["pods_running"])
             aggregated["workloads"]["namespaces"] = len(namespaces)
             aggregated["workloads"]["namespaces_details"] = namespaces
             aggregated["workloads"]["pods_total"] = sum(ns.get("total_pods", 0) for ns in namespaces)
@@ -137,7 +217,7 @@ def get_cluster_status(cluster: Cluster) -> dict:
 
         # Get CRDs
         try:
-            crds = get_crds_info(kubeconfig_path)
+            crds = fetched["crds"] or []
             aggregated["api_compatibility"]["crd_count"] = len(crds)
             aggregated["api_compatibility"]["crds"] = crds
         except Exception as e:
@@ -151,262 +231,259 @@ def get_cluster_status(cluster: Cluster) -> dict:
 
     except Exception as e:
         return {"error": f"Failed to get cluster status: {str(e)}"}
-    finally:
-        # Clean up kubeconfig file
-        if os.path.exists(kubeconfig_path):
-            os.remove(kubeconfig_path)
 
-def detect_cni(kubeconfig_path: str) -> dict:
-    """Detect CNI type and status"""
-    try:
-        # Check for canal pods
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "k8s-app=canal", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = sum(1 for p in pods if p.get("status", {}).get("phase") == "Running")
-                return {
-                    "type": "canal",
-                    "status": "healthy" if running == len(pods) else "degraded",
-                    "pods": {"total": len(pods), "running": running}
-                }
+def _get_api_client(cluster: Cluster) -> client.ApiClient:
+    """Cached API client for the cluster, rebuilt when its kubeconfig changes"""
+    digest = _kubeconfig_digest(cluster.kubeconfig)
 
-        # Check for cilium pods
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "k8s-app=cilium", "-o", "json"],
-            capture_output=True, text=True, timeout=10
+    with _api_clients_lock:
+        cached = _api_clients.get(cluster.id)
+        if cached and cached[0] == digest:
+            return cached[1]
+
+        configuration = client.Configuration()
+        config.load_kube_config_from_dict(
+            yaml.safe_load(cluster.kubeconfig),
+            client_configuration=configuration,
+            persist_config=False
         )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = sum(1 for p in pods if p.get("status", {}).get("phase") == "Running")
-                return {
-                    "type": "cilium",
-                    "status": "healthy" if running == len(pods) else "degraded",
-                    "pods": {"total": len(pods), "running": running}
-                }
+        # Enough connections for every concurrent status read; fail fast like kubectl
+        configuration.connection_pool_maxsize = len(STATUS_QUERIES)
+        configuration.retries = False
+
+        api = client.ApiClient(configuration)
+        _api_clients[cluster.id] = (digest, api)
+        return api
+
+class PodMetadataApi:
+    """
+    Pod list reads that return only object metadata (PartialObjectMetadataList)
 
-        # Check for calico pods
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "k8s-app=calico-node", "-o", "json"],
-            capture_output=True, text=True, timeout=10
+    Same call shape as the CoreV1Api methods, but the apiserver drops spec and
+    status from every item - the status reads only count pods, so full pod
+    objects (several KB each) never cross the wire.
+    """
+
+    ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+
+    def __init__(self, api_client: client.ApiClient):
+        self.api_client = api_client
+
+    def list_pod_for_all_namespaces(self, **kwargs):
+        return self._list("/api/v1/pods", **kwargs)
+
+    def list_namespaced_pod(self, namespace: str, **kwargs):
+        return self._list(f"/api/v1/namespaces/{namespace}/pods", **kwargs)
+
+    def _list(self, path: str, label_selector: Optional[str] = None, field_selector: Optional[str] = None,
+              _preload_content: bool = True, _request_timeout=None):
+        query_params = [
+            (name, value)
+            for name, value in (("labelSelector", label_selector), ("fieldSelector", field_selector))
+            if value
+        ]
+        return self.api_client.call_api(
+            path, "GET",
+            query_params=query_params,
+            header_params={"Accept": self.ACCEPT},
+            auth_settings=["BearerToken"],
+            response_type="object",
+            _return_http_data_only=True,
+            _preload_content=_preload_content,
+            _request_timeout=_request_timeout
         )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = sum(1 for p in pods if p.get("status", {}).get("phase") == "Running")
+
+def _kubeconfig_digest(kubeconfig: Optional[str]) -> bytes:
+    """Short digest of a kubeconfig - a rotated kubeconfig gets a new client and memo key"""
+    return hashlib.blake2b((kubeconfig or "").encode(), digest_size=8).digest()
+
+def _read_api(api: client.ApiClient, reducer: Optional[Callable], api_class, method: str, kwargs: dict):
+    """Run one API read on the raw response body
+
+    The generated models are skipped (_preload_content=False). List items are
+    parsed one at a time straight off the socket (ijson) and handed to the
+    reducer, so a large pod or CRD list is never held in memory whole.
+    """
+    response = getattr(api_class(api), method)(
+        _preload_content=False,
+        _request_timeout=KUBE_API_TIMEOUT,
+        **kwargs
+    )
+    try:
+        if reducer is None:
+            return json.loads(response.data)
+        return reducer(ijson.items(response, "items.item", use_float=True))
+    finally:
+        response.release_conn()
+
+def count_pods_by_label(label: str) -> Callable[[Iterable[dict]], Counter]:
+    """Reducer counting pods per value of one label"""
+    def count(pods: Iterable[dict]) -> Counter:
+        return Counter(pod.get("metadata", {}).get("labels", {}).get(label) for pod in pods)
+    return count
+
+def count_pods_by_namespace(pods: Iterable[dict]) -> Counter:
+    """Pod counts per namespace, from one cluster-wide list"""
+    return Counter(pod.get("metadata", {}).get("namespace", "") for pod in pods)
+
+def detect_cni(fetched: dict) -> dict:
+    """Detect CNI type and status from the prefetched CNI pod counts"""
+    try:
+        total = fetched.get("cni") or Counter()
+        running = fetched.get("cni_running") or Counter()
+        for cni, app in CNI_PODS.items():
+            if total[app]:
                 return {
-                    "type": "calico",
-                    "status": "healthy" if running == len(pods) else "degraded",
-                    "pods": {"total": len(pods), "running": running}
+                    "type": cni,
+                    "status": "healthy" if running[app] == total[app] else "degraded",
+                    "pods": {"total": total[app], "running": running[app]}
                 }
 
         return {"type": "unknown", "status": "unknown"}
     except:
         return {"type": "unknown", "status": "error"}
 
-def get_component_status(kubeconfig_path: str) -> dict:
-    """Get Kubernetes component health status"""
-    components = {
-        "etcd": "unknown",
-        "apiserver": "unknown",
-        "scheduler": "unknown",
-        "controller_manager": "unknown"
-    }
+def get_component_status(fetched: dict) -> dict:
+    """Get Kubernetes component health status from the prefetched component pod counts"""
+    components = {name: "unknown" for name in COMPONENT_PODS}
 
     try:
-        # Check etcd pods
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "component=etcd", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = all(p.get("status", {}).get("phase") == "Running" for p in pods)
-                components["etcd"] = "healthy" if running else "degraded"
-
-        # Check kube-apiserver
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "component=kube-apiserver", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = all(p.get("status", {}).get("phase") == "Running" for p in pods)
-                components["apiserver"] = "healthy" if running else "degraded"
-
-        # Check kube-scheduler
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "component=kube-scheduler", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = all(p.get("status", {}).get("phase") == "Running" for p in pods)
-                components["scheduler"] = "healthy" if running else "degraded"
-
-        # Check kube-controller-manager
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", "kube-system",
-             "-l", "component=kube-controller-manager", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            pods = json.loads(result.stdout).get("items", [])
-            if pods:
-                running = all(p.get("status", {}).get("phase") == "Running" for p in pods)
-                components["controller_manager"] = "healthy" if running else "degraded"
-
+        total = fetched.get("components") or Counter()
+        running = fetched.get("components_running") or Counter()
+        for name, component in COMPONENT_PODS.items():
+            if total[component]:
+                components[name] = "healthy" if running[component] == total[component] else "degraded"
     except:
         pass
 
     return components
 
-def get_node_details(kubeconfig_path: str) -> list:
+def get_node_details(nodes: Iterable[dict]) -> list:
     """Get detailed node information including OS and kernel version"""
     node_details = []
 
-    try:
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "nodes", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            nodes_data = json.loads(result.stdout)
-            nodes = nodes_data.get("items", [])
-
-            for node in nodes:
-                metadata = node.get("metadata", {})
-                status = node.get("status", {})
-                node_info = status.get("nodeInfo", {})
-
-                # Get roles
-                labels = metadata.get("labels", {})
-                roles = []
-                if "node-role.kubernetes.io/control-plane" in labels or "node-role.kubernetes.io/master" in labels:
-                    roles.append("control-plane")
-                if "node-role.kubernetes.io/etcd" in labels:
-                    roles.append("etcd")
-                if not roles:
-                    roles.append("worker")
-
-                # Check ready status
-                ready_status = "NotReady"
-                conditions = status.get("conditions", [])
-                for condition in conditions:
-                    if condition.get("type") == "Ready":
-                        ready_status = "Ready" if condition.get("status") == "True" else "NotReady"
-                        break
-
-                # Get IP addresses
-                internal_ip = None
-                external_ip = None
-                addresses = status.get("addresses", [])
-                for addr in addresses:
-                    if addr.get("type") == "InternalIP":
-                        internal_ip = addr.get("address")
-                    elif addr.get("type") == "ExternalIP":
-                        external_ip = addr.get("address")
-
-                node_details.append({
-                    "name": metadata.get("name", "unknown"),
-                    "roles": ", ".join(roles),
-                    "status": ready_status,
-                    "internal_ip": internal_ip,
-                    "external_ip": external_ip,
-                    "os_image": node_info.get("osImage", "unknown"),
-                    "kernel": node_info.get("kernelVersion", "unknown"),
-                    "container_runtime": node_info.get("containerRuntimeVersion", "unknown"),
-                    "version": node_info.get("kubeletVersion", "unknown")
-                })
-    except:
-        pass
+    for node in nodes:
+        metadata = node.get("metadata", {})
+        status = node.get("status", {})
+        node_info = status.get("nodeInfo", {})
+
+        # Get roles
+        labels = metadata.get("labels", {})
+        roles = []
+        if "node-role.kubernetes.io/control-plane" in labels or "node-role.kubernetes.io/master" in labels:
+            roles.append("control-plane")
+        if "node-role.kubernetes.io/etcd" in labels:
+            roles.append("etcd")
+        if not roles:
+            roles.append("worker")
+
+        # Check ready status
+        ready_status = "NotReady"
+        conditions = status.get("conditions", [])
+        for condition in conditions:
+            if condition.get("type") == "Ready":
+                ready_status = "Ready" if condition.get("status") == "True" else "NotReady"
+                break
+
+        # Get IP addresses
+        internal_ip = None
+        external_ip = None
+        addresses = status.get("addresses", [])
+        for addr in addresses:
+            if addr.get("type") == "InternalIP":
+                internal_ip = addr.get("address")
+            elif addr.get("type") == "ExternalIP":
+                external_ip = addr.get("address")
+
+        node_details.append({
+            "name": metadata.get("name", "unknown"),
+            "roles": ", ".join(roles),
+            "status": ready_status,
+            "internal_ip": internal_ip,
+            "external_ip": external_ip,
+            "os_image": node_info.get("osImage", "unknown"),
+            "kernel": node_info.get("kernelVersion", "unknown"),
+            "container_runtime": node_info.get("containerRuntimeVersion", "unknown"),
+            "version": node_info.get("kubeletVersion", "unknown")
+        })
 
     return node_details
 
-def get_namespaces_info(kubeconfig_path: str) -> list:
+def get_namespace_phases(namespaces: Iterable[dict]) -> List[Tuple[str, str]]:
+    """(name, phase) of every namespace"""
+    return [
+        (ns.get("metadata", {}).get("name", ""), ns.get("status", {}).get("phase", "Active"))
+        for ns in namespaces
+    ]
+
+def get_namespaces_info(
+    namespaces: Optional[List[Tuple[str, str]]],
+    total: Optional[Counter],
+    running: Optional[Counter]
+) -> list:
     """Get namespaces and pod counts"""
-    namespaces = []
-
-    try:
-        # Get all namespaces
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "namespaces", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            ns_data = json.loads(result.stdout)
-            ns_list = ns_data.get("items", [])
-
-            for ns in ns_list:
-                ns_name = ns.get("metadata", {}).get("name", "")
-
-                # Get pod count for this namespace
-                pod_result = subprocess.run(
-                    ["kubectl", "--kubeconfig", kubeconfig_path, "get", "pods", "-n", ns_name, "-o", "json"],
-                    capture_output=True, text=True, timeout=10
-                )
-
-                pod_count = 0
-                running_count = 0
-                if pod_result.returncode == 0:
-                    pod_data = json.loads(pod_result.stdout)
-                    pods = pod_data.get("items", [])
-                    pod_count = len(pods)
-                    running_count = sum(1 for p in pods if p.get("status", {}).get("phase") == "Running")
-
-                namespaces.append({
-                    "name": ns_name,
-                    "total_pods": pod_count,
-                    "running_pods": running_count,
-                    "status": ns.get("status", {}).get("phase", "Active")
-                })
-    except:
-        pass
-
-    return namespaces
+    total = total or Counter()
+    running = running or Counter()
+
+    return [
+        {
+            "name": ns_name,
+            "total_pods": total[ns_name],
+            "running_pods": running[ns_name],
+            "status": phase
+        }
+        for ns_name, phase in namespaces or []
+    ]
 
-def get_crds_info(kubeconfig_path: str) -> list:
+def get_crds_info(crd_items: Iterable[dict]) -> list:
     """Get Custom Resource Definitions"""
     crds = []
 
-    try:
-        result = subprocess.run(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "crds", "-o", "json"],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            crd_data = json.loads(result.stdout)
-            crd_items = crd_data.get("items", [])
-
-            for crd in crd_items:
-                metadata = crd.get("metadata", {})
-                spec = crd.get("spec", {})
-
-                # Get API versions
-                versions = spec.get("versions", [])
-                api_versions = [v.get("name") for v in versions if v.get("served", False)]
-
-                crds.append({
-                    "name": metadata.get("name", "unknown"),
-                    "group": spec.get("group", ""),
-                    "scope": spec.get("scope", ""),
-                    "kind": spec.get("names", {}).get("kind", ""),
-                    "versions": api_versions
-                })
-    except:
-        pass
+    for crd in crd_items:
+        metadata = crd.get("metadata", {})
+        spec = crd.get("spec", {})
+
+        # Get API versions
+        versions = spec.get("versions", [])
+        api_versions = [v.get("name") for v in versions if v.get("served", False)]
+
+        crds.append({
+            "name": metadata.get("name", "unknown"),
+            "group": spec.get("group", ""),
+            "scope": spec.get("scope", ""),
+            "kind": spec.get("names", {}).get("kind", ""),
+            "versions": api_versions
+        })
 
     return crds
+
+# Pods in phase Running - the apiserver filters, so only they are sent
+RUNNING_PODS = "status.phase=Running"
+
+def _pod_count_queries(name: str, label: str, values) -> dict:
+    """
+    Total and running pod count reads for a set of kube-system pods
+
+    One "label in (...)" selector covers every value; pods are bucketed by label.
+    """
+    kwargs = {"namespace": "kube-system", "label_selector": f"{label} in ({','.join(values)})"}
+    reducer = count_pods_by_label(label)
+    return {
+        name: (reducer, PodMetadataApi, "list_namespaced_pod", kwargs),
+        f"{name}_running": (reducer, PodMetadataApi, "list_namespaced_pod", {**kwargs, "field_selector": RUNNING_PODS}),
+    }
+
+# API reads behind get_cluster_status, by name (the name prefixes collection errors):
+# (item reducer, api class, method, kwargs). List items are streamed through
+# the reducer; reads without one are parsed whole. Pods are only counted, so
+# they are read as metadata and running pods are selected server-side.
+STATUS_QUERIES = {
+    "kubernetes_version": (None, client.VersionApi, "get_code", {}),
+    "nodes": (get_node_details, client.CoreV1Api, "list_node", {}),
+    "namespaces": (get_namespace_phases, client.CoreV1Api, "list_namespace", {}),
+    "pods": (count_pods_by_namespace, PodMetadataApi, "list_pod_for_all_namespaces", {}),
+    "pods_running": (count_pods_by_namespace, PodMetadataApi, "list_pod_for_all_namespaces", {"field_selector": RUNNING_PODS}),
+    "crds": (get_crds_info, client.ApiextensionsV1Api, "list_custom_resource_definition", {}),
+    **_pod_count_queries("cni", CNI_LABEL, CNI_PODS.values()),
+    **_pod_count_queries("components", COMPONENT_LABEL, COMPONENT_PODS.values()),
+}
@@ -1,6 +1,18 @@
 from cryptography.fernet import Fernet
+from functools import lru_cache
+from typing import Dict, Tuple
 import os
 import base64
+import threading
+import time
+
+# Decrypted secrets are kept in memory briefly so repeated checks skip Fernet.
+# Keyed by ciphertext, so rotating a credential never serves the old secret.
+DECRYPT_CACHE_TTL = int(os.getenv("DECRYPT_CACHE_TTL", "300"))
+DECRYPT_CACHE_MAX_ENTRIES = 256
+
+_decrypt_cache: Dict[str, Tuple[float, str]] = {}
+_decrypt_cache_lock = threading.Lock()
 
 def get_encryption_key() -> bytes:
     """
@@ -13,24 +25,41 @@ def get_encryption_key() -> bytes:
     # Ensure key is properly formatted
     try:
         return base64.urlsafe_b64decode(key)
-    except:
-        # If not base64, derive from string
+    except ValueError:
+        # If not base64 (binascii.Error) or not ASCII, derive from string
         return base64.urlsafe_b64encode(key.encode()[:32].ljust(32, b'0'))
 
+@lru_cache(maxsize=1)
+def _get_fernet() -> Fernet:
+    """Fernet for ENCRYPTION_KEY, built once per process"""
+    return Fernet(base64.urlsafe_b64encode(get_encryption_key()))
+
 def encrypt_secret(plaintext: str) -> str:
     """
     Encrypt a secret (SSH key or password)
     """
-    key = get_encryption_key()
-    fernet = Fernet(base64.urlsafe_b64encode(key))
-    encrypted = fernet.encrypt(plaintext.encode())
+    encrypted = _get_fernet().encrypt(plaintext.encode())
     return encrypted.decode()
 
 def decrypt_secret(encrypted: str) -> str:
     """
-    Decrypt a secret
+    Decrypt a secret (cached for DECRYPT_CACHE_TTL seconds)
     """
-    key = get_encryption_key()
-    fernet = Fernet(base64.urlsafe_b64encode(key))
-    decrypted = fernet.decrypt(encrypted.encode())
-    return decrypted.decode()
+    now = time.monotonic()
+    with _decrypt_cache_lock:
+        hit = _decrypt_cache.get(encrypted)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    decrypted = _get_fernet().decrypt(encrypted.encode()).decode()
+
+    if DECRYPT_CACHE_TTL > 0:
+        with _decrypt_cache_lock:
+            # Drop expired entries, then the oldest ones if still full
+            for stale in [k for k, (expires, _) in _decrypt_cache.items() if expires <= now]:
+                del _decrypt_cache[stale]
+            while len(_decrypt_cache) >= DECRYPT_CACHE_MAX_ENTRIES:
+                del _decrypt_cache[next(iter(_decrypt_cache))]
+            _decrypt_cache[encrypted] = (now + DECRYPT_CACHE_TTL, decrypted)
+
+    return decrypted
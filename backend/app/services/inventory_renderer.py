@@ -9,6 +9,25 @@ from typing import List, Optional
 from app.models import Cluster, Node, NodeRole, NodeStatus
 
 
+SERVER_ROLES = frozenset((NodeRole.INITIAL_MASTER, NodeRole.MASTER))
+
+# Single-group stages: stage -> (node role, rke2_type, node_role var); the
+# inventory group is named after the stage
+STAGE_SPECS = {
+    "initial_master": (NodeRole.INITIAL_MASTER, "server", "initial_master"),
+    "joining_masters": (NodeRole.MASTER, "server", "joining_master"),
+    "workers": (NodeRole.WORKER, "agent", "worker"),
+}
+
+# rke2_type/node_role host vars, by node role, for the "all" and scale inventories
+SERVER_VARS = {
+    NodeRole.INITIAL_MASTER: "rke2_type=server node_role=initial_master",
+    NodeRole.MASTER: "rke2_type=server node_role=joining_master",
+}
+JOINING_SERVER_VARS = SERVER_VARS[NodeRole.MASTER]
+AGENT_VARS = "rke2_type=agent node_role=worker"
+
+
 class InventoryRenderer:
     """
     Generates Ansible inventory dynamically from database
@@ -28,78 +47,55 @@ class InventoryRenderer:
         Returns:
             Ansible inventory content (INI format)
         """
+        if stage != "all" and stage not in STAGE_SPECS:
+            raise ValueError(f"Unknown stage: {stage}")
+
         if nodes is None:
             nodes = cluster.cluster_nodes
 
         # Filter nodes based on stage and status
-        if stage == "initial_master":
-            target_nodes = [n for n in nodes if n.role == NodeRole.INITIAL_MASTER and n.status != NodeStatus.REMOVED]
-        elif stage == "joining_masters":
-            target_nodes = [n for n in nodes if n.role == NodeRole.MASTER and n.status != NodeStatus.REMOVED]
-        elif stage == "workers":
-            target_nodes = [n for n in nodes if n.role == NodeRole.WORKER and n.status != NodeStatus.REMOVED]
-        elif stage == "all":
+        if stage == "all":
             target_nodes = [n for n in nodes if n.status != NodeStatus.REMOVED]
         else:
-            raise ValueError(f"Unknown stage: {stage}")
+            role = STAGE_SPECS[stage][0]
+            target_nodes = [n for n in nodes if n.role == role and n.status != NodeStatus.REMOVED]
 
         # Render inventory
         return InventoryRenderer._render_inventory(cluster, target_nodes, stage)
 
+    @staticmethod
+    def _host_line(node: Node, user_var: str, type_vars: str) -> str:
+        return f"{node.hostname} ansible_host={node.ansible_ip} {user_var} {type_vars}"
+
     @staticmethod
     def _render_inventory(cluster: Cluster, nodes: List[Node], stage: str) -> str:
         """Internal inventory rendering"""
 
         # Get username from credential
-        username = cluster.credential.username if cluster.credential else "root"
-
-        inventory_lines = []
-
-        # Stage-specific groups
-        if stage == "initial_master":
-            inventory_lines.append("[initial_master]")
-            for node in nodes:
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=server node_role=initial_master"
-                )
-
-        elif stage == "joining_masters":
-            inventory_lines.append("[joining_masters]")
-            for node in nodes:
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=server node_role=joining_master"
-                )
-
-        elif stage == "workers":
-            inventory_lines.append("[workers]")
-            for node in nodes:
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=agent node_role=worker"
-                )
-
-        elif stage == "all":
-            # Traditional masters/workers groups
-            masters = [n for n in nodes if n.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]]
-            workers = [n for n in nodes if n.role == NodeRole.WORKER]
-
-            inventory_lines.append("[masters]")
-            for node in masters:
-                role_var = "initial_master" if node.role == NodeRole.INITIAL_MASTER else "joining_master"
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=server node_role={role_var}"
-                )
-
-            inventory_lines.append("\n[workers]")
-            for node in workers:
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=agent node_role=worker"
-                )
-
-            inventory_lines.append("\n[k8s_cluster:children]")
-            inventory_lines.append("masters")
-            inventory_lines.append("workers")
-
-        return "\n".join(inventory_lines)
+        user_var = f"ansible_user={cluster.credential.username if cluster.credential else 'root'}"
+        host_line = InventoryRenderer._host_line
+
+        # Stage-specific group
+        if stage in STAGE_SPECS:
+            _, rke2_type, node_role = STAGE_SPECS[stage]
+            type_vars = f"rke2_type={rke2_type} node_role={node_role}"
+            return "\n".join([f"[{stage}]", *(host_line(n, user_var, type_vars) for n in nodes)])
+
+        # "all": traditional masters/workers groups, split in one pass
+        masters = []
+        workers = []
+        for node in nodes:
+            server_vars = SERVER_VARS.get(node.role)
+            if server_vars:
+                masters.append(host_line(node, user_var, server_vars))
+            elif node.role == NodeRole.WORKER:
+                workers.append(host_line(node, user_var, AGENT_VARS))
+
+        return "\n".join([
+            "[masters]", *masters,
+            "\n[workers]", *workers,
+            "\n[k8s_cluster:children]", "masters", "workers",
+        ])
 
     @staticmethod
     def render_for_scale_add(cluster: Cluster, new_nodes: List[Node]) -> str:
@@ -107,33 +103,24 @@ class InventoryRenderer:
         Render inventory for adding nodes to existing cluster
         All new nodes join an existing cluster, so they need server: parameter
         """
-        username = cluster.credential.username if cluster.credential else "root"
-
-        inventory_lines = []
-        inventory_lines.append("[new_nodes]")
+        user_var = f"ansible_user={cluster.credential.username if cluster.credential else 'root'}"
+        host_line = InventoryRenderer._host_line
 
+        host_lines = []
         servers = []
         agents = []
 
         for node in new_nodes:
-            if node.role in [NodeRole.INITIAL_MASTER, NodeRole.MASTER]:
+            if node.role in SERVER_ROLES:
                 # When adding to existing cluster, all servers are "joining"
-                servers.append(node)
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=server node_role=joining_master"
-                )
+                servers.append(node.hostname)
+                host_lines.append(host_line(node, user_var, JOINING_SERVER_VARS))
             else:
-                agents.append(node)
-                inventory_lines.append(
-                    f"{node.hostname} ansible_host={node.ansible_ip} ansible_user={username} rke2_type=agent node_role=worker"
-                )
-
-        inventory_lines.append("\n[new_servers]")
-        for node in servers:
-            inventory_lines.append(node.hostname)
-
-        inventory_lines.append("\n[new_agents]")
-        for node in agents:
-            inventory_lines.append(node.hostname)
-
-        return "\n".join(inventory_lines)
+                agents.append(node.hostname)
+                host_lines.append(host_line(node, user_var, AGENT_VARS))
+
+        return "\n".join([
+            "[new_nodes]", *host_lines,
+            "\n[new_servers]", *servers,
+            "\n[new_agents]", *agents,
+        ])
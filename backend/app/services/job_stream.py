@@ -0,0 +1,132 @@
+"""
+Job Stream Notifications
+
+Wakes SSE job output streams when a job's output or status changes, so
+streams wait on an asyncio.Event instead of polling the database.
+
+Executors call notify_job_update(job_id) after committing job changes.
+They run in Celery workers (other processes) and in threads, so when
+REDIS_URL is set notifications go through Redis pub/sub; without Redis only
+executors in the API process can wake streams.
+"""
+
+from typing import Dict, Optional, Set
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+JOB_CHANNEL_PREFIX = "rke2:job:"
+
+# Streams re-check the database at least this often, even without a notification
+JOB_STREAM_HEARTBEAT_SECONDS = float(os.getenv("JOB_STREAM_HEARTBEAT_SECONDS", "5"))
+
+# Backoff between Redis relay reconnect attempts (doubles up to the max)
+JOB_RELAY_RETRY_SECONDS = float(os.getenv("JOB_RELAY_RETRY_SECONDS", "1"))
+JOB_RELAY_RETRY_MAX_SECONDS = float(os.getenv("JOB_RELAY_RETRY_MAX_SECONDS", "30"))
+
+# Per-job events of the SSE streams connected to this process
+_job_events: Dict[int, Set[asyncio.Event]] = {}
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_publisher = None
+
+
+def notify_job_update(job_id: int):
+    """Signal that a job's output or status changed (safe from any thread or process)"""
+    global _publisher
+
+    if REDIS_URL:
+        try:
+            if _publisher is None:
+                import redis
+                _publisher = redis.Redis.from_url(REDIS_URL)
+            _publisher.publish(f"{JOB_CHANNEL_PREFIX}{job_id}", b"1")
+        except Exception as e:
+            # Streams fall back to the heartbeat re-check
+            logger.warning("Failed to publish job update for job %s: %s", job_id, e)
+        return
+
+    if _loop is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wake_streams, job_id)
+
+
+def _wake_streams(job_id: int):
+    for event in _job_events.get(job_id, ()):
+        event.set()
+
+
+def subscribe(job_id: int) -> asyncio.Event:
+    """Register an SSE stream for a job's update notifications"""
+    event = asyncio.Event()
+    _job_events.setdefault(job_id, set()).add(event)
+    return event
+
+
+def unsubscribe(job_id: int, event: asyncio.Event):
+    """Remove an SSE stream registration"""
+    events = _job_events.get(job_id)
+    if events:
+        events.discard(event)
+        if not events:
+            del _job_events[job_id]
+
+
+async def wait_for_job_update(event: asyncio.Event):
+    """Wait until the job changes (or the heartbeat interval passes)"""
+    try:
+        await asyncio.wait_for(event.wait(), timeout=JOB_STREAM_HEARTBEAT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    event.clear()
+
+
+async def start_job_stream_listener() -> Optional[asyncio.Task]:
+    """
+    Bind notifications to the running event loop (called from app lifespan).
+
+    With Redis, also starts a task relaying job channel messages to local
+    streams.
+
+    Returns:
+        Relay task to cancel on shutdown, or None
+    """
+    global _loop
+    _loop = asyncio.get_running_loop()
+
+    if not REDIS_URL:
+        return None
+
+    from redis import asyncio as aioredis
+
+    async def relay():
+        delay = JOB_RELAY_RETRY_SECONDS
+        while True:
+            client = aioredis.from_url(REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{JOB_CHANNEL_PREFIX}*")
+                delay = JOB_RELAY_RETRY_SECONDS
+                # Updates published while disconnected were lost - re-check every stream
+                for job_id in list(_job_events):
+                    _wake_streams(job_id)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"].decode()
+                    _wake_streams(int(channel[len(JOB_CHANNEL_PREFIX):]))
+            except Exception as e:
+                # Streams keep working off the heartbeat re-check meanwhile
+                logger.warning("Job stream relay lost Redis connection, retrying in %ss: %s", delay, e)
+            finally:
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, JOB_RELAY_RETRY_MAX_SECONDS)
+
+    return asyncio.create_task(relay())
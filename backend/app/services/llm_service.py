@@ -1,6 +1,7 @@
-import boto3
 import json
-import os
+import orjson
+from typing import Iterator
+from app.services.bedrock_deepseek import get_bedrock_client
 
 BEDROCK_MODEL_ID = "anthropic.claude-3-5-sonnet-20241022-v2:0"
 
@@ -25,47 +26,63 @@ Provide your summary in markdown format with clear sections:
 ## Overall Assessment
 """
 
+def stream_upgrade_summary(readiness_json: dict) -> Iterator[str]:
+    """
+    Stream the AWS Bedrock (Claude) upgrade readiness summary as text deltas
+
+    Raises:
+        ValueError: Bedrock stream error event
+    """
+    bedrock = get_bedrock_client()
+
+    # Compact JSON - indentation whitespace is billed as input tokens
+    prompt = UPGRADE_SUMMARY_PROMPT.format(
+        readiness_json=orjson.dumps(readiness_json).decode()
+    )
+
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2000,
+        "temperature": 0.3,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+
+    response = bedrock.invoke_model_with_response_stream(
+        modelId=BEDROCK_MODEL_ID,
+        body=orjson.dumps(request_body)
+    )
+
+    for event in response["body"]:
+        if "chunk" not in event:
+            # modelStreamErrorException, throttlingException, ...
+            raise ValueError(f"Bedrock stream error: {event}")
+
+        chunk = orjson.loads(event["chunk"]["bytes"])
+        if chunk.get("type") == "content_block_delta":
+            text = chunk.get("delta", {}).get("text")
+            if text:
+                yield text
+
 def generate_upgrade_summary(readiness_json: dict) -> str:
     """
     Use AWS Bedrock (Claude) to generate upgrade readiness summary
     """
     try:
-        bedrock = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=os.getenv("AWS_REGION", "us-east-1")
-        )
-
-        prompt = UPGRADE_SUMMARY_PROMPT.format(
-            readiness_json=json.dumps(readiness_json, indent=2)
-        )
-
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,
-            "temperature": 0.3,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-
-        response = bedrock.invoke_model(
-            modelId=BEDROCK_MODEL_ID,
-            body=json.dumps(request_body)
-        )
-
-        response_body = json.loads(response["body"].read())
-        summary = response_body["content"][0]["text"]
-
-        return summary
+        return "".join(stream_upgrade_summary(readiness_json))
 
     except Exception as e:
-        # Fallback to simple text summary if Bedrock fails
-        return f"""# Upgrade Readiness Summary
+        return fallback_upgrade_summary(readiness_json, e)
+
+def fallback_upgrade_summary(readiness_json: dict, error: Exception) -> str:
+    """Simple text summary used when Bedrock fails"""
+    return f"""# Upgrade Readiness Summary
 
-**Error generating LLM summary:** {str(e)}
+**Error generating LLM summary:** {str(error)}
 
 ## Raw Results
 Overall Ready: {readiness_json.get('ready', False)}
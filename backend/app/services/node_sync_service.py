@@ -5,18 +5,30 @@ Synchronizes database node statuses with actual cluster state from inspection.
 This ensures database reflects reality when nodes are installed/active.
 """
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from app.models import Cluster, Node, NodeStatus
 from app.services.cluster_status_service import get_cluster_status
 from typing import Dict, List
+import logging
 import re
 
+logger = logging.getLogger(__name__)
 
-def sync_node_statuses_from_inspection(db: Session, cluster_id: int) -> Dict:
+# Kubernetes Ready condition -> NodeStatus
+K8S_STATUS_MAP = {
+    "Ready": NodeStatus.ACTIVE,
+    "NotReady": NodeStatus.FAILED,
+    "Unknown": NodeStatus.FAILED,
+}
+
+
+def sync_node_statuses_from_inspection(db: Session, cluster_id: int, force_refresh: bool = False) -> Dict:
     """
     Sync node statuses from cluster inspection to database.
 
     Updates Node.status based on actual Kubernetes node status.
+    force_refresh bypasses the short-lived status memo (explicit syncs).
 
     Returns:
         {
@@ -33,7 +45,7 @@ def sync_node_statuses_from_inspection(db: Session, cluster_id: int) -> Dict:
 
     # Get cluster inspection
     try:
-        inspection = get_cluster_status(cluster)
+        inspection = get_cluster_status(cluster, force_refresh=force_refresh)
     except Exception as e:
         return {"synced": 0, "errors": [f"Failed to get cluster status: {str(e)}"]}
 
@@ -54,31 +66,36 @@ def sync_node_statuses_from_inspection(db: Session, cluster_id: int) -> Dict:
                 "name": node_detail.get("name")
             }
 
-    # Update database nodes
-    db_nodes = db.query(Node).filter(Node.cluster_id == cluster_id).all()
-    synced_count = 0
+    # Only the columns the comparison needs - no ORM objects to load and track
+    db_nodes = db.query(Node.id, Node.internal_ip, Node.status).filter(Node.cluster_id == cluster_id).all()
     errors = []
 
-    for db_node in db_nodes:
-        k8s_node = k8s_nodes.get(db_node.internal_ip)
+    # Node ids to move, grouped by target status
+    transitions: Dict[NodeStatus, List[int]] = {status: [] for status in dict.fromkeys(K8S_STATUS_MAP.values())}
+    for node_id, internal_ip, status in db_nodes:
+        k8s_node = k8s_nodes.get(internal_ip)
 
         if not k8s_node:
             # Node not found in Kubernetes - might be removed or not yet joined
             continue
 
-        # Map Kubernetes status to our NodeStatus
-        new_status = None
-        if k8s_node["status"] == "Ready":
-            new_status = NodeStatus.ACTIVE
-        elif k8s_node["status"] in ["NotReady", "Unknown"]:
-            new_status = NodeStatus.FAILED
+        # Map Kubernetes status to our NodeStatus, update if changed
+        new_status = K8S_STATUS_MAP.get(k8s_node["status"])
+        if new_status and status != new_status:
+            transitions[new_status].append(node_id)
 
-        # Update if status changed
-        if new_status and db_node.status != new_status:
-            old_status = db_node.status
-            db_node.status = new_status
-            synced_count += 1
-            print(f"Updated {db_node.hostname}: {old_status.value} -> {new_status.value}")
+    # One UPDATE per target status
+    synced_count = 0
+    for new_status, node_ids in transitions.items():
+        if node_ids:
+            db.execute(
+                update(Node)
+                .where(Node.id.in_(node_ids))
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+            synced_count += len(node_ids)
+            logger.info("Set %d node(s) of cluster %s to %s", len(node_ids), cluster_id, new_status.value)
 
     if synced_count > 0:
         db.commit()
@@ -94,11 +111,12 @@ def sync_node_statuses_from_inspection(db: Session, cluster_id: int) -> Dict:
 def auto_sync_on_inspection(db: Session, cluster_id: int):
     """
     Automatically sync node statuses when inspection is performed.
-    Called from cluster status/refresh endpoints.
+    Run after the status/refresh responses (background task, own session);
+    the inspection it reads is the one just collected, from the status memo.
     """
     try:
         result = sync_node_statuses_from_inspection(db, cluster_id)
         if result["synced"] > 0:
-            print(f"Auto-synced {result['synced']} node(s) for cluster {cluster_id}")
+            logger.info("Auto-synced %d node(s) for cluster %s", result["synced"], cluster_id)
     except Exception as e:
-        print(f"Auto-sync failed for cluster {cluster_id}: {str(e)}")
+        logger.warning("Auto-sync failed for cluster %s: %s", cluster_id, e)
@@ -3,16 +3,61 @@ Pre-flight Check Collector
 Gathers upgrade-readiness data from RKE2 cluster nodes
 """
 
+import hashlib
 import json
+import os
+import orjson
 import subprocess
 import re
+import threading
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from .schema import (
     PreflightReport, ClusterMetadata, NodeInfo, CheckResult,
     EtcdHealth, CertificateInfo, KubernetesHealth, NetworkHealth, StorageHealth
 )
 
+# Kubeconfigs are written here once per cluster and reused by every kubectl call.
+# The default is on the tmpfs ansible-tmp volume, so cluster-admin credentials
+# are never written to disk
+KUBECONFIG_CACHE_DIR = os.getenv("KUBECONFIG_CACHE_DIR", "/tmp/ansible/kubeconfigs")
+
+# cluster_id -> digest of the kubeconfig currently on disk
+_kubeconfig_digests: Dict[int, bytes] = {}
+_kubeconfig_lock = threading.Lock()
+
+
+def get_kubeconfig_path(cluster_id: int, kubeconfig: str) -> str:
+    """Path of the cluster's cached kubeconfig (0600), rewritten only when its content changes"""
+    path = os.path.join(KUBECONFIG_CACHE_DIR, f"{cluster_id}.yaml")
+    digest = hashlib.blake2b(kubeconfig.encode(), digest_size=16).digest()
+
+    with _kubeconfig_lock:
+        if _kubeconfig_digests.get(cluster_id) == digest and os.path.exists(path):
+            return path
+
+        os.makedirs(KUBECONFIG_CACHE_DIR, mode=0o700, exist_ok=True)
+        # Write beside the target and swap it in, so a concurrent kubectl
+        # never reads a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(kubeconfig)
+        os.replace(tmp_path, path)
+
+        _kubeconfig_digests[cluster_id] = digest
+        return path
+
+
+def remove_cached_kubeconfig(cluster_id: int):
+    """Delete a cluster's cached kubeconfig (cluster deleted or kubeconfig replaced)"""
+    with _kubeconfig_lock:
+        _kubeconfig_digests.pop(cluster_id, None)
+        try:
+            os.remove(os.path.join(KUBECONFIG_CACHE_DIR, f"{cluster_id}.yaml"))
+        except FileNotFoundError:
+            pass
+
 
 class PreflightCollector:
     """Collects pre-flight check data from RKE2 cluster"""
@@ -23,22 +68,45 @@ class PreflightCollector:
         self.kubeconfig = kubeconfig
         self.target_version = target_version  # Target RKE2 version for upgrade compatibility checks
         self.checks: List[CheckResult] = []
+        self._server_version: Optional[str] = None
+        self._server_version_read = False
     
-    def _run_kubectl(self, args: List[str]) -> Tuple[str, str, int]:
-        """Execute kubectl command with cluster's kubeconfig"""
-        cmd = ["kubectl", "--kubeconfig", "-"] + args
+    def _run_kubectl(self, args: List[str], binary: bool = False) -> Tuple[Union[str, bytes], str, int]:
+        """Execute kubectl command with cluster's kubeconfig
+
+        Args:
+            args: kubectl arguments
+            binary: Return stdout as raw bytes - for JSON output, which
+                orjson parses without decoding it to str first
+        """
         try:
+            cmd = ["kubectl", "--kubeconfig", get_kubeconfig_path(self.cluster_id, self.kubeconfig)] + args
             result = subprocess.run(
                 cmd,
-                input=self.kubeconfig.encode(),
                 capture_output=True,
-                text=True,
                 timeout=30
             )
-            return result.stdout, result.stderr, result.returncode
+            stdout = result.stdout if binary else result.stdout.decode(errors="replace")
+            return stdout, result.stderr.decode(errors="replace"), result.returncode
         except Exception as e:
-            return "", str(e), 1
+            return b"" if binary else "", str(e), 1
     
+    def _get_server_version(self) -> Optional[str]:
+        """API server gitVersion, read once per collector
+
+        A raw GET /version (~200 bytes) instead of `kubectl version`, which
+        also builds the client version block and runs its skew check.
+        """
+        if not self._server_version_read:
+            self._server_version_read = True
+            stdout, _, rc = self._run_kubectl(["get", "--raw", "/version"], binary=True)
+            if rc == 0 and stdout:
+                try:
+                    self._server_version = orjson.loads(stdout).get("gitVersion")
+                except ValueError:
+                    pass
+        return self._server_version
+
     def _run_ssh_command(self, node_ip: str, ssh_user: str, ssh_key: Optional[str] = None,
                          command: str = "", ssh_password: Optional[str] = None) -> Tuple[str, str, int]:
         """Execute command on remote node via SSH
@@ -707,11 +775,9 @@ class PreflightCollector:
 
             if not target_k8s_version:
                 # Fall back to current cluster version
-                stdout, _, _ = self._run_kubectl(["version", "--short"])
-                if stdout:
-                    match = re.search(r'Server Version: v?(\d+\.\d+)', stdout)
-                    if match:
-                        target_k8s_version = match.group(1)
+                match = re.search(r'v?(\d+\.\d+)', self._get_server_version() or "")
+                if match:
+                    target_k8s_version = match.group(1)
 
             if not target_k8s_version:
                 self._add_check(
@@ -734,9 +800,9 @@ class PreflightCollector:
             found_deprecated = []
             for api_version, kind in apis_to_check:
                 try:
-                    stdout, _, rc = self._run_kubectl(["get", kind, "-A", "-o", "json"])
-                    if rc == 0 and stdout and "items" in stdout:
-                        data = json.loads(stdout)
+                    stdout, _, rc = self._run_kubectl(["get", kind, "-A", "-o", "json"], binary=True)
+                    if rc == 0 and stdout and b"items" in stdout:
+                        data = orjson.loads(stdout)
                         for item in data.get("items", []):
                             if item.get("apiVersion") == api_version:
                                 found_deprecated.append({
@@ -783,7 +849,7 @@ class PreflightCollector:
         Warns about PDBs with minAvailable=100% or maxUnavailable=0 on critical workloads.
         """
         try:
-            stdout, _, rc = self._run_kubectl(["get", "pdb", "-A", "-o", "json"])
+            stdout, _, rc = self._run_kubectl(["get", "pdb", "-A", "-o", "json"], binary=True)
             if rc != 0 or not stdout:
                 self._add_check(
                     "pod_disruption_budgets",
@@ -795,7 +861,7 @@ class PreflightCollector:
                 )
                 return
 
-            data = json.loads(stdout)
+            data = orjson.loads(stdout)
             risky_pdbs = []
 
             for pdb in data.get("items", []):
@@ -1095,10 +1161,10 @@ class PreflightCollector:
 
         try:
             # 1. Scan for HostPath volumes in Deployments and Pods
-            stdout, _, rc = self._run_kubectl(["get", "deployments,daemonsets,pods", "-A", "-o", "json"])
+            stdout, _, rc = self._run_kubectl(["get", "deployments,daemonsets,pods", "-A", "-o", "json"], binary=True)
 
             if rc == 0 and stdout:
-                data = json.loads(stdout)
+                data = orjson.loads(stdout)
 
                 for item in data.get("items", []):
                     kind = item.get("kind")
@@ -1132,10 +1198,10 @@ class PreflightCollector:
                 )
 
             # 2. Scan StatefulSets and analyze PV types
-            stdout, _, rc = self._run_kubectl(["get", "statefulsets", "-A", "-o", "json"])
+            stdout, _, rc = self._run_kubectl(["get", "statefulsets", "-A", "-o", "json"], binary=True)
 
             if rc == 0 and stdout:
-                sts_data = json.loads(stdout)
+                sts_data = orjson.loads(stdout)
 
                 for sts in sts_data.get("items", []):
                     name = sts["metadata"]["name"]
@@ -1205,14 +1271,14 @@ class PreflightCollector:
     def collect_kubernetes_health(self) -> KubernetesHealth:
         """Collect Kubernetes layer health"""
         # Node status
-        stdout, _, _ = self._run_kubectl(["get", "nodes", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "nodes", "-o", "json"], binary=True)
         node_ready = 0
         node_not_ready = 0
         cordoned = []
         
         if stdout:
             try:
-                nodes_data = json.loads(stdout)
+                nodes_data = orjson.loads(stdout)
                 for node in nodes_data.get("items", []):
                     name = node["metadata"]["name"]
                     spec = node.get("spec", {})
@@ -1245,14 +1311,14 @@ class PreflightCollector:
             )
         
         # kube-system pod restarts
-        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "kube-system", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "kube-system", "-o", "json"], binary=True)
         kube_system_restarts = {}
         crash_loop_pods = []
         image_pull_backoff_pods = []
         
         if stdout:
             try:
-                pods_data = json.loads(stdout)
+                pods_data = orjson.loads(stdout)
                 for pod in pods_data.get("items", []):
                     pod_name = pod["metadata"]["name"]
                     status = pod.get("status", {})
@@ -1302,12 +1368,12 @@ class PreflightCollector:
         deprecated_apis = []  # TODO: Implement kubent-style scanning
         
         # Admission webhooks
-        stdout, _, _ = self._run_kubectl(["get", "validatingwebhookconfigurations,mutatingwebhookconfigurations", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "validatingwebhookconfigurations,mutatingwebhookconfigurations", "-o", "json"], binary=True)
         admission_webhooks = []
         
         if stdout:
             try:
-                webhooks_data = json.loads(stdout)
+                webhooks_data = orjson.loads(stdout)
                 for wh in webhooks_data.get("items", []):
                     kind = wh.get("kind")
                     name = wh["metadata"]["name"]
@@ -1351,14 +1417,14 @@ class PreflightCollector:
     def collect_network_health(self) -> NetworkHealth:
         """Collect network layer health"""
         # Detect CNI type
-        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "kube-system", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "kube-system", "-o", "json"], binary=True)
         cni_type = "unknown"
         cni_pods_running = 0
         cni_pods_not_running = 0
         
         if stdout:
             try:
-                pods_data = json.loads(stdout)
+                pods_data = orjson.loads(stdout)
                 for pod in pods_data.get("items", []):
                     pod_name = pod["metadata"]["name"]
                     phase = pod.get("status", {}).get("phase", "")
@@ -1379,18 +1445,17 @@ class PreflightCollector:
                 pass
         
         # Pod CIDR
-        stdout, _, _ = self._run_kubectl(["cluster-info", "dump", "--output=json"])
         pod_cidr = "unknown"
         # Simplified - would need to parse cluster config
         
         # Ingress controller
-        stdout, _, _ = self._run_kubectl(["get", "ingressclass", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "ingressclass", "-o", "json"], binary=True)
         ingress_controller = None
         ingress_version = None
         
         if stdout:
             try:
-                data = json.loads(stdout)
+                data = orjson.loads(stdout)
                 if data.get("items"):
                     ingress_controller = data["items"][0]["spec"].get("controller", "unknown")
             except:
@@ -1409,13 +1474,13 @@ class PreflightCollector:
     def collect_storage_health(self) -> StorageHealth:
         """Collect storage layer health"""
         # Default StorageClass
-        stdout, _, _ = self._run_kubectl(["get", "storageclass", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "storageclass", "-o", "json"], binary=True)
         default_sc = None
         provisioner_type = None
         
         if stdout:
             try:
-                data = json.loads(stdout)
+                data = orjson.loads(stdout)
                 for sc in data.get("items", []):
                     annotations = sc.get("metadata", {}).get("annotations", {})
                     if annotations.get("storageclass.kubernetes.io/is-default-class") == "true":
@@ -1426,12 +1491,12 @@ class PreflightCollector:
                 pass
         
         # Check provisioner pods (Longhorn example)
-        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "longhorn-system", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "pods", "-n", "longhorn-system", "-o", "json"], binary=True)
         provisioner_healthy = False
         
         if stdout:
             try:
-                pods_data = json.loads(stdout)
+                pods_data = orjson.loads(stdout)
                 running_count = 0
                 total_count = len(pods_data.get("items", []))
                 
@@ -1444,12 +1509,12 @@ class PreflightCollector:
                 pass
         
         # PVC pending count
-        stdout, _, _ = self._run_kubectl(["get", "pvc", "--all-namespaces", "-o", "json"])
+        stdout, _, _ = self._run_kubectl(["get", "pvc", "--all-namespaces", "-o", "json"], binary=True)
         pvc_pending = 0
         
         if stdout:
             try:
-                data = json.loads(stdout)
+                data = orjson.loads(stdout)
                 for pvc in data.get("items", []):
                     if pvc.get("status", {}).get("phase") == "Pending":
                         pvc_pending += 1
@@ -1470,19 +1535,10 @@ class PreflightCollector:
             nodes_data: List of dicts with keys: hostname, ip, role, ssh_user, ssh_key (or ssh_password)
         """
         # Collect cluster metadata
-        stdout, _, _ = self._run_kubectl(["version", "-o", "json"])
-        k8s_version = "unknown"
-        rke2_version = "unknown"
-        
-        if stdout:
-            try:
-                version_data = json.loads(stdout)
-                k8s_version = version_data.get("serverVersion", {}).get("gitVersion", "unknown")
-                # RKE2 version is usually in server version
-                rke2_version = k8s_version
-            except:
-                pass
-        
+        k8s_version = self._get_server_version() or "unknown"
+        # RKE2 version is usually in server version
+        rke2_version = k8s_version
+
         metadata = ClusterMetadata(
             cluster_id=self.cluster_id,
             cluster_name=self.cluster_name,
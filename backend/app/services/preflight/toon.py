@@ -0,0 +1,126 @@
+"""
+TOON Encoder
+Token-Oriented Object Notation for preflight data sent to the LLM
+
+Indented key/value lines like YAML, but arrays of uniform objects are written
+once as a header and one comma-separated row per item:
+
+    certificates[2]{name,days_until_expiry}:
+      etcd-server,12
+      kube-apiserver,200
+
+which drops the braces, quotes and repeated keys JSON spends tokens on.
+"""
+
+import re
+from typing import Any, List
+
+import orjson
+
+
+# Unquoted strings must not read as another type or break the row syntax
+_NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_SPECIAL_CHARS = frozenset(',:"\\[]{}#\n\r\t')
+_BARE_KEY_RE = re.compile(r"^[A-Za-z_][\w.\-/]*$")
+
+_INDENT = "  "
+
+
+def to_toon(data: Any) -> str:
+    """Encode JSON-compatible data as TOON"""
+    lines: List[str] = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            _encode_field(_key(key), value, 0, lines)
+    else:
+        _encode_field("", data, 0, lines)
+    return "\n".join(lines)
+
+
+def _scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (int, float)):
+        return orjson.dumps(value).decode()
+
+    text = str(value)
+    if (
+        not text
+        or text != text.strip()
+        or text in ("true", "false", "null")
+        or text.startswith("- ")
+        or _NUMBER_RE.match(text)
+        or not _SPECIAL_CHARS.isdisjoint(text)
+    ):
+        return orjson.dumps(text).decode()
+    return text
+
+
+def _key(key: Any) -> str:
+    key = str(key)
+    return key if _BARE_KEY_RE.match(key) else orjson.dumps(key).decode()
+
+
+def _is_scalar(value: Any) -> bool:
+    return not isinstance(value, (dict, list))
+
+
+def _encode_field(key: str, value: Any, depth: int, lines: List[str]):
+    pad = _INDENT * depth
+
+    if isinstance(value, dict):
+        lines.append(f"{pad}{key}:")
+        for child_key, child in value.items():
+            _encode_field(_key(child_key), child, depth + 1, lines)
+
+    elif isinstance(value, list):
+        _encode_list(key, value, depth, lines)
+
+    else:
+        lines.append(f"{pad}{key}: {_scalar(value)}" if key else f"{pad}{_scalar(value)}")
+
+
+def _encode_list(key: str, items: list, depth: int, lines: List[str]):
+    pad = _INDENT * depth
+    header = f"{pad}{key}[{len(items)}]"
+
+    # Primitive array - inline
+    if all(_is_scalar(item) for item in items):
+        lines.append(f"{header}: {','.join(_scalar(item) for item in items)}".rstrip())
+        return
+
+    # Uniform objects with primitive values - header row + one row per item
+    if all(isinstance(item, dict) for item in items):
+        fields = list(items[0])
+        if fields and all(
+            list(item) == fields and all(_is_scalar(v) for v in item.values())
+            for item in items
+        ):
+            lines.append(f"{header}{{{','.join(_key(f) for f in fields)}}}:")
+            row_pad = _INDENT * (depth + 1)
+            for item in items:
+                lines.append(row_pad + ",".join(_scalar(item[f]) for f in fields))
+            return
+
+    # Mixed items - one "- " entry each
+    lines.append(f"{header}:")
+    item_pad = _INDENT * (depth + 1)
+    for item in items:
+        if isinstance(item, dict) and item:
+            item_lines: List[str] = []
+            for child_key, child in item.items():
+                _encode_field(_key(child_key), child, depth + 2, item_lines)
+            # First field goes on the "- " line, the rest stay aligned under it
+            item_lines[0] = f"{item_pad}- {item_lines[0].lstrip()}"
+            lines.extend(item_lines)
+        elif isinstance(item, list):
+            item_lines = []
+            _encode_list("", item, depth + 2, item_lines)
+            item_lines[0] = f"{item_pad}- {item_lines[0].lstrip()}"
+            lines.extend(item_lines)
+        else:
+            lines.append(f"{item_pad}- {_scalar(item) if not isinstance(item, dict) else '{}'}")
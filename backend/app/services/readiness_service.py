@@ -2,10 +2,12 @@ import subprocess
 import json
 from datetime import datetime
 from kubernetes import client, config
+from app.celery_app import celery_app
 from app.database import SessionLocal
 from app.models import Job, JobStatus
 from app.services.llm_service import generate_upgrade_summary
 
+@celery_app.task
 def run_upgrade_readiness_check(job_id: int):
     """
     Run comprehensive upgrade readiness checks on registered cluster
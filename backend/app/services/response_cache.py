@@ -0,0 +1,142 @@
+"""
+Response Cache Service
+
+Caches read-heavy list/detail API responses (fastapi-cache2).
+Backed by Redis when REDIS_URL is set, otherwise an in-process store.
+On Postgres, row-change notifications also purge the cache (see migration 009);
+Celery workers purge it directly after their writes.
+"""
+
+from typing import Callable, Optional
+import asyncio
+import logging
+import os
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_PREFIX = "rke2"
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Namespaces - cleared by the endpoints that mutate the underlying rows
+CLUSTERS_NAMESPACE = "clusters"
+CREDENTIALS_NAMESPACE = "credentials"
+
+# Postgres NOTIFY channel fed by the row-change triggers ('<table>:<id>' payloads)
+CACHE_INVALIDATE_CHANNEL = "cache_invalidate"
+
+# Table -> namespace purged when one of its rows changes
+TABLE_NAMESPACES = {
+    "clusters": CLUSTERS_NAMESPACE,
+    "nodes": CLUSTERS_NAMESPACE,
+    "credentials": CREDENTIALS_NAMESPACE,
+}
+
+# Keep references to in-flight purge tasks so they aren't garbage collected
+_purge_tasks = set()
+
+# Synchronous Redis client of clear_response_cache_sync (one per process)
+_sync_redis = None
+
+
+def request_key_builder(
+    func: Callable,
+    namespace: str = "",
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Optional[tuple] = None,
+    kwargs: Optional[dict] = None,
+) -> str:
+    """
+    Build cache key from the request path and query string.
+
+    The default builder hashes every handler kwarg, which includes the
+    per-request DB session and would never produce a hit.
+    """
+    query = f"?{request.query_params}" if request and request.query_params else ""
+    path = request.url.path if request else ""
+    return f"{FastAPICache.get_prefix()}:{namespace}:{func.__name__}:{path}{query}"
+
+
+def init_response_cache():
+    """Initialize cache backend (called from app lifespan)"""
+    if REDIS_URL:
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        backend = RedisBackend(aioredis.from_url(REDIS_URL))
+    else:
+        backend = InMemoryBackend()
+
+    FastAPICache.init(
+        backend,
+        prefix=CACHE_PREFIX,
+        expire=RESPONSE_CACHE_TTL,
+        key_builder=request_key_builder
+    )
+
+
+async def clear_response_cache(namespace: str):
+    """Drop all cached responses in a namespace after a write"""
+    await FastAPICache.clear(namespace=namespace)
+
+
+def clear_response_cache_sync(namespace: str):
+    """
+    Drop all cached responses in a namespace from outside the API (Celery workers).
+
+    Talks to Redis directly - FastAPICache is only initialized in the API
+    process. Without REDIS_URL the cache lives in the API process and
+    there is nothing to clear from here.
+    """
+    global _sync_redis
+
+    if not REDIS_URL:
+        return
+
+    try:
+        if _sync_redis is None:
+            import redis
+            _sync_redis = redis.Redis.from_url(REDIS_URL)
+        keys = list(_sync_redis.scan_iter(match=f"{CACHE_PREFIX}:{namespace}:*", count=500))
+        if keys:
+            _sync_redis.delete(*keys)
+    except Exception as e:
+        # Cached responses expire after RESPONSE_CACHE_TTL anyway
+        logger.warning("Failed to clear response cache namespace %s: %s", namespace, e)
+
+
+async def start_invalidation_listener():
+    """
+    LISTEN for row-change notifications and purge the matching namespace.
+
+    Catches writes made outside the API (Celery workers, background threads).
+    Only available on Postgres - returns None otherwise.
+
+    Returns:
+        asyncpg connection to close on shutdown, or None
+    """
+    from sqlalchemy.engine import make_url
+    from app.database import ASYNC_DATABASE_URL
+
+    url = make_url(ASYNC_DATABASE_URL)
+    if url.drivername != "postgresql+asyncpg":
+        return None
+
+    import asyncpg
+
+    def on_notify(connection, pid, channel, payload):
+        namespace = TABLE_NAMESPACES.get(payload.split(":", 1)[0])
+        if namespace:
+            task = asyncio.get_running_loop().create_task(clear_response_cache(namespace))
+            _purge_tasks.add(task)
+            task.add_done_callback(_purge_tasks.discard)
+
+    conn = await asyncpg.connect(url.set(drivername="postgresql").render_as_string(hide_password=False))
+    await conn.add_listener(CACHE_INVALIDATE_CHANNEL, on_notify)
+    return conn
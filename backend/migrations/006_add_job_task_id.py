@@ -0,0 +1,72 @@
+"""
+Migration 006: Add Celery task ID to Job table
+
+Adds field to track the Celery task executing a job:
+- task_id: Celery task UUID (process_id keeps the playbook PID)
+
+Usage:
+    python migrations/006_add_job_task_id.py upgrade
+    python migrations/006_add_job_task_id.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+def upgrade():
+    """Add task_id field to jobs table"""
+    db = SessionLocal()
+    try:
+        print("Adding task_id field to jobs table...")
+
+        db.execute(text("""
+            ALTER TABLE jobs
+            ADD COLUMN task_id VARCHAR
+        """))
+
+        db.commit()
+        print("✓ task_id field added successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Remove task_id field from jobs table"""
+    db = SessionLocal()
+    try:
+        print("Removing task_id field from jobs table...")
+
+        db.execute(text("ALTER TABLE jobs DROP COLUMN task_id"))
+
+        db.commit()
+        print("✓ task_id field removed successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 006_add_job_task_id.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 006_add_job_task_id.py [upgrade|downgrade]")
+        sys.exit(1)
@@ -0,0 +1,81 @@
+"""
+Migration 007: Add indexes on hot filter columns
+
+Adds composite indexes used by guardrail, job and status-cache lookups:
+- ix_nodes_cluster_role: nodes(cluster_id, role)
+- ix_nodes_initial_master: nodes(cluster_id) WHERE role = 'INITIAL_MASTER'
+- ix_jobs_cluster_status: jobs(cluster_id, status)
+- ix_cache_cluster_expires: cluster_status_cache(cluster_id, expires_at)
+
+Usage:
+    python migrations/007_add_hot_path_indexes.py upgrade
+    python migrations/007_add_hot_path_indexes.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+INDEXES = {
+    "ix_nodes_cluster_role": "nodes (cluster_id, role)",
+    "ix_nodes_initial_master": "nodes (cluster_id) WHERE role = 'INITIAL_MASTER'",
+    "ix_jobs_cluster_status": "jobs (cluster_id, status)",
+    "ix_cache_cluster_expires": "cluster_status_cache (cluster_id, expires_at)",
+}
+
+def upgrade():
+    """Create hot path indexes"""
+    db = SessionLocal()
+    try:
+        print("Creating hot path indexes...")
+
+        for name, definition in INDEXES.items():
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+
+        db.commit()
+        print("✓ Indexes created successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Drop hot path indexes"""
+    db = SessionLocal()
+    try:
+        print("Dropping hot path indexes...")
+
+        for name in INDEXES:
+            db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+        db.commit()
+        print("✓ Indexes dropped successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 007_add_hot_path_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 007_add_hot_path_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
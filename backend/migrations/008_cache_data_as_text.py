@@ -0,0 +1,85 @@
+"""
+Migration 008: Store cluster status cache as pre-serialized JSON text
+
+Changes cluster_status_cache.cached_data from JSON to TEXT so cached
+status can be returned without re-encoding.
+
+SQLite already stores JSON columns as text, so this is a no-op there.
+
+Usage:
+    python migrations/008_cache_data_as_text.py upgrade
+    python migrations/008_cache_data_as_text.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+def upgrade():
+    """Change cached_data column to TEXT"""
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("✓ Nothing to do (cached_data is already stored as text)")
+            return
+
+        print("Changing cached_data column to TEXT...")
+
+        db.execute(text("""
+            ALTER TABLE cluster_status_cache
+            ALTER COLUMN cached_data TYPE TEXT USING cached_data::text
+        """))
+
+        db.commit()
+        print("✓ cached_data column changed successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Change cached_data column back to JSON"""
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("✓ Nothing to do (cached_data is already stored as text)")
+            return
+
+        print("Changing cached_data column back to JSON...")
+
+        db.execute(text("""
+            ALTER TABLE cluster_status_cache
+            ALTER COLUMN cached_data TYPE JSON USING cached_data::json
+        """))
+
+        db.commit()
+        print("✓ cached_data column reverted successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 008_cache_data_as_text.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 008_cache_data_as_text.py [upgrade|downgrade]")
+        sys.exit(1)
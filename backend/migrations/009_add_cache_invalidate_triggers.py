@@ -0,0 +1,106 @@
+"""
+Migration 009: Add cache invalidation triggers (Postgres only)
+
+Adds row-level triggers on clusters, nodes and credentials that
+NOTIFY cache_invalidate with a '<table>:<id>' payload. The API listens on
+that channel and purges the matching response cache namespace.
+
+SQLite has no LISTEN/NOTIFY, so this is a no-op there.
+
+Usage:
+    python migrations/009_add_cache_invalidate_triggers.py upgrade
+    python migrations/009_add_cache_invalidate_triggers.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+TABLES = ["clusters", "nodes", "credentials"]
+
+def upgrade():
+    """Create notify function and triggers"""
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("✓ Nothing to do (LISTEN/NOTIFY requires Postgres)")
+            return
+
+        print("Creating cache invalidation triggers...")
+
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION notify_cache_invalidate() RETURNS trigger AS $$
+            DECLARE
+                row_id INTEGER;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    row_id := OLD.id;
+                ELSE
+                    row_id := NEW.id;
+                END IF;
+                PERFORM pg_notify('cache_invalidate', TG_TABLE_NAME || ':' || row_id);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+
+        for table in TABLES:
+            db.execute(text(f"DROP TRIGGER IF EXISTS {table}_cache_invalidate ON {table}"))
+            db.execute(text(f"""
+                CREATE TRIGGER {table}_cache_invalidate
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate()
+            """))
+
+        db.commit()
+        print("✓ Cache invalidation triggers created successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Drop triggers and notify function"""
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("✓ Nothing to do (LISTEN/NOTIFY requires Postgres)")
+            return
+
+        print("Dropping cache invalidation triggers...")
+
+        for table in TABLES:
+            db.execute(text(f"DROP TRIGGER IF EXISTS {table}_cache_invalidate ON {table}"))
+        db.execute(text("DROP FUNCTION IF EXISTS notify_cache_invalidate()"))
+
+        db.commit()
+        print("✓ Cache invalidation triggers dropped successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 009_add_cache_invalidate_triggers.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 009_add_cache_invalidate_triggers.py [upgrade|downgrade]")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""
+Migration 010: Add playbook process group to Job table
+
+Adds field to track the process group of a running playbook:
+- pgid: Process group ID, so termination reaches ansible child processes
+
+Usage:
+    python migrations/010_add_job_pgid.py upgrade
+    python migrations/010_add_job_pgid.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+def upgrade():
+    """Add pgid field to jobs table"""
+    db = SessionLocal()
+    try:
+        print("Adding pgid field to jobs table...")
+
+        db.execute(text("""
+            ALTER TABLE jobs
+            ADD COLUMN pgid INTEGER
+        """))
+
+        db.commit()
+        print("✓ pgid field added successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Remove pgid field from jobs table"""
+    db = SessionLocal()
+    try:
+        print("Removing pgid field from jobs table...")
+
+        db.execute(text("ALTER TABLE jobs DROP COLUMN pgid"))
+
+        db.commit()
+        print("✓ pgid field removed successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 010_add_job_pgid.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 010_add_job_pgid.py [upgrade|downgrade]")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+"""
+Migration 011: Add indexes for newest-first job listings
+
+Adds indexes matching the paginated list_jobs query:
+- ix_jobs_cluster_created: jobs(cluster_id, created_at DESC)
+- ix_jobs_created: jobs(created_at DESC)
+
+On PostgreSQL the indexes are built CONCURRENTLY so the jobs table stays
+writable while running jobs stream output.
+
+Usage:
+    python migrations/011_add_job_listing_indexes.py upgrade
+    python migrations/011_add_job_listing_indexes.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+INDEXES = {
+    "ix_jobs_cluster_created": "jobs (cluster_id, created_at DESC)",
+    "ix_jobs_created": "jobs (created_at DESC)",
+}
+
+def _concurrently() -> str:
+    # CONCURRENTLY is Postgres-only and can't run inside a transaction (see AUTOCOMMIT below)
+    return "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+
+def upgrade():
+    """Create job listing indexes"""
+    try:
+        print("Creating job listing indexes...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for name, definition in INDEXES.items():
+                conn.execute(text(f"CREATE INDEX {_concurrently()}IF NOT EXISTS {name} ON {definition}"))
+
+        print("✓ Indexes created successfully")
+
+    except Exception as e:
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+
+def downgrade():
+    """Drop job listing indexes"""
+    try:
+        print("Dropping job listing indexes...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX {_concurrently()}IF EXISTS {name}"))
+
+        print("✓ Indexes dropped successfully")
+
+    except Exception as e:
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 011_add_job_listing_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 011_add_job_listing_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""
+Migration 012: Extend the nodes role index with status
+
+Replaces ix_nodes_cluster_role with a composite index that also covers the
+per-(role, status) node counts used for installation stage tracking:
+- ix_nodes_cluster_role_status: nodes(cluster_id, role, status)
+
+The new index keeps (cluster_id, role) as its prefix, so role lookups still
+use it. On PostgreSQL indexes are built/dropped CONCURRENTLY.
+
+Usage:
+    python migrations/012_widen_node_role_index.py upgrade
+    python migrations/012_widen_node_role_index.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+def _concurrently() -> str:
+    # CONCURRENTLY is Postgres-only and can't run inside a transaction (see AUTOCOMMIT below)
+    return "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+
+def upgrade():
+    """Replace ix_nodes_cluster_role with ix_nodes_cluster_role_status"""
+    try:
+        print("Creating ix_nodes_cluster_role_status...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                f"CREATE INDEX {_concurrently()}IF NOT EXISTS ix_nodes_cluster_role_status "
+                f"ON nodes (cluster_id, role, status)"
+            ))
+            conn.execute(text(f"DROP INDEX {_concurrently()}IF EXISTS ix_nodes_cluster_role"))
+
+        print("✓ Index replaced successfully")
+
+    except Exception as e:
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+
+def downgrade():
+    """Restore ix_nodes_cluster_role"""
+    try:
+        print("Restoring ix_nodes_cluster_role...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                f"CREATE INDEX {_concurrently()}IF NOT EXISTS ix_nodes_cluster_role "
+                f"ON nodes (cluster_id, role)"
+            ))
+            conn.execute(text(f"DROP INDEX {_concurrently()}IF EXISTS ix_nodes_cluster_role_status"))
+
+        print("✓ Index restored successfully")
+
+    except Exception as e:
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 012_widen_node_role_index.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 012_widen_node_role_index.py [upgrade|downgrade]")
+        sys.exit(1)
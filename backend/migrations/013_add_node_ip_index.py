@@ -0,0 +1,71 @@
+"""
+Migration 013: Add index for duplicate node IP checks
+
+Adds an index used by the scale-up identity guardrail (G4):
+- ix_nodes_cluster_ip: nodes(cluster_id, internal_ip)
+
+Hostname clashes already use the uq_cluster_hostname constraint's index.
+On PostgreSQL the index is built CONCURRENTLY.
+
+Usage:
+    python migrations/013_add_node_ip_index.py upgrade
+    python migrations/013_add_node_ip_index.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+def _concurrently() -> str:
+    # CONCURRENTLY is Postgres-only and can't run inside a transaction (see AUTOCOMMIT below)
+    return "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+
+def upgrade():
+    """Create ix_nodes_cluster_ip"""
+    try:
+        print("Creating ix_nodes_cluster_ip...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                f"CREATE INDEX {_concurrently()}IF NOT EXISTS ix_nodes_cluster_ip "
+                f"ON nodes (cluster_id, internal_ip)"
+            ))
+
+        print("✓ Index created successfully")
+
+    except Exception as e:
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+
+def downgrade():
+    """Drop ix_nodes_cluster_ip"""
+    try:
+        print("Dropping ix_nodes_cluster_ip...")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"DROP INDEX {_concurrently()}IF EXISTS ix_nodes_cluster_ip"))
+
+        print("✓ Index dropped successfully")
+
+    except Exception as e:
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 013_add_node_ip_index.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 013_add_node_ip_index.py [upgrade|downgrade]")
+        sys.exit(1)
@@ -0,0 +1,83 @@
+"""
+Migration 014: Store cluster status cache as raw JSON bytes
+
+Changes cluster_status_cache.cached_data from TEXT to a binary column
+(BYTEA on PostgreSQL, BLOB on SQLite) holding the orjson-encoded status,
+so it is written and served without text encoding/decoding.
+
+Usage:
+    python migrations/014_cache_data_as_bytes.py upgrade
+    python migrations/014_cache_data_as_bytes.py downgrade
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+def upgrade():
+    """Change cached_data column to binary"""
+    db = SessionLocal()
+    try:
+        print("Changing cached_data column to binary...")
+
+        if db.bind.dialect.name == "postgresql":
+            db.execute(text("""
+                ALTER TABLE cluster_status_cache
+                ALTER COLUMN cached_data TYPE BYTEA USING convert_to(cached_data, 'UTF8')
+            """))
+        else:
+            # SQLite columns are dynamically typed - convert the stored values
+            db.execute(text("UPDATE cluster_status_cache SET cached_data = CAST(cached_data AS BLOB)"))
+
+        db.commit()
+        print("✓ cached_data column changed successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Migration failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def downgrade():
+    """Change cached_data column back to TEXT"""
+    db = SessionLocal()
+    try:
+        print("Changing cached_data column back to TEXT...")
+
+        if db.bind.dialect.name == "postgresql":
+            db.execute(text("""
+                ALTER TABLE cluster_status_cache
+                ALTER COLUMN cached_data TYPE TEXT USING convert_from(cached_data, 'UTF8')
+            """))
+        else:
+            db.execute(text("UPDATE cluster_status_cache SET cached_data = CAST(cached_data AS TEXT)"))
+
+        db.commit()
+        print("✓ cached_data column reverted successfully")
+
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Downgrade failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python 014_cache_data_as_bytes.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "upgrade":
+        upgrade()
+    elif command == "downgrade":
+        downgrade()
+    else:
+        print(f"Unknown command: {command}")
+        print("Usage: python 014_cache_data_as_bytes.py [upgrade|downgrade]")
+        sys.exit(1)